@@ -47,6 +47,9 @@ def assets_handler(request, course_key_string=None, asset_key_string=None):
             page_size: the number of items per page (defaults to 50)
             sort: the asset field to sort by (defaults to "date_added")
             direction: the sort direction (defaults to "descending")
+            cursor: if present, the page after the given cursor is returned instead of the requested
+                page, with the cursor of the page after it as nextCursor.  An empty cursor requests
+                the first page.
     POST
         json: create (or update?) an asset. The only updating that can be done is changing the lock state.
     PUT
@@ -131,6 +134,22 @@ def _assets_json(request, course_key):
         requested_sort = 'displayname'
     sort = [(requested_sort, sort_direction)]
 
+    if 'cursor' in request.GET:
+        try:
+            assets, total_count, next_cursor = contentstore().get_content_page_for_course(
+                course_key, requested_page_size, sort=sort, cursor=request.GET['cursor'] or None,
+                filter_params=filter_params
+            )
+        except ValueError:
+            return HttpResponseBadRequest()
+        return JsonResponse({
+            'pageSize': requested_page_size,
+            'totalCount': total_count,
+            'assets': _get_assets_json(course_key, assets),
+            'sort': requested_sort,
+            'nextCursor': next_cursor,
+        })
+
     current_page = max(requested_page, 0)
     start = current_page * requested_page_size
     options = {
@@ -150,6 +169,21 @@ def _assets_json(request, course_key):
         assets, total_count = _get_assets_for_page(request, course_key, options)
         end = start + len(assets)
 
+    return JsonResponse({
+        'start': start,
+        'end': end,
+        'page': current_page,
+        'pageSize': requested_page_size,
+        'totalCount': total_count,
+        'assets': _get_assets_json(course_key, assets),
+        'sort': requested_sort,
+    })
+
+
+def _get_assets_json(course_key, assets):
+    """
+    Returns the JSON of the given assets of the course, as listed by the contentstore.
+    """
     asset_json = []
     for asset in assets:
         asset_location = asset['asset_key']
@@ -169,16 +203,7 @@ def _assets_json(request, course_key):
             thumbnail_location,
             asset_locked
         ))
-
-    return JsonResponse({
-        'start': start,
-        'end': end,
-        'page': current_page,
-        'pageSize': requested_page_size,
-        'totalCount': total_count,
-        'assets': asset_json,
-        'sort': requested_sort,
-    })
+    return asset_json
 
 
 def _get_assets_for_page(request, course_key, options):
@@ -191,9 +216,10 @@ def _get_assets_for_page(request, course_key, options):
     filter_params = options['filter_params'] if options['filter_params'] else None
     start = current_page * page_size
 
-    return contentstore().get_all_content_for_course(
-        course_key, start=start, maxresults=page_size, sort=sort, filter_params=filter_params
+    assets, total_count, __ = contentstore().get_content_page_for_course(
+        course_key, page_size, sort=sort, filter_params=filter_params, start=start
     )
+    return assets, total_count
 
 
 def get_file_size(upload_file):
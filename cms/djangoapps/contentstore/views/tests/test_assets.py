@@ -182,8 +182,32 @@ class PaginationTestCase(AssetsTestCase):
         self.assert_correct_asset_response(
             self.url + "?page_size=3&page=1", 3, 1, 4)
 
-    @mock.patch('xmodule.contentstore.mongo.MongoContentStore.get_all_content_for_course')
-    def test_mocked_filtered_response(self, mock_get_all_content_for_course):
+    def test_cursor_responses(self):
+        """
+        Test paging through the assets by cursor
+        """
+        for index in range(5):
+            self.upload_asset("asset-{}".format(index))
+
+        display_names = []
+        cursor = ''
+        while cursor is not None:
+            resp = self.client.get(
+                self.url + '?page_size=2&sort=display_name&direction=asc&cursor=' + cursor,
+                HTTP_ACCEPT='application/json'
+            )
+            json_response = json.loads(resp.content)
+            self.assertEquals(json_response['totalCount'], 5)
+            self.assertLessEqual(len(json_response['assets']), 2)
+            display_names.extend(asset['display_name'] for asset in json_response['assets'])
+            cursor = json_response['nextCursor']
+        self.assertEquals(display_names, ['asset-{}.txt'.format(index) for index in range(5)])
+
+        resp = self.client.get(self.url + '?cursor=invalid', HTTP_ACCEPT='application/json')
+        self.assertEquals(resp.status_code, 400)
+
+    @mock.patch('xmodule.contentstore.mongo.MongoContentStore.get_content_page_for_course')
+    def test_mocked_filtered_response(self, mock_get_content_page_for_course):
         """
         Test the ajax asset interfaces
         """
@@ -193,7 +217,7 @@ class PaginationTestCase(AssetsTestCase):
         thumbnail_location = [
             'c4x', 'edX', 'toy', 'thumbnail', 'test_thumb.jpg', None]
 
-        mock_get_all_content_for_course.return_value = [
+        mock_get_content_page_for_course.return_value = [
             [
                 {
                     "asset_key": asset_key,
@@ -208,7 +232,8 @@ class PaginationTestCase(AssetsTestCase):
                     "locked": None
                 }
             ],
-            1
+            1,
+            None
         ]
         # Verify valid page requests
         self.assert_correct_filter_response(self.url, 'asset_type', 'OTHER')
@@ -144,6 +144,8 @@ ALLOWED_HOSTS = [
 LOG_DIR = ENV_TOKENS['LOG_DIR']
 
 CACHES = ENV_TOKENS['CACHES']
+COURSE_STRUCTURE_LOCAL_CACHE = ENV_TOKENS.get('COURSE_STRUCTURE_LOCAL_CACHE', COURSE_STRUCTURE_LOCAL_CACHE)
+CONTENTSERVER_DISK_CACHE.update(ENV_TOKENS.get('CONTENTSERVER_DISK_CACHE', {}))
 # Cache used for location mapping -- called many times with the same key/value
 # in a given request.
 if 'loc_cache' not in CACHES:
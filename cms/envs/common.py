@@ -91,6 +91,8 @@ from lms.envs.common import (
     # django-debug-toolbar
     DEBUG_TOOLBAR_PATCH_SETTINGS,
     BLOCK_STRUCTURES_SETTINGS,
+    COURSE_STRUCTURE_LOCAL_CACHE,
+    CONTENTSERVER_DISK_CACHE,
 
     # File upload defaults
     FILE_UPLOAD_STORAGE_BUCKET_NAME,
@@ -515,6 +517,15 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of reusable sandbox workers, with the modules problem code uses
+    # already imported.  A size of 0 starts a new sandbox for each execution.
+    'pool': {
+        # How many idle workers can be kept?
+        'size': 0,
+        # How many executions can a worker run before it is replaced?
+        'max_executions': 100,
+    },
 }
 
 ############################ DJANGO_BUILTINS ################################
@@ -5,6 +5,7 @@ Module with code executed during Studio startup
 import django
 from django.conf import settings
 
+import capa.safe_exec
 import cms.lib.xblock.runtime
 import xmodule.x_module
 from openedx.core.djangoapps.monkey_patch import django_db_models_options
@@ -37,6 +38,8 @@ def run():
 
     add_mimetypes()
 
+    configure_sandbox_pool()
+
     # In order to allow descriptors to use a handler url, we need to
     # monkey-patch the x_module library.
     # TODO: Remove this code when Runtimes are no longer created by modulestores
@@ -52,6 +55,14 @@ def run():
     validate_cms_config(settings)
 
 
+def configure_sandbox_pool():
+    """
+    Configure the pool of sandbox workers that executes capa problem code.
+    """
+    pool_settings = settings.CODE_JAIL.get('pool', {})
+    capa.safe_exec.configure_pool(pool_settings.get('size', 0), pool_settings.get('max_executions', 100))
+
+
 def add_mimetypes():
     """
     Add extra mimetypes. Used in xblock_resource.
@@ -9,6 +9,7 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils.translation import ugettext_noop
 
+import request_cache
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField, NoneToEmptyManager
 from student.models import CourseEnrollment
 from xmodule.modulestore.django import modulestore
@@ -19,6 +20,9 @@ FORUM_ROLE_MODERATOR = ugettext_noop('Moderator')
 FORUM_ROLE_COMMUNITY_TA = ugettext_noop('Community TA')
 FORUM_ROLE_STUDENT = ugettext_noop('Student')
 
+# Name of the request cache of the current ForumsConfig, read by the comment client.
+FORUMS_CONFIG_REQUEST_CACHE = 'django_comment_common.forums_config'
+
 
 @receiver(post_save, sender=CourseEnrollment)
 def assign_default_role_on_enrollment(sender, instance, **kwargs):
@@ -165,6 +169,14 @@ class ForumsConfig(ConfigurationModel):
         return u"ForumsConfig: timeout={}".format(self.connection_timeout)
 
 
+@receiver(post_save, sender=ForumsConfig)
+def clear_forums_config_request_cache(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Clears the ForumsConfig cached for the current request, once a new one is saved.
+    """
+    request_cache.clear_cache(FORUMS_CONFIG_REQUEST_CACHE)
+
+
 class CourseDiscussionSettings(models.Model):
     course_id = CourseKeyField(
         unique=True,
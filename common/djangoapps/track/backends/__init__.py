@@ -25,3 +25,14 @@ class BaseBackend(object):
     def send(self, event):
         """Send event to tracker."""
         pass
+
+    def send_batch(self, events):
+        """
+        Send a list of events to tracker.
+
+        Backends which can store several events at once should override
+        this, which by default sends the events one at a time.
+
+        """
+        for event in events:
+            self.send(event)
@@ -96,3 +96,12 @@ class MongoBackend(BaseBackend):
             # during the next event.
             msg = 'Error inserting to MongoDB event tracker backend'
             log.exception(msg)
+
+    def send_batch(self, events):
+        """Insert the events in to the Mongo collection, in one request"""
+        try:
+            self.collection.insert(events, manipulate=False, continue_on_error=True)
+        except (PyMongoError, BSONError):
+            # As in send, the events are lost.
+            msg = 'Error inserting batch of {} events to MongoDB event tracker backend'.format(len(events))
+            log.exception(msg)
@@ -0,0 +1,228 @@
+"""
+Event tracker backend that queues events in memory, and sends them in
+batches to another backend from a background thread.
+
+Wrapping a backend in this one takes its I/O out of the request, as in::
+
+  TRACKING_BACKENDS = {
+      'mongo': {
+          'ENGINE': 'track.backends.queued.QueuedBackend',
+          'OPTIONS': {
+              'backend': {
+                  'ENGINE': 'track.backends.mongodb.MongoBackend',
+                  'OPTIONS': {...}
+              },
+              'max_queue_size': 10000,
+              'batch_size': 100,
+              'flush_interval': 1.0,
+              'overflow': 'drop',
+          }
+      }
+  }
+
+"""
+
+from __future__ import absolute_import
+
+import atexit
+import logging
+import os
+import threading
+import time
+from Queue import Empty, Full, Queue
+
+from django.db import close_old_connections
+from dogapi import dog_stats_api
+
+from track.backends import BaseBackend
+
+log = logging.getLogger(__name__)
+
+# Drop events sent while the queue is full.
+OVERFLOW_DROP = 'drop'
+# Wait up to block_timeout seconds for room in the queue, then drop the event.
+OVERFLOW_BLOCK = 'block'
+# Send the event to the backend in the request, as if it weren't queued.
+OVERFLOW_SEND = 'send'
+
+OVERFLOW_POLICIES = (OVERFLOW_DROP, OVERFLOW_BLOCK, OVERFLOW_SEND)
+
+# Queued by stop(), after which the flusher thread sends no more batches.
+_STOP = object()
+
+
+class QueuedBackend(BaseBackend):
+    """
+    Event tracker backend that sends events to another backend in batches,
+    from a background thread of each process.
+
+    """
+
+    def __init__(self, backend, max_queue_size=10000, batch_size=100, flush_interval=1.0,
+                 overflow=OVERFLOW_DROP, block_timeout=0.1, **kwargs):
+        """
+        Configure the queue, and the backend it sends to.
+
+        :Parameters:
+
+          - `backend`: configuration of the backend the events are sent to,
+            with the ENGINE and OPTIONS keys of TRACKING_BACKENDS
+          - `max_queue_size`: number of events queued, beyond which the
+            overflow policy applies
+          - `batch_size`: most events sent to the backend at once
+          - `flush_interval`: seconds for which events wait for a batch
+            to fill up
+          - `overflow`: one of 'drop', 'block' or 'send', for events
+            sent while the queue is full
+          - `block_timeout`: seconds to wait for room in the queue, with
+            the 'block' policy
+
+        """
+        super(QueuedBackend, self).__init__(**kwargs)
+
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError('Invalid overflow policy for queued event track backend: %s' % overflow)
+
+        # Imported here, since the tracker imports this module as it's initialized.
+        from track.tracker import _instantiate_backend_from_name
+        self.backend = _instantiate_backend_from_name(backend['ENGINE'], backend.get('OPTIONS', {}))
+
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._flusher = None
+        atexit.register(self.flush)
+
+    def _get_queue(self):
+        """
+        Returns the queue of the current process, starting its flusher thread.
+
+        Threads don't survive a fork, and events queued before it were
+        the parent's to send, so each process starts its own.
+
+        """
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._lock:
+                if self._pid != pid:
+                    self._queue = Queue(self.max_queue_size)
+                    self._start_flusher()
+                    self._pid = pid
+        return self._queue
+
+    def _start_flusher(self):
+        """
+        Starts the thread which sends the queued events.
+        """
+        self._flusher = threading.Thread(target=self._run_flusher, name='track-queued-backend')
+        self._flusher.daemon = True
+        self._flusher.start()
+
+    def _run_flusher(self):
+        """
+        Sends batches of queued events until stopped, or for as long as
+        the process runs.
+
+        """
+        queue = self._queue
+        while True:
+            # Wait for an event, then up to flush_interval for others to fill the batch.
+            batch = [queue.get()]
+            if batch[-1] is not _STOP:
+                deadline = time.time() + self.flush_interval
+                batch.extend(self._take_batch(queue, self.batch_size - 1, deadline))
+            stopping = batch[-1] is _STOP
+            if stopping:
+                batch.pop()
+            # Like a request, the thread mustn't send over a database
+            # connection that has timed out or failed since its last batch.
+            close_old_connections()
+            self._send_batch(batch)
+            if stopping:
+                return
+
+    def _take_batch(self, queue, limit, deadline=None):
+        """
+        Returns up to limit events from the queue, waiting for the
+        batch to fill until the deadline, if given.
+
+        The batch ends at the stop sentinel, which is returned last.
+
+        """
+        batch = []
+        try:
+            while len(batch) < limit:
+                if deadline is None:
+                    batch.append(queue.get_nowait())
+                else:
+                    batch.append(queue.get(timeout=max(deadline - time.time(), 0)))
+                if batch[-1] is _STOP:
+                    break
+        except Empty:
+            pass
+        return batch
+
+    def _send_batch(self, batch):
+        """
+        Sends the batch of events to the backend, logging rather than raising errors.
+        """
+        if not batch:
+            return
+        dog_stats_api.histogram('track.queued.batch_size', len(batch))
+        try:
+            with dog_stats_api.timer('track.queued.send_batch'):
+                self.backend.send_batch(batch)
+        except Exception:  # pylint: disable=broad-except
+            # The events are lost, rather than the flusher thread.
+            log.exception('Error sending batch of %d events to queued event track backend', len(batch))
+
+    def send(self, event):
+        """Queue the event, applying the overflow policy if the queue is full."""
+        queue = self._get_queue()
+        try:
+            if self.overflow == OVERFLOW_BLOCK:
+                queue.put(event, timeout=self.block_timeout)
+            else:
+                queue.put_nowait(event)
+        except Full:
+            if self.overflow == OVERFLOW_SEND:
+                dog_stats_api.increment('track.queued.overflow_sent')
+                self.backend.send(event)
+            else:
+                dog_stats_api.increment('track.queued.dropped')
+
+    def stop(self, timeout=None):
+        """
+        Stops this process's flusher thread once it has sent the events
+        queued before, waiting up to timeout seconds for it to finish.
+
+        Events sent afterwards are left for flush().
+
+        """
+        if self._pid != os.getpid():
+            return
+        self._queue.put(_STOP)
+        if self._flusher is not None:
+            self._flusher.join(timeout)
+
+    def flush(self):
+        """
+        Sends the events queued by this process in the calling thread,
+        as at exit, when the flusher thread won't run again.
+
+        """
+        if self._pid != os.getpid():
+            return
+        while True:
+            batch = self._take_batch(self._queue, self.batch_size)
+            if batch and batch[-1] is _STOP:
+                batch.pop()
+            elif not batch:
+                return
+            self._send_batch(batch)
@@ -0,0 +1,133 @@
+from __future__ import absolute_import
+
+import threading
+
+from django.test import TestCase
+from mock import patch
+
+from track.backends import BaseBackend
+from track.backends.queued import QueuedBackend
+
+RECORDING_BACKEND = {
+    'ENGINE': 'track.backends.tests.test_queued.RecordingBackend',
+}
+
+
+class TestQueuedBackend(TestCase):
+    """Tests of the backend which sends events in batches from a background thread."""
+
+    def _create_backend(self, **options):
+        """Creates a queued backend, without its flusher thread."""
+        patcher = patch.object(QueuedBackend, '_start_flusher')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return QueuedBackend(RECORDING_BACKEND, **options)
+
+    def _run_flusher(self, backend):
+        """Runs the backend's flusher thread until the events queued so far are sent."""
+        flusher = threading.Thread(target=backend._run_flusher)  # pylint: disable=protected-access
+        flusher.daemon = True
+        flusher.start()
+        backend.stop()
+        flusher.join(5)
+        self.assertFalse(flusher.is_alive())
+
+    def test_flush_in_batches(self):
+        backend = self._create_backend(batch_size=2)
+        events = [{'test': index} for index in range(5)]
+        for event in events:
+            backend.send(event)
+        self.assertEqual(backend.backend.batches, [])
+
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [events[0:2], events[2:4], events[4:5]])
+
+    def test_drop_when_full(self):
+        backend = self._create_backend(max_queue_size=2)
+        for index in range(3):
+            backend.send({'test': index})
+
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [[{'test': 0}, {'test': 1}]])
+
+    def test_block_when_full(self):
+        backend = self._create_backend(max_queue_size=1, overflow='block', block_timeout=0.01)
+        backend.send({'test': 0})
+        backend.send({'test': 1})
+
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [[{'test': 0}]])
+
+    def test_send_when_full(self):
+        backend = self._create_backend(max_queue_size=1, overflow='send')
+        backend.send({'test': 0})
+        backend.send({'test': 1})
+        self.assertEqual(backend.backend.batches, [[{'test': 1}]])
+
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [[{'test': 1}], [{'test': 0}]])
+
+    def test_send_errors_logged(self):
+        backend = self._create_backend()
+        backend.send({'test': 0})
+        with patch.object(RecordingBackend, 'send_batch', side_effect=Exception):
+            with patch('track.backends.queued.log') as mock_log:
+                backend.flush()
+        self.assertTrue(mock_log.exception.called)
+
+    def test_flusher_thread(self):
+        backend = QueuedBackend(RECORDING_BACKEND, flush_interval=0.01)
+        self.addCleanup(backend.stop, 5)
+        backend.send({'test': 0})
+        self.assertTrue(backend.backend.sent.wait(5))
+        self.assertEqual(backend.backend.batches, [[{'test': 0}]])
+
+        backend.stop(5)
+        self.assertFalse(backend._flusher.is_alive())  # pylint: disable=protected-access
+
+    def test_flusher_thread_in_batches(self):
+        backend = self._create_backend(batch_size=2, flush_interval=0.01)
+        events = [{'test': index} for index in range(3)]
+        for event in events:
+            backend.send(event)
+
+        self._run_flusher(backend)
+        self.assertEqual(backend.backend.batches, [events[0:2], events[2:3]])
+
+    def test_flusher_thread_closes_old_connections(self):
+        backend = self._create_backend(batch_size=2, flush_interval=0.01)
+        for index in range(3):
+            backend.send({'test': index})
+
+        with patch('track.backends.queued.close_old_connections') as mock_close_old_connections:
+            self._run_flusher(backend)
+        self.assertEqual(mock_close_old_connections.call_count, 2)
+        self.assertEqual(len(backend.backend.batches), 2)
+
+    def test_flush_after_stop(self):
+        backend = self._create_backend()
+        backend.send({'test': 0})
+        backend.stop()
+        backend.send({'test': 1})
+
+        backend.flush()
+        self.assertEqual(backend.backend.batches, [[{'test': 0}], [{'test': 1}]])
+
+    def test_invalid_overflow(self):
+        with self.assertRaises(ValueError):
+            QueuedBackend(RECORDING_BACKEND, overflow='wait')
+
+
+class RecordingBackend(BaseBackend):
+    """Records the batches of events sent to it."""
+    def __init__(self, **options):
+        super(RecordingBackend, self).__init__(**options)
+        self.batches = []
+        self.sent = threading.Event()
+
+    def send(self, event):
+        self.send_batch([event])
+
+    def send_batch(self, events):
+        self.batches.append(events)
+        self.sent.set()
@@ -0,0 +1,87 @@
+"""
+Micro-benchmarks for calc.
+
+Run from common/lib/calc with:
+    $ python -m calc.benchmarks
+    $ python -m calc.benchmarks --repeat 5 --samples 100
+"""
+import argparse
+import random
+import timeit
+
+import numpy
+
+import calc
+
+# Expressions typical of NumericalResponse and FormulaResponse answers.
+EXPRESSIONS = [
+    '3.14159',
+    '2.5k*10%',
+    'x^2+2*x*y+y^2',
+    'sin(x)*cos(y)/(1+x^2)',
+    'R1||R2||(x+y)',
+    'sqrt(x^2+y^2)*exp(-x/y)',
+]
+SAMPLE_RANGES = {'x': (1, 5), 'y': (1, 5), 'R1': (1, 10), 'R2': (10, 100)}
+
+
+def benchmarks(num_samples):
+    """
+    Return a list of (name, function) for each benchmark, where the function
+    evaluates all of EXPRESSIONS for the given number of variable samples.
+    """
+    samples = [
+        {name: random.uniform(*sample_range) for name, sample_range in SAMPLE_RANGES.iteritems()}
+        for _ in range(num_samples)
+    ]
+
+    def parse_each_time():
+        """
+        Evaluate each sample with a newly parsed expression, as evaluator did.
+        """
+        for math_expr in EXPRESSIONS:
+            for variables in samples:
+                calc.CompiledExpression(math_expr).evaluate(variables, {})
+
+    def evaluator():
+        """
+        Evaluate each sample with evaluator, which reuses cached expressions.
+        """
+        for math_expr in EXPRESSIONS:
+            for variables in samples:
+                calc.evaluator(variables, {}, math_expr)
+
+    def evaluate_samples():
+        """
+        Evaluate all samples at once with cached expressions.
+        """
+        for math_expr in EXPRESSIONS:
+            calc.compile_expression(math_expr).evaluate_samples(samples, {})
+
+    return [
+        ('parse each time', parse_each_time),
+        ('evaluator', evaluator),
+        ('evaluate_samples', evaluate_samples),
+    ]
+
+
+def main():
+    """
+    Run the benchmarks, printing the best time of each.
+    """
+    parser = argparse.ArgumentParser(description=u'Micro-benchmarks for calc.')
+    parser.add_argument('--repeat', type=int, default=3, help=u'Number of times to run each benchmark.')
+    parser.add_argument('--samples', type=int, default=20, help=u'Number of variable samples per expression.')
+    args = parser.parse_args()
+
+    random.seed(0)
+    # Samples out of a function's domain only warn.
+    numpy.seterr(all='ignore')
+    print u'{} expressions x {} samples'.format(len(EXPRESSIONS), args.samples)
+    for name, benchmark in benchmarks(args.samples):
+        best_time = min(timeit.repeat(benchmark, repeat=args.repeat, number=1))
+        print u'  {:<20} {:>10.2f} ms'.format(name, best_time * 1000)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,6 +7,8 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import numbers
 import operator
+import threading
+from collections import OrderedDict
 
 import numpy
 import scipy.constants
@@ -214,6 +216,82 @@ def eval_product(parse_result):
     return prod
 
 
+# The following evaluation actions are the counterparts of those above, for
+# parse components whose values may be numpy arrays of the values of many
+# samples of the variables, rather than numbers.
+
+def eval_sample_atom(parse_result):
+    """
+    Return the value or array of sample values wrapped by the atom.
+    """
+    return next(k for k in parse_result if not isinstance(k, basestring))
+
+
+def eval_sample_power(parse_result):
+    """
+    Exponentiate the values or arrays of sample values, right to left.
+    """
+    parse_result = reversed([k for k in parse_result if not isinstance(k, basestring)])
+    return reduce(lambda a, b: b ** a, parse_result)
+
+
+def eval_sample_parallel(parse_result):
+    """
+    Compute the parallel resistors operator for each sample.
+
+    NaN for each sample that has a zero among its inputs.
+    """
+    if len(parse_result) == 1:
+        return parse_result[0]
+    inputs = [k for k in parse_result if not isinstance(k, basestring)]
+    has_zero = reduce(numpy.logical_or, [numpy.equal(k, 0) for k in inputs])
+    reciprocals = [1. / numpy.where(has_zero, 1., k) for k in inputs]
+    return numpy.where(has_zero, float('nan'), 1. / sum(reciprocals))
+
+
+def eval_sample_sum(parse_result):
+    """
+    Add the values or arrays of sample values, keeping in mind their sign.
+    """
+    total = 0.0
+    current_op = operator.add
+    for token in parse_result:
+        if not isinstance(token, basestring):
+            total = current_op(total, token)
+        elif token == '+':
+            current_op = operator.add
+        elif token == '-':
+            current_op = operator.sub
+    return total
+
+
+def eval_sample_product(parse_result):
+    """
+    Multiply the values or arrays of sample values.
+    """
+    prod = 1.0
+    current_op = operator.mul
+    for token in parse_result:
+        if not isinstance(token, basestring):
+            prod = current_op(prod, token)
+        elif token == '*':
+            current_op = operator.mul
+        elif token == '/':
+            current_op = operator.truediv
+    return prod
+
+
+# Default functions that apply elementwise to numpy arrays.
+SAMPLE_FUNCTIONS = set(DEFAULT_FUNCTIONS.values()) - {math.factorial}
+
+
+class NotSampleFunction(Exception):
+    """
+    Indicate when a function can not be applied to arrays of samples.
+    """
+    pass
+
+
 def add_defaults(variables, functions, case_sensitive):
     """
     Create dictionaries with both the default and user-defined variables.
@@ -238,38 +316,126 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
      python numbers.
     -Unary functions are passed as a dictionary from string to function.
     """
-    # No need to go further.
-    if math_expr.strip() == "":
-        return float('nan')
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return a CompiledExpression for the math expression, reusing a recently
+    compiled one if possible, as the same answers are evaluated many times.
+    """
+    return COMPILED_EXPRESSIONS.get(math_expr, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
+class CompiledExpression(object):
+    """
+    A math expression, parsed once so that it can be evaluated for many
+    values of its variables.
+
+    `evaluate` gives the same results as `evaluator`, and `evaluate_samples`
+    evaluates many samples of the variables at once.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.case_sensitive = case_sensitive
+        self.math_interpreter = None
+
+        # No need to parse an empty expression, which evaluates to NaN.
+        if math_expr.strip() != "":
+            self.math_interpreter = ParseAugmenter(math_expr, case_sensitive)
+            self.math_interpreter.parse_algebra()
+
+    def casify(self, name):
+        """
+        Return the name used to look up the given variable or function.
+        """
+        return name if self.case_sensitive else name.lower()
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression for the given variables and functions.
+        """
+        if self.math_interpreter is None:
+            return float('nan')
 
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
+        # Get our variables together.
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
 
-    return math_interpreter.reduce_tree(evaluate_actions)
+        # ...and check them
+        self.math_interpreter.check_variables(all_variables, all_functions)
+
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: all_variables[self.casify(x[0])],
+            'function': lambda x: all_functions[self.casify(x[0])](x[1]),
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum
+        }
+
+        return self.math_interpreter.reduce_tree(evaluate_actions)
+
+    def evaluate_samples(self, variables_list, functions):
+        """
+        Evaluate the expression for each of the given dictionaries of
+        variables, returning a list of the same results as `evaluate`.
+
+        The samples are evaluated in a single pass over numpy arrays of their
+        values.  If that isn't possible, or would not give the same results,
+        e.g. if a sample divides by zero or is out of a function's domain,
+        each sample is evaluated on its own instead.
+        """
+        if self.math_interpreter is None or not variables_list:
+            return [self.evaluate(variables, functions) for variables in variables_list]
+
+        sample_names = set(variables_list[0])
+        variables_used = set(self.casify(name) for name in self.math_interpreter.variables_used)
+        if not any(self.casify(name) in variables_used for name in sample_names):
+            # The expression has the same value for every sample.
+            return [self.evaluate(variables_list[0], functions)] * len(variables_list)
+
+        sample_variables = {
+            name: numpy.array([variables.get(name) for variables in variables_list])
+            for name in sample_names
+        }
+        # Arrays of integers could silently overflow, unlike python numbers.
+        if any(set(variables) != sample_names for variables in variables_list) or any(
+                values.dtype.kind not in 'fc' for values in sample_variables.itervalues()
+        ):
+            return [self.evaluate(variables, functions) for variables in variables_list]
+
+        all_variables, all_functions = add_defaults(sample_variables, functions, self.case_sensitive)
+        self.math_interpreter.check_variables(all_variables, all_functions)
+
+        def eval_sample_function(parse_result):
+            """
+            Apply the function to the value or array of sample values.
+            """
+            function = all_functions[self.casify(parse_result[0])]
+            if function not in SAMPLE_FUNCTIONS:
+                raise NotSampleFunction(parse_result[0])
+            return function(parse_result[1])
+
+        evaluate_actions = {
+            'number': eval_number,
+            'variable': lambda x: all_variables[self.casify(x[0])],
+            'function': eval_sample_function,
+            'atom': eval_sample_atom,
+            'power': eval_sample_power,
+            'parallel': eval_sample_parallel,
+            'product': eval_sample_product,
+            'sum': eval_sample_sum
+        }
+
+        try:
+            # Where python numbers would raise an exception, numpy only warns,
+            # so raise instead to evaluate those samples as python numbers.
+            with numpy.errstate(divide='raise', over='raise', invalid='raise'):
+                results = self.math_interpreter.reduce_tree(evaluate_actions)
+            return list(numpy.resize(results, len(variables_list)))
+        except Exception:  # pylint: disable=broad-except
+            return [self.evaluate(variables, functions) for variables in variables_list]
 
 
 class ParseAugmenter(object):
@@ -430,3 +596,48 @@ class ParseAugmenter(object):
 
         if bad_vars:
             raise UndefinedVariable(' '.join(sorted(bad_vars)))
+
+
+class CompiledExpressionCache(object):
+    """
+    A bounded cache of CompiledExpressions, keyed by their math expression
+    and case sensitivity, from which the least recently used are evicted.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._expressions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._expressions)
+
+    def get(self, math_expr, case_sensitive=False):
+        """
+        Return the CompiledExpression for the math expression, compiling
+        and caching it if it isn't cached.
+        """
+        key = (math_expr, bool(case_sensitive))
+        with self._lock:
+            compiled_expression = self._expressions.pop(key, None)
+            if compiled_expression is not None:
+                self._expressions[key] = compiled_expression
+                return compiled_expression
+
+        # Parse outside of the lock.  Expressions that fail to parse aren't cached.
+        compiled_expression = CompiledExpression(math_expr, case_sensitive)
+        with self._lock:
+            self._expressions[key] = compiled_expression
+            while len(self._expressions) > self.maxsize:
+                self._expressions.popitem(last=False)
+        return compiled_expression
+
+    def clear(self):
+        """
+        Remove all of the cached expressions.
+        """
+        with self._lock:
+            self._expressions.clear()
+
+
+# The cache of expressions compiled by `compile_expression`.
+COMPILED_EXPRESSIONS = CompiledExpressionCache(maxsize=1024)
@@ -559,3 +559,91 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.CompiledExpression, whose evaluation of many samples
+    at once should give the same results as calc.evaluator for each sample.
+    """
+    SAMPLES = [{'x': x, 'y': y} for x, y in [(0.5, 2.0), (1.25, -3.0), (3.0, 0.25), (-2.0, 7.5)]]
+
+    def assert_samples_match_evaluator(self, math_expr, samples=None, case_sensitive=False):
+        """
+        Assert that the samples evaluated at once match evaluator's result for each.
+        """
+        samples = self.SAMPLES if samples is None else samples
+        results = calc.CompiledExpression(math_expr, case_sensitive).evaluate_samples(samples, {})
+        expected = [calc.evaluator(variables, {}, math_expr, case_sensitive) for variables in samples]
+        self.assertEqual(len(results), len(expected))
+        for result, expected_result in zip(results, expected):
+            if numpy.isnan(expected_result):
+                self.assertTrue(numpy.isnan(result), msg=math_expr)
+            else:
+                self.assertEqual(result, expected_result, msg=math_expr)
+
+    def test_evaluate_samples(self):
+        for math_expr in [
+            'x', '-x+y', 'x*y/2', '2^x^2', '2k*x', '10%*y', 'x||y||1', '-(x-y)*(x+y)',
+            'sin(x)+cos(y)', 'sqrt(x^2+y^2)', 'exp(-x)*ln(abs(y))', 'sec(x)*arctan(y)',
+            'x*i+y', 'e^(j*pi*x)', 'X+Y', '3', '',
+        ]:
+            self.assert_samples_match_evaluator(math_expr)
+
+    def test_evaluate_samples_each(self):
+        """
+        Samples that can't all be evaluated at once are evaluated on their own.
+        """
+        # Some samples are out of the domain of the expression.
+        self.assert_samples_match_evaluator('sqrt(y)')
+        self.assert_samples_match_evaluator('x||(y-2)')
+        # Factorial is not applied to arrays.
+        self.assert_samples_match_evaluator('fact(y+3)', [{'y': 1.0}, {'y': 2.0}])
+        # Integers are not evaluated as arrays.
+        self.assert_samples_match_evaluator('x^40', [{'x': 10}, {'x': 20}])
+
+        with self.assertRaises(ZeroDivisionError):
+            calc.CompiledExpression('1/(y-2)').evaluate_samples(self.SAMPLES, {})
+        with self.assertRaises(ValueError):
+            calc.CompiledExpression('fact(x)').evaluate_samples(self.SAMPLES, {})
+
+    def test_undefined_vars(self):
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'z'):
+            calc.CompiledExpression('x+z').evaluate_samples(self.SAMPLES, {})
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'X'):
+            calc.CompiledExpression('X+y', case_sensitive=True).evaluate_samples(self.SAMPLES, {})
+
+
+class CompiledExpressionCacheTest(unittest.TestCase):
+    """
+    Run tests for calc.CompiledExpressionCache
+    """
+    def test_cached(self):
+        cache = calc.CompiledExpressionCache(maxsize=2)
+        compiled = cache.get('x+1')
+        self.assertIs(cache.get('x+1'), compiled)
+        self.assertIsNot(cache.get('x+1', case_sensitive=True), compiled)
+        self.assertEqual(compiled.evaluate({'x': 2.0}, {}), 3.0)
+        self.assertEqual(compiled.evaluate({'x': 5.0}, {}), 6.0)
+
+    def test_least_recently_used_evicted(self):
+        cache = calc.CompiledExpressionCache(maxsize=2)
+        first = cache.get('x+1')
+        second = cache.get('x+2')
+        self.assertIs(cache.get('x+1'), first)
+        cache.get('x+3')
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.get('x+1'), first)
+        self.assertIsNot(cache.get('x+2'), second)
+
+    def test_parse_errors_not_cached(self):
+        cache = calc.CompiledExpressionCache(maxsize=2)
+        with self.assertRaises(ParseException):
+            cache.get('1+')
+        self.assertEqual(len(cache), 0)
+
+    def test_evaluator_uses_cache(self):
+        calc.COMPILED_EXPRESSIONS.clear()
+        self.assertEqual(calc.evaluator({'x': 2.0}, {}, '3*x'), 6.0)
+        self.assertIs(calc.compile_expression('3*x'), calc.compile_expression('3*x'))
+        self.assertEqual(len(calc.COMPILED_EXPRESSIONS), 1)
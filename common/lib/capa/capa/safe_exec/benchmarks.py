@@ -0,0 +1,58 @@
+"""
+Benchmark of executing capa code with and without a pool of sandbox workers.
+
+Run from common/lib/capa with:
+    $ python -m capa.safe_exec.benchmarks --python-bin <SANDENV>/bin/python --user sandbox
+    $ python -m capa.safe_exec.benchmarks --python-bin <SANDENV>/bin/python --executions 50
+"""
+import argparse
+import time
+
+from codejail import jail_code
+
+from .safe_exec import configure_pool, safe_exec
+
+# Code typical of a randomized capa problem's script.
+CODE = """\
+a = random.randint(1, 10)
+b = random.randint(1, 10)
+answer = numpy.sqrt(a ** 2 + b ** 2)
+"""
+
+
+def time_executions(num_executions):
+    """
+    Return the times, in milliseconds, of each of the given number of
+    executions of CODE, each with a different seed so none are cached.
+    """
+    times = []
+    for seed in range(num_executions):
+        start = time.time()
+        safe_exec(CODE, {}, random_seed=seed)
+        times.append((time.time() - start) * 1000)
+    return times
+
+
+def main():
+    """
+    Run the benchmark, printing the latency of executions with and without the pool.
+    """
+    parser = argparse.ArgumentParser(description=u'Benchmark of capa code execution with a sandbox pool.')
+    parser.add_argument('--python-bin', required=True, help=u'Path to the sandboxed Python executable.')
+    parser.add_argument('--user', default=None, help=u'User to run sandboxed code as.')
+    parser.add_argument('--executions', type=int, default=20, help=u'Number of executions to time.')
+    parser.add_argument('--pool-size', type=int, default=1, help=u'Number of idle sandbox workers.')
+    args = parser.parse_args()
+
+    jail_code.configure('python', args.python_bin, user=args.user)
+    for name, pool_size in [('spawn per call', 0), ('sandbox pool', args.pool_size)]:
+        configure_pool(pool_size, max_executions=args.executions)
+        times = sorted(time_executions(args.executions))
+        print u'{:<16} median: {:>8.1f} ms, max: {:>8.1f} ms, total: {:>9.1f} ms'.format(
+            name, times[len(times) // 2], times[-1], sum(times),
+        )
+    configure_pool(0)
+
+
+if __name__ == '__main__':
+    main()
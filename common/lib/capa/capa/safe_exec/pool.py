@@ -0,0 +1,487 @@
+"""
+A pool of reusable sandboxed Python workers, for executing capa's code.
+
+Starting a sandboxed Python and importing the modules that problem code uses
+takes much longer than running most problem code.  Each worker in the pool is
+a sandboxed Python, started the same way codejail starts one, that has
+already imported those modules.  To execute code, the worker forks a child
+process that runs the code with codejail's resource limits, and then exits,
+so nothing the code does carries over to later executions.  The child reads
+the code and globals from a socket in the execution's directory, and sends
+its result back over it, so the worker never holds another execution's data
+for the children it forks later to inherit.  Workers are replaced after a
+number of executions, and after any failure.
+"""
+import inspect
+import json
+import logging
+import os
+import select
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+from codejail import jail_code
+from codejail.safe_exec import SafeExecException, json_safe
+
+log = logging.getLogger(__name__)
+
+# Seconds a worker has to respond, beyond the real time limit of the code it executes.
+RESPONSE_TIMEOUT_MARGIN = 5
+
+# The name of the socket, in each execution's directory, over which the
+# execution's request and result are sent.
+SOCKET_NAME = '.sandbox_socket'
+
+# The code run by each worker.  It reads the directory of each execution from
+# stdin, forks a child which reads the JSON request from the socket in that
+# directory and runs its code, and writes a JSON response with the child's
+# exit status to stdout.
+WORKER_CODE = r'''
+import errno
+import json
+import os
+import resource
+import signal
+import socket
+import sys
+import traceback
+import types
+
+PRELOAD, LIMITS = json.loads(sys.argv[1])
+SOCKET_NAME = %(socket_name)r
+
+for module_name in PRELOAD:
+    try:
+        __import__(module_name)
+    except Exception:
+        pass
+
+
+
+def set_process_limits():
+    """
+    Set the child's resource limits, as codejail's set_process_limits does.
+    """
+    # No subprocesses.
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+    # CPU seconds, with a hard limit beyond the soft one, so that SIGXCPU is sent first.
+    cpu = LIMITS.get("CPU")
+    if cpu:
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    vmem = LIMITS.get("VMEM")
+    if vmem:
+        resource.setrlimit(resource.RLIMIT_AS, (vmem, vmem))
+    # Size of written files, where zero means nothing can be written.
+    fsize = LIMITS.get("FSIZE", 0)
+    resource.setrlimit(resource.RLIMIT_FSIZE, (fsize, fsize))
+
+
+class DevNull(object):
+    def write(self, *args, **kwargs):
+        pass
+
+    def flush(self, *args, **kwargs):
+        pass
+
+
+%(json_safe)s
+
+
+def run_child(cwd):
+    """
+    Read the request from the socket in cwd, and run its code, sending
+    the resulting globals, or the traceback of its exception, back.
+    """
+    os.setpgid(0, 0)
+    os.chdir(cwd)
+    os.environ["TMPDIR"] = "tmp"
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(SOCKET_NAME)
+    request = json.loads(connection.makefile("rb").read())
+    for pydir in request["python_path"]:
+        sys.path.append(pydir)
+
+    # The code mustn't be able to read or write the worker's directories and
+    # statuses, or what the worker logs.
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    sys.stdout = sys.stderr = DevNull()
+
+    set_process_limits()
+
+    # The code runs in a module of its own, so that `import __main__` doesn't reach the worker's.
+    # The worker's module is kept, since the functions here still use its globals.
+    worker_module = sys.modules["__main__"]
+    module = types.ModuleType("__main__")
+    module_names = set(vars(module)) | {"__builtins__", "__package__"}
+    sys.modules["__main__"] = module
+    g_dict = vars(module)
+    g_dict.update(request["globals"])
+    try:
+        exec request["code"] in g_dict
+        for name in module_names.difference(request["globals"]):
+            g_dict.pop(name, None)
+        result, status = {"globals": json_safe(g_dict)}, 0
+    except BaseException:
+        result, status = {"stderr": traceback.format_exc()}, 1
+    connection.sendall(json.dumps(result))
+    connection.close()
+    os._exit(status)
+
+
+def wait_child(pid, realtime):
+    """
+    Return the child's exit status, killing it if it runs out of real time.
+    """
+    if realtime:
+        signal.setitimer(signal.ITIMER_REAL, realtime)
+    try:
+        while True:
+            try:
+                _, status = os.waitpid(pid, 0)
+                break
+            except OSError as error:
+                # Interrupted by the alarm, which killed the child.
+                if error.errno != errno.EINTR:
+                    raise
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    return -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+
+
+def kill_group(pid):
+    """
+    Kill the child's process group, including anything it left running.
+    """
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+child_pid = None
+
+
+def terminate(signum, frame):
+    if child_pid:
+        kill_group(child_pid)
+    os._exit(1)
+
+def kill_child(signum, frame):
+    if child_pid:
+        kill_group(child_pid)
+
+signal.signal(signal.SIGTERM, terminate)
+signal.signal(signal.SIGALRM, kill_child)
+
+
+def serve(line):
+    """
+    Execute the request waiting in the directory on the line in a child,
+    and write its exit status, returning False once stdin is closed.
+
+    The worker never reads a request or a result, so no child forked
+    later can find another execution's code, globals or result in the
+    memory it inherits from the worker.
+    """
+    global child_pid
+    if not line:
+        return False
+    child_pid = os.fork()
+    if child_pid == 0:
+        try:
+            run_child(line.rstrip("\n"))
+        finally:
+            os._exit(1)
+    try:
+        os.setpgid(child_pid, child_pid)
+    except OSError:
+        pass
+    status = wait_child(child_pid, LIMITS.get("REALTIME"))
+    kill_group(child_pid)
+    child_pid = None
+    sys.stdout.write(json.dumps({"status": status}) + "\n")
+    sys.stdout.flush()
+    return True
+
+
+while serve(sys.stdin.readline()):
+    pass
+''' % {'json_safe': inspect.getsource(json_safe), 'socket_name': SOCKET_NAME}
+
+
+def remove_homedir(homedir, user):
+    """
+    Remove an execution's directory.  As codejail does, what the code
+    created in its tmp directory is removed as the sandbox user first,
+    since the files and directories it created may not be removable by us.
+    """
+    tmptmp = os.path.join(homedir, 'tmp')
+    if user and os.path.isdir(tmptmp):
+        with open(os.devnull, 'w') as devnull:
+            subprocess.call(
+                ['sudo', '-u', user, 'find', tmptmp, '-mindepth', '1', '-maxdepth', '1',
+                 '-exec', 'rm', '-rf', '{}', ';'],
+                stdout=devnull, stderr=devnull,
+            )
+    try:
+        shutil.rmtree(homedir)
+    except OSError:
+        log.exception(u'Could not remove sandbox directory %s', homedir)
+
+
+def _remaining(deadline):
+    """
+    Return the seconds left until the deadline, or None if there is none.
+    """
+    return max(deadline - time.time(), 0) if deadline else None
+
+
+class SandboxWorkerError(Exception):
+    """
+    Indicate that a sandbox worker failed, rather than the code it executed.
+    """
+    pass
+
+
+class SandboxWorker(object):
+    """
+    A sandboxed Python process that executes code, started as codejail
+    starts one for the given command and limits.
+    """
+    def __init__(self, command, limits, preload):
+        self.user = command['user']
+        self.limits = limits
+        self.num_executions = 0
+
+        # As with codejail, the home directory must be readable by the sandbox user.
+        self.homedir = tempfile.mkdtemp(prefix='codejail-')
+        os.chmod(self.homedir, 0775)
+
+        cmd = []
+        if command['user']:
+            cmd.extend(['sudo', '-u', command['user'], 'TMPDIR=tmp'])
+        cmd.extend(command['cmdline_start'])
+        cmd.extend(['-c', WORKER_CODE, json.dumps([list(preload), limits])])
+        with open(os.devnull, 'w') as devnull:
+            self.process = subprocess.Popen(
+                cmd, cwd=self.homedir, env={'TMPDIR': 'tmp'},
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=devnull,
+            )
+
+    def execute(self, code, globals_dict, cwd, python_path):
+        """
+        Execute the code in the given directory, returning the worker's
+        response: the code's exit status and its result.
+
+        The request and the result are exchanged with the child that the
+        worker forks, over a socket in the directory.
+        """
+        request = {'code': code, 'globals': globals_dict, 'python_path': python_path}
+        realtime = self.limits.get('REALTIME')
+        deadline = time.time() + realtime + RESPONSE_TIMEOUT_MARGIN if realtime else None
+
+        socket_path = os.path.join(cwd, SOCKET_NAME)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            listener.bind(socket_path)
+            # As with the directory, the socket must be usable by the sandbox user.
+            os.chmod(socket_path, 0777)
+            listener.listen(1)
+            try:
+                self.process.stdin.write(cwd + '\n')
+                self.process.stdin.flush()
+            except IOError as error:
+                raise SandboxWorkerError(u'Could not send code to the sandbox worker: {}'.format(error))
+
+            self.num_executions += 1
+            result = self._exchange(listener, json.dumps(request), deadline)
+        finally:
+            listener.close()
+
+        response = json.loads(self._read_line(deadline))
+        response['result'] = result
+        return response
+
+    def _exchange(self, listener, request, deadline):
+        """
+        Send the request to the child that connects to the listener, and
+        return the result it sends back, which is empty if the child exits
+        without connecting or sending one.
+        """
+        stdout_fd = self.process.stdout.fileno()
+        ready, _, _ = select.select([listener, stdout_fd], [], [], _remaining(deadline))
+        if listener not in ready:
+            if not ready:
+                raise SandboxWorkerError(u'The sandbox worker did not respond')
+            return ''
+
+        connection, _ = listener.accept()
+        chunks = []
+        try:
+            connection.sendall(request)
+            connection.shutdown(socket.SHUT_WR)
+            while True:
+                ready, _, _ = select.select([connection], [], [], _remaining(deadline))
+                if not ready:
+                    raise SandboxWorkerError(u'The sandbox worker did not respond')
+                chunk = connection.recv(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+        except socket.error:
+            # The child exited before the exchange was done, as its status shows.
+            return ''
+        finally:
+            connection.close()
+        return ''.join(chunks)
+
+    def _read_line(self, deadline):
+        """
+        Return the next line the worker writes to stdout, by the deadline.
+        """
+        stdout_fd = self.process.stdout.fileno()
+        chunks = []
+        while not chunks or not chunks[-1].endswith('\n'):
+            ready, _, _ = select.select([stdout_fd], [], [], _remaining(deadline))
+            if not ready:
+                raise SandboxWorkerError(u'The sandbox worker did not respond')
+            chunk = os.read(stdout_fd, 65536)
+            if not chunk:
+                raise SandboxWorkerError(u'The sandbox worker exited')
+            chunks.append(chunk)
+        return ''.join(chunks)
+
+    def stop(self):
+        """
+        Stop the worker process and remove its home directory.
+        """
+        try:
+            self.process.stdin.close()
+            if self.process.poll() is None:
+                self.process.terminate()
+            self.process.wait()
+        except (IOError, OSError):
+            log.exception(u'Error stopping sandbox worker')
+        shutil.rmtree(self.homedir, ignore_errors=True)
+
+
+class SandboxPool(object):
+    """
+    A pool of up to `size` idle SandboxWorkers, each of which is replaced
+    after `max_executions` executions, or after any failure.  Workers are
+    started as needed, so more than `size` may run at once.
+
+    `command` and `limits` default to codejail's configuration for python,
+    when each worker starts.  `preload` is the list of modules that workers
+    import before executing any code.
+    """
+    def __init__(self, size, max_executions, preload=(), command=None, limits=None):
+        self.size = size
+        self.max_executions = max_executions
+        self.preload = preload
+        self.command = command
+        self.limits = limits
+        self._idle_workers = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def safe_exec(self, code, globals_dict, python_path=None, extra_files=None, slug=None):
+        """
+        Execute code as codejail.safe_exec.safe_exec does, in a worker.
+        """
+        homedir = self._create_homedir(python_path or [], extra_files or [])
+        worker = self._checkout()
+        try:
+            response = worker.execute(
+                code,
+                json_safe(globals_dict),
+                homedir,
+                [os.path.basename(pydir) for pydir in python_path or []],
+            )
+            result = json.loads(response['result']) if response['result'] else {}
+        except (SandboxWorkerError, ValueError, socket.error) as error:
+            log.warning(u'Sandbox worker failed executing code for %s: %s', slug, error)
+            worker.stop()
+            raise SafeExecException(u"Couldn't execute jailed code: {}".format(error))
+        finally:
+            remove_homedir(homedir, worker.user)
+
+        if response['status'] != 0:
+            worker.stop()
+            raise SafeExecException((
+                "Couldn't execute jailed code: stdout: {stdout!r}, "
+                "stderr: {stderr!r} with status code: {status}"
+            ).format(stdout='', stderr=result.get('stderr', ''), status=response['status']))
+
+        self._checkin(worker)
+        globals_dict.update(result['globals'])
+
+    def close(self):
+        """
+        Stop all of the idle workers.
+        """
+        with self._lock:
+            idle_workers, self._idle_workers = self._idle_workers, []
+        for worker in idle_workers:
+            worker.stop()
+
+    def _checkout(self):
+        """
+        Return an idle worker, or a new one if none are idle.
+        """
+        with self._lock:
+            if os.getpid() != self._pid:
+                # The idle workers belong to the process this one forked from.
+                self._idle_workers = []
+                self._pid = os.getpid()
+            if self._idle_workers:
+                return self._idle_workers.pop()
+        return SandboxWorker(
+            self.command if self.command is not None else jail_code.COMMANDS['python'],
+            self.limits if self.limits is not None else dict(jail_code.LIMITS),
+            self.preload,
+        )
+
+    def _checkin(self, worker):
+        """
+        Return the worker to the pool, or stop it if it has executed
+        enough code or the pool is full.
+        """
+        with self._lock:
+            if worker.num_executions < self.max_executions and len(self._idle_workers) < self.size:
+                self._idle_workers.append(worker)
+                return
+        worker.stop()
+
+    def _create_homedir(self, python_path, extra_files):
+        """
+        Create a directory for an execution, containing the extra files and
+        python path directories, as codejail does.
+        """
+        homedir = tempfile.mkdtemp(prefix='codejail-')
+        os.chmod(homedir, 0775)
+        tmptmp = os.path.join(homedir, 'tmp')
+        os.mkdir(tmptmp)
+        os.chmod(tmptmp, 0777)
+
+        extra_filenames = set()
+        for filename, contents in extra_files:
+            extra_filenames.add(filename)
+            with open(os.path.join(homedir, filename), 'wb') as extra_file:
+                extra_file.write(contents)
+        for pydir in python_path:
+            if pydir in extra_filenames:
+                continue
+            dest = os.path.join(homedir, os.path.basename(pydir))
+            if os.path.isdir(pydir):
+                shutil.copytree(pydir, dest)
+            else:
+                shutil.copyfile(pydir, dest)
+        return homedir
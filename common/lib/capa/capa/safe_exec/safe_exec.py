@@ -3,7 +3,9 @@
 from codejail.safe_exec import safe_exec as codejail_safe_exec
 from codejail.safe_exec import not_safe_exec as codejail_not_safe_exec
 from codejail.safe_exec import json_safe, SafeExecException
+from codejail.jail_code import is_configured
 from . import lazymod
+from .pool import SandboxPool
 from dogapi import dog_stats_api
 
 import hashlib
@@ -49,6 +51,24 @@ for name, modname in ASSUMED_IMPORTS:
 
 LAZY_IMPORTS = "".join(LAZY_IMPORTS)
 
+# The pool of sandbox workers that executes code, if configured.
+SANDBOX_POOL = None
+
+
+def configure_pool(size, max_executions=100):
+    """
+    Execute code in a pool of up to `size` idle, reusable sandbox workers,
+    which have already imported the assumed imports.  Each worker is replaced
+    after `max_executions` executions.  A `size` of 0 starts a new sandbox for
+    each execution.
+    """
+    global SANDBOX_POOL  # pylint: disable=global-statement
+    if SANDBOX_POOL is not None:
+        SANDBOX_POOL.close()
+    SANDBOX_POOL = None
+    if size:
+        SANDBOX_POOL = SandboxPool(size, max_executions, preload=[modname for _, modname in ASSUMED_IMPORTS])
+
 
 def update_hash(hasher, obj):
     """
@@ -133,6 +153,8 @@ def safe_exec(
     # Decide which code executor to use.
     if unsafely:
         exec_fn = codejail_not_safe_exec
+    elif SANDBOX_POOL is not None and is_configured("python"):
+        exec_fn = SANDBOX_POOL.safe_exec
     else:
         exec_fn = codejail_safe_exec
 
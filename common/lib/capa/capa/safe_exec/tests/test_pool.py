@@ -0,0 +1,135 @@
+"""Test pool.py"""
+
+import os.path
+import sys
+import unittest
+
+from codejail.safe_exec import SafeExecException
+
+from capa.safe_exec.pool import SandboxPool
+
+# Run workers with this Python, unsandboxed, so they can be tested without
+# configuring codejail.
+COMMAND = {'cmdline_start': [sys.executable], 'user': None}
+
+
+class TestSandboxPool(unittest.TestCase):
+    """Test executing code in a pool of sandbox workers."""
+
+    def setUp(self):
+        super(TestSandboxPool, self).setUp()
+        self.pool = self.create_pool()
+
+    def create_pool(self, size=1, max_executions=10, limits=None):
+        """Return a pool of unsandboxed workers, closed at the end of the test."""
+        pool = SandboxPool(
+            size, max_executions, preload=['math'], command=COMMAND, limits=limits or {'REALTIME': 5},
+        )
+        self.addCleanup(pool.close)
+        return pool
+
+    def test_set_values(self):
+        g = {'a': 17}
+        self.pool.safe_exec("import math\nb = a + 1\nc = math.floor(2.5)", g)
+        self.assertEqual(g['b'], 18)
+        self.assertEqual(g['c'], 2.0)
+
+    def test_python_path(self):
+        pylib = os.path.dirname(__file__) + "/test_files/pylib"
+        g = {}
+        self.pool.safe_exec("import constant; a = constant.THE_CONST", g, python_path=[pylib])
+        self.assertEqual(g['a'], 23)
+
+    def test_extra_files(self):
+        g = {}
+        self.pool.safe_exec(
+            "import extra; a = extra.VALUE",
+            g,
+            python_path=['extra.py'],
+            extra_files=[('extra.py', 'VALUE = 42\n')],
+        )
+        self.assertEqual(g['a'], 42)
+
+    def test_workers_reused(self):
+        self.pool.safe_exec("a = 1", {})
+        worker = self.pool._idle_workers[0]  # pylint: disable=protected-access
+        self.pool.safe_exec("a = 1", {})
+        self.assertEqual(self.pool._idle_workers, [worker])  # pylint: disable=protected-access
+        self.assertEqual(worker.num_executions, 2)
+
+    def test_workers_replaced_after_max_executions(self):
+        pool = self.create_pool(max_executions=2)
+        pool.safe_exec("a = 1", {})
+        pool.safe_exec("a = 1", {})
+        self.assertEqual(pool._idle_workers, [])  # pylint: disable=protected-access
+
+    def test_executions_isolated(self):
+        self.pool.safe_exec("import math; math.leaked = True", {})
+        g = {}
+        self.pool.safe_exec("import math; a = hasattr(math, 'leaked')", g)
+        self.assertFalse(g['a'])
+
+    def test_previous_executions_unreachable(self):
+        self.pool.safe_exec("secret = 'previous learner'", {})
+        g = {}
+        self.pool.safe_exec(
+            "import __main__, sys\n"
+            "needle = 'previous ' + 'learner'\n"
+            "found = hasattr(__main__, 'secret')\n"
+            "frame = sys._getframe().f_back\n"
+            "while frame:\n"
+            "    values = list(frame.f_globals.values()) + list(frame.f_locals.values())\n"
+            "    found = found or any(needle in repr(value) for value in values if value is not globals())\n"
+            "    frame = frame.f_back\n",
+            g,
+        )
+        self.assertFalse(g['found'])
+        self.assertNotIn('__name__', g)
+
+    @unittest.skipUnless(os.path.exists('/proc/self/mem'), 'Reading process memory needs /proc')
+    def test_previous_requests_not_in_memory(self):
+        # The halves are only next to each other in the previous request, so
+        # searching for them doesn't put what's searched for in memory.
+        halves = ['previous learner ', 'submission']
+        self.pool.safe_exec("answer = secret", {'secret': ''.join(halves)})
+        g = {'halves': halves}
+        self.pool.safe_exec(
+            "first, second = [str(half) for half in halves]\n"
+            "found = False\n"
+            "with open('/proc/self/maps') as maps:\n"
+            "    regions = [line.split() for line in maps]\n"
+            "with open('/proc/self/mem', 'rb', 0) as mem:\n"
+            "    for region in regions:\n"
+            "        if not region[1].startswith('r') or region[-1] == '[vsyscall]':\n"
+            "            continue\n"
+            "        start, end = [int(address, 16) for address in region[0].split('-')]\n"
+            "        try:\n"
+            "            mem.seek(start)\n"
+            "            data = mem.read(end - start)\n"
+            "        except (IOError, OSError, OverflowError, ValueError):\n"
+            "            continue\n"
+            "        index = data.find(first)\n"
+            "        while index >= 0 and not found:\n"
+            "            found = data.startswith(second, index + len(first))\n"
+            "            index = data.find(first, index + 1)\n"
+            "        data = None\n",
+            g,
+        )
+        self.assertFalse(g['found'])
+
+    def test_raising_exceptions(self):
+        with self.assertRaises(SafeExecException) as cm:
+            self.pool.safe_exec("1/0", {})
+        self.assertIn("ZeroDivisionError", cm.exception.message)
+        # The worker is replaced after a failure.
+        self.assertEqual(self.pool._idle_workers, [])  # pylint: disable=protected-access
+
+        g = {}
+        self.pool.safe_exec("a = 17", g)
+        self.assertEqual(g['a'], 17)
+
+    def test_realtime_limit(self):
+        pool = self.create_pool(limits={'REALTIME': 1})
+        with self.assertRaises(SafeExecException) as cm:
+            pool.safe_exec("import time; time.sleep(10)", {})
+        self.assertIn("status code: -9", cm.exception.message)
@@ -294,6 +294,12 @@ class StaticContent(object):
     def stream_data(self):
         yield self._data
 
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        yield self._data[first_byte:last_byte + 1]
+
     @staticmethod
     def serialize_asset_key_with_slash(asset_key):
         """
@@ -373,6 +379,22 @@ class ContentStore(object):
         '''
         raise NotImplementedError
 
+    def get_content_page_for_course(self, course_key, page_size, sort=None, cursor=None, filter_params=None,
+                                    start=0):
+        '''
+        Returns a page of up to page_size static assets for a course, the total number of assets, and
+        an opaque cursor for the next page (None if this is the last page). If no cursor is provided,
+        the page starts after the first start assets.
+
+        Unlike start, the cursor keeps its place in the listing as assets are added or removed, and its
+        page is found without scanning the assets before it.
+
+        The asset data dictionaries have the same keys as those of get_all_content_for_course.
+
+        Raises ValueError if the cursor is invalid.
+        '''
+        raise NotImplementedError
+
     def delete_all_course_assets(self, course_key):
         """
         Delete all of the assets which use this course_key as an identifier
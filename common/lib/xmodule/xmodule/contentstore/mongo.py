@@ -1,12 +1,15 @@
 """
 MongoDB/GridFS-level code for the contentstore.
 """
+import base64
+import datetime
 import os
 import json
 import pymongo
 import gridfs
 from gridfs.errors import NoFile
 from fs.osfs import OSFS
+from bson import json_util
 from bson.son import SON
 
 from mongodb_proxy import autoretry_read
@@ -18,6 +21,18 @@ from xmodule.util.misc import escape_invalid_characters
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 from .content import StaticContent, ContentStore, StaticContentStream
 
+# The fields of an asset's fs.files entry which are kept in its summary, for listing the assets of a course.
+ASSET_SUMMARY_FIELDS = (
+    'filename', 'displayname', 'contentType', 'uploadDate', 'length', 'chunkSize', 'md5', 'locked',
+    'thumbnail_location', 'import_path', 'content_son',
+)
+
+# The fields of a summary which identify its asset, and aren't returned to callers.
+ASSET_SUMMARY_KEY_FIELDS = ('org', 'course', 'run', 'category', 'name')
+
+# Number of GridFS chunks inserted at a time when copying assets.
+COPY_CHUNKS_BATCH_SIZE = 16
+
 
 class MongoContentStore(ContentStore):
     """
@@ -47,6 +62,12 @@ class MongoContentStore(ContentStore):
         self.fs_files = mongo_db[bucket + ".files"]  # the underlying collection GridFS uses
         self.chunks = mongo_db[bucket + ".chunks"]
 
+        # A summary of each asset's fs.files entry, indexed for listing the assets of a course, and
+        # the courses whose summaries are complete.  A course's summaries are built from fs.files upon
+        # its first listing, and are kept up to date as its assets are saved, changed and deleted.
+        self.asset_summary = mongo_db[bucket + ".asset_summary"]
+        self.asset_summary_courses = mongo_db[bucket + ".asset_summary_courses"]
+
     def close_connections(self):
         """
         Closes any open connections to the underlying databases
@@ -72,9 +93,13 @@ class MongoContentStore(ContentStore):
         elif collections:
             self.fs_files.drop()
             self.chunks.drop()
+            self.asset_summary.drop()
+            self.asset_summary_courses.drop()
         else:
             self.fs_files.remove({})
             self.chunks.remove({})
+            self.asset_summary.remove({})
+            self.asset_summary_courses.remove({})
 
         if connections:
             self.close_connections()
@@ -100,6 +125,7 @@ class MongoContentStore(ContentStore):
             else:
                 fp.write(content.data)
 
+        self._save_summary(self.fs_files.find_one({'_id': content_id}))
         return content
 
     def delete(self, location_or_id):
@@ -110,6 +136,7 @@ class MongoContentStore(ContentStore):
             location_or_id, _ = self.asset_db_key(location_or_id)
         # Deletes of non-existent files are considered successful
         self.fs.delete(location_or_id)
+        self.asset_summary.remove({'_id': location_or_id})
 
     @autoretry_read()
     def find(self, location, throw_on_not_found=True, as_stream=False):
@@ -209,6 +236,105 @@ class MongoContentStore(ContentStore):
             course_key, start=start, maxresults=maxresults, get_thumbnails=False, sort=sort, filter_params=filter_params
         )
 
+    @autoretry_read()
+    def get_content_page_for_course(self, course_key, page_size, sort=None, cursor=None, filter_params=None,
+                                    start=0):
+        """
+        See :meth:`.ContentStore.get_content_page_for_course`
+
+        Pages are read from the course's asset summaries, in the order of the sort field and then the
+        asset name, which is unique within the course.  The cursor holds the values of these fields for
+        the last asset of the page, so the next page is found by a range query on an index.
+        """
+        self._ensure_course_summary(course_key)
+        query = summary_query_for_course(course_key, 'asset')
+        if filter_params:
+            query.update(filter_params)
+        total_count = self.asset_summary.find(query).count()
+
+        sort_field, direction = sort[0] if sort else ('uploadDate', pymongo.DESCENDING)
+        skip = 0
+        if cursor is not None:
+            last_value, last_name = decode_asset_cursor(cursor)
+            after = '$gt' if direction == pymongo.ASCENDING else '$lt'
+            query['$or'] = [
+                {sort_field: {after: last_value}},
+                {sort_field: last_value, 'name': {after: last_name}},
+            ]
+        else:
+            skip = start
+
+        # Read one more than the page, to find whether there's another page.
+        assets = list(self.asset_summary.find(
+            query, sort=[(sort_field, direction), ('name', direction)], skip=skip, limit=page_size + 1
+        ))
+        next_cursor = None
+        if len(assets) > page_size:
+            assets = assets[:page_size]
+            next_cursor = encode_asset_cursor(assets[-1].get(sort_field), assets[-1]['name'])
+
+        for asset in assets:
+            asset['asset_key'] = course_key.make_asset_key(asset['category'], asset['name'])
+            for field in ASSET_SUMMARY_KEY_FIELDS:
+                del asset[field]
+        return assets, total_count, next_cursor
+
+    def _make_summary(self, fs_entry):
+        """
+        Returns the summary of the asset of the given fs.files entry.
+        """
+        asset_son = fs_entry.get('content_son', fs_entry['_id'])
+        summary = {field: fs_entry[field] for field in ASSET_SUMMARY_FIELDS if field in fs_entry}
+        summary.update({
+            '_id': self.make_id_son(fs_entry),
+            'org': asset_son['org'],
+            'course': asset_son['course'],
+            'run': asset_son.get('run'),
+            'category': asset_son['category'],
+            'name': asset_son['name'],
+        })
+        return summary
+
+    def _save_summary(self, fs_entry):
+        """
+        Saves the summary of the asset of the given fs.files entry, if there is one.
+        """
+        if fs_entry is not None:
+            summary = self._make_summary(fs_entry)
+            self.asset_summary.update({'_id': summary['_id']}, summary, upsert=True)
+
+    def _ensure_course_summary(self, course_key):
+        """
+        Builds the summaries of the course's assets from fs.files, unless they're already complete.
+        """
+        course_id = summary_course_id(course_key)
+        if self.asset_summary_courses.find_one({'_id': course_id}) is not None:
+            return
+
+        self.asset_summary.remove(summary_query_for_course(course_key))
+        bulk = self.asset_summary.initialize_unordered_bulk_op()
+        summary_ids = []
+        for fs_entry in self.fs_files.find(query_for_course(course_key)):
+            summary = self._make_summary(fs_entry)
+            # Upserted, since the asset may be saved while its course's summaries are built.
+            bulk.find({'_id': summary['_id']}).upsert().replace_one(summary)
+            summary_ids.append(summary['_id'])
+        if summary_ids:
+            bulk.execute()
+            # An asset deleted while the summaries were built may have had its summary removed before
+            # the summary was upserted above, so the summaries of assets which are no longer in fs.files
+            # are removed again.  The deletes of assets from now on remove their summaries themselves.
+            existing_ids = set(
+                _hashable_id(self.make_id_son(fs_entry))
+                for fs_entry in self.fs_files.find({'_id': {'$in': summary_ids}}, {'_id': True})
+            )
+            deleted_ids = [summary_id for summary_id in summary_ids if _hashable_id(summary_id) not in existing_ids]
+            if deleted_ids:
+                self.asset_summary.remove({'_id': {'$in': deleted_ids}})
+        self.asset_summary_courses.update(
+            {'_id': course_id}, {'_id': course_id, 'built_at': datetime.datetime.utcnow()}, upsert=True
+        )
+
     def remove_redundant_content_for_courses(self):
         """
         Finds and removes all redundant files (Mac OS metadata files with filename ".DS_Store"
@@ -227,6 +353,7 @@ class MongoContentStore(ContentStore):
                 self.fs.delete(asset[prefix])
 
             self.fs_files.remove(query)
+        self.asset_summary.remove({'category': 'asset', 'name': {'$regex': ASSET_IGNORE_REGEX}})
         return assets_to_delete
 
     @autoretry_read()
@@ -311,6 +438,9 @@ class MongoContentStore(ContentStore):
         result = self.fs_files.update({'_id': asset_db_key}, {"$set": attr_dict}, upsert=False)
         if not result.get('updatedExisting', True):
             raise NotFoundError(asset_db_key)
+        summary_attrs = {attr: value for attr, value in attr_dict.iteritems() if attr in ASSET_SUMMARY_FIELDS}
+        if summary_attrs:
+            self.asset_summary.update({'_id': asset_db_key}, {"$set": summary_attrs}, upsert=False)
 
     @autoretry_read()
     def get_attrs(self, location):
@@ -333,17 +463,16 @@ class MongoContentStore(ContentStore):
         """
         See :meth:`.ContentStore.copy_all_course_assets`
 
-        This implementation fairly expensively copies all of the data
+        This implementation copies the GridFS chunks of each asset within the database, a batch at a
+        time, rather than reading and rewriting the whole of the asset's data.
         """
-        source_query = query_for_course(source_course_key)
-        # it'd be great to figure out how to do all of this on the db server and not pull the bits over
-        for asset in self.fs_files.find(source_query):
-            asset_key = self.make_id_son(asset)
-            # don't convert from string until fs access
-            source_content = self.fs.get(asset_key)
-            if isinstance(asset_key, basestring):
-                asset_key = AssetKey.from_string(asset_key)
-                __, asset_key = self.asset_db_key(asset_key)
+        self._ensure_course_summary(source_course_key)
+        for asset in self.asset_summary.find(summary_query_for_course(source_course_key)):
+            source_id = self.make_id_son(asset)
+            if isinstance(source_id, basestring):
+                __, asset_key = self.asset_db_key(AssetKey.from_string(source_id))
+            else:
+                asset_key = SON(source_id)
             asset_key['org'] = dest_course_key.org
             asset_key['course'] = dest_course_key.course
             if getattr(dest_course_key, 'deprecated', False):  # remove the run if exists
@@ -356,17 +485,38 @@ class MongoContentStore(ContentStore):
                     dest_course_key.make_asset_key(asset_key['category'], asset_key['name']).for_branch(None)
                 )
 
-            self.fs.put(
-                source_content.read(),
-                _id=asset_id, filename=asset['filename'], content_type=asset['contentType'],
-                displayname=asset['displayname'], content_son=asset_key,
+            # As in save, the existing asset must be deleted since its _id is reused.
+            self.delete(asset_id)
+            chunks = []
+            for chunk in self.chunks.find({'files_id': source_id}, sort=[('n', pymongo.ASCENDING)]):
+                del chunk['_id']
+                chunk['files_id'] = asset_id
+                chunks.append(chunk)
+                if len(chunks) == COPY_CHUNKS_BATCH_SIZE:
+                    self.chunks.insert(chunks)
+                    chunks = []
+            if chunks:
+                self.chunks.insert(chunks)
+
+            # The fs.files entry is inserted last, as GridFS does, so the asset isn't found until it's whole.
+            fs_entry = {
+                '_id': asset_id,
+                'filename': asset['filename'],
+                'contentType': asset['contentType'],
+                'displayname': asset['displayname'],
+                'content_son': asset_key,
                 # thumbnail is not technically correct but will be functionally correct as the code
                 # only looks at the name which is not course relative.
-                thumbnail_location=asset['thumbnail_location'],
-                import_path=asset['import_path'],
-                # getattr b/c caching may mean some pickled instances don't have attr
-                locked=asset.get('locked', False)
-            )
+                'thumbnail_location': asset.get('thumbnail_location'),
+                'import_path': asset.get('import_path'),
+                'locked': asset.get('locked', False),
+                'length': asset['length'],
+                'chunkSize': asset['chunkSize'],
+                'md5': asset.get('md5'),
+                'uploadDate': datetime.datetime.utcnow(),
+            }
+            self.fs_files.insert(fs_entry)
+            self._save_summary(fs_entry)
 
     def delete_all_course_assets(self, course_key):
         """
@@ -379,6 +529,8 @@ class MongoContentStore(ContentStore):
         for asset in matching_assets:
             asset_key = self.make_id_son(asset)
             self.fs.delete(asset_key)
+        self.asset_summary.remove(summary_query_for_course(course_key))
+        self.asset_summary_courses.remove({'_id': summary_course_id(course_key)})
 
     # codifying the original order which pymongo used for the dicts coming out of location_to_dict
     # stability of order is more important than sanity of order as any changes to order make things
@@ -501,6 +653,21 @@ class MongoContentStore(ContentStore):
             sparse=True,
             background=True
         )
+        # Indexes needed by `get_content_page_for_course`, whose pages are sorted by either `uploadDate` or
+        # `displayname`, then by `name`.  They also serve the queries for all of the summaries of a course.
+        for sort_field in ['uploadDate', 'displayname']:
+            create_collection_index(
+                self.asset_summary,
+                [
+                    ('org', pymongo.ASCENDING),
+                    ('course', pymongo.ASCENDING),
+                    ('run', pymongo.ASCENDING),
+                    ('category', pymongo.ASCENDING),
+                    (sort_field, pymongo.ASCENDING),
+                    ('name', pymongo.ASCENDING)
+                ],
+                background=True
+            )
 
 
 def query_for_course(course_key, category=None):
@@ -524,3 +691,55 @@ def query_for_course(course_key, category=None):
     else:
         dbkey['{}.run'.format(prefix)] = course_key.run
     return dbkey
+
+
+def summary_course_id(course_key):
+    """
+    Returns the identifier of the given course within asset summaries.  As in the _id of the assets of
+    deprecated courses, there's no run.
+    """
+    return SON([
+        ('org', course_key.org),
+        ('course', course_key.course),
+        ('run', None if getattr(course_key, 'deprecated', False) else course_key.run),
+    ])
+
+
+def summary_query_for_course(course_key, category=None):
+    """
+    Construct a SON object that will query for the summaries of all assets possibly limited to the
+    given type (thumbnail v assets) in the course
+    """
+    dbkey = summary_course_id(course_key)
+    if category:
+        dbkey['category'] = category
+    return dbkey
+
+
+def _hashable_id(asset_id):
+    """
+    Returns a hashable equivalent of the given fs.files _id, which is either a string or a SON.
+    """
+    if isinstance(asset_id, basestring):
+        return asset_id
+    return tuple(asset_id.items())
+
+
+def encode_asset_cursor(last_value, last_name):
+    """
+    Returns the opaque cursor of the page of assets after the asset with the given sort field value and name.
+    """
+    return base64.urlsafe_b64encode(json_util.dumps([last_value, last_name]))
+
+
+def decode_asset_cursor(cursor):
+    """
+    Returns the sort field value and name of the last asset of the page before the given cursor.
+
+    Raises ValueError if the cursor is invalid.
+    """
+    try:
+        last_value, last_name = json_util.loads(base64.urlsafe_b64decode(str(cursor)))
+    except (TypeError, ValueError, UnicodeEncodeError):
+        raise ValueError(u'Invalid asset cursor: {}'.format(cursor))
+    return last_value, last_name
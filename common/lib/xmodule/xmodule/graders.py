@@ -12,6 +12,7 @@ import sys
 from collections import OrderedDict
 from datetime import datetime
 
+import numpy
 from contracts import contract
 from pytz import UTC
 
@@ -142,6 +143,62 @@ def aggregate_scores(scores):
     return all_total, graded_total
 
 
+class ScoreMatrix(object):
+    """
+    The graded totals of the graded subsections of many learners, as a
+    matrix of learners x subsections, for grading all learners at once.
+
+    formats: A list of the format of each subsection (column).
+    earned, possible: Two-dimensional arrays of the earned and possible
+        graded totals of each learner (row) for each subsection (column).
+        A subsection is not in a learner's grade sheet if its possible
+        value is 0.
+    """
+    def __init__(self, formats, earned, possible):
+        self.formats = list(formats)
+        self.earned = numpy.asarray(earned, dtype=float)
+        self.possible = numpy.asarray(possible, dtype=float)
+
+    def __len__(self):
+        return self.earned.shape[0]
+
+    @classmethod
+    def from_grade_sheets(cls, grade_sheets, columns=None):
+        """
+        Returns a ScoreMatrix for the given list of grade sheets, as
+        passed to CourseGrader.grade.
+
+        columns is a list of (format, subsection key) tuples, in course
+        order.  Defaults to the subsections of all the grade sheets in the
+        order they are first found.
+        """
+        if columns is None:
+            columns = OrderedDict(
+                ((subsection_format, subsection_key), None)
+                for grade_sheet in grade_sheets
+                for subsection_format, subsection_grades in grade_sheet.iteritems()
+                for subsection_key in subsection_grades
+            ).keys()
+
+        earned = numpy.zeros((len(grade_sheets), len(columns)))
+        possible = numpy.zeros((len(grade_sheets), len(columns)))
+        for row, grade_sheet in enumerate(grade_sheets):
+            for column, (subsection_format, subsection_key) in enumerate(columns):
+                subsection_grade = grade_sheet.get(subsection_format, {}).get(subsection_key)
+                if subsection_grade is not None:
+                    earned[row, column] = subsection_grade.graded_total.earned
+                    possible[row, column] = subsection_grade.graded_total.possible
+        return cls([subsection_format for subsection_format, _ in columns], earned, possible)
+
+    def columns_for_format(self, subsection_format):
+        """
+        Returns the (earned, possible) matrices of the subsections of
+        the given format, in course order.
+        """
+        columns = [column for column, column_format in enumerate(self.formats) if column_format == subsection_format]
+        return self.earned[:, columns], self.possible[:, columns]
+
+
 def invalid_args(func, argdict):
     """
     Given a function and a dictionary of arguments, returns a set of arguments
@@ -242,6 +299,14 @@ class CourseGrader(object):
         '''Given a grade sheet, return a dict containing grading information'''
         raise NotImplementedError
 
+    def grade_matrix(self, score_matrix):
+        """
+        Given a ScoreMatrix, returns an array of the percent grade of each
+        learner in it, the same as grade() would for each learner's grade
+        sheet, computed for all learners at once.
+        """
+        raise NotImplementedError
+
 
 class WeightedSubsectionsGrader(CourseGrader):
     """
@@ -287,6 +352,23 @@ class WeightedSubsectionsGrader(CourseGrader):
             'grade_breakdown': grade_breakdown
         }
 
+    def grade_matrix(self, score_matrix):
+        total_percents = numpy.zeros(len(score_matrix))
+        for weighted_percents in self.grade_breakdown_matrix(score_matrix).itervalues():
+            total_percents += weighted_percents
+        return total_percents
+
+    def grade_breakdown_matrix(self, score_matrix):
+        """
+        Given a ScoreMatrix, returns an OrderedDict of the array of the
+        weighted percent of each learner in it for each category, the same
+        as in the grade_breakdown of grade() for each learner's grade sheet.
+        """
+        grade_breakdowns = OrderedDict()
+        for subgrader, assignment_type, weight in self.subgraders:
+            grade_breakdowns[assignment_type] = subgrader.grade_matrix(score_matrix) * weight
+        return grade_breakdowns
+
 
 class AssignmentFormatGrader(CourseGrader):
     """
@@ -445,6 +527,44 @@ class AssignmentFormatGrader(CourseGrader):
             # No grade_breakdown here
         }
 
+    def grade_matrix(self, score_matrix):
+        earned, possible = score_matrix.columns_for_format(self.type)
+        graded = possible > 0
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            percents = numpy.where(graded, earned / numpy.where(graded, possible, 1), 0.0)
+
+        num_graded = graded.sum(axis=1)
+        num_sections = numpy.maximum(self.min_count, num_graded)
+
+        # Placeholder sections are scored 0 and follow all graded sections,
+        # so grade() drops them before any graded section.
+        num_placeholders = num_sections - num_graded
+        num_dropped_graded = numpy.maximum(self.drop_count - num_placeholders, 0)
+        dropped = self._lowest_sections(percents, graded, num_dropped_graded)
+
+        # Sum in section order, as grade() does, so results are identical.
+        total_percents = numpy.zeros(len(score_matrix))
+        for column in range(percents.shape[1]):
+            total_percents += numpy.where(graded[:, column] & ~dropped[:, column], percents[:, column], 0.0)
+
+        num_counted = num_sections - self.drop_count
+        return numpy.where(num_counted > 0, total_percents / numpy.maximum(num_counted, 1), total_percents)
+
+    @staticmethod
+    def _lowest_sections(percents, graded, num_lowest):
+        """
+        Returns a boolean matrix marking, for each learner, the given number
+        of lowest scored graded sections.  As in grade(), of equally scored
+        sections, the later ones are the lower.
+        """
+        num_learners, num_columns = percents.shape
+        # A stable sort of the reversed columns orders equal scores latest first.
+        keys = numpy.where(graded, percents, numpy.inf)[:, ::-1]
+        order = numpy.argsort(keys, axis=1, kind='mergesort')
+        ranks = numpy.empty_like(order)
+        ranks[numpy.arange(num_learners)[:, None], order] = numpy.arange(num_columns)
+        return graded & (ranks[:, ::-1] < num_lowest[:, None])
+
 
 def _iter_graded(scores):
     """
@@ -682,12 +682,12 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         else:
             return ParentLocationCache()
 
-    def _compute_metadata_inheritance_tree(self, course_id):
-        '''
-        Find all inheritable fields from all xblocks in the course which may define inheritable data
-        '''
+    def _inheritance_query(self, course_id):
+        """
+        Return the query and record filter for finding the course's containers and their
+        inheritable metadata, from which the metadata inheritance tree is computed
+        """
         # get all collections in the course, this query should not return any leaf nodes
-        course_id = self.fill_in_run(course_id)
         query = SON([
             ('_id.tag', 'i4x'),
             ('_id.org', course_id.org),
@@ -705,9 +705,13 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
         for field_name in InheritanceMixin.fields:
             record_filter['metadata.{0}'.format(field_name)] = 1
 
-        # call out to the DB
-        resultset = self.collection.find(query, record_filter)
+        return query, record_filter
 
+    def _containers_by_url(self, resultset, course_id):
+        """
+        Return the containers in the resultset of an inheritance query keyed by their published
+        location url, and the url of the course root if it is among them
+        """
         # it's ok to keep these as deprecated strings b/c the overall cache is indexed by course_key and this
         # is a dictionary relative to that course
         results_by_url = {}
@@ -733,39 +737,161 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             if location.category == 'course':
                 root = location_url
 
-        # now traverse the tree and compute down the inherited metadata
-        metadata_to_inherit = {}
+        return results_by_url, root
 
-        def _compute_inherited_metadata(url):
-            """
-            Helper method for computing inherited metadata for a specific location url
-            """
-            my_metadata = results_by_url[url].get('metadata', {})
-
-            # go through all the children and recurse, but only if we have
-            # in the result set. Remember results will not contain leaf nodes
-            for child in results_by_url[url].get('definition', {}).get('children', []):
-                if child in results_by_url:
-                    new_child_metadata = copy.deepcopy(my_metadata)
-                    new_child_metadata.update(results_by_url[child].get('metadata', {}))
-                    results_by_url[child]['metadata'] = new_child_metadata
-                    metadata_to_inherit[child] = new_child_metadata
-                    _compute_inherited_metadata(child)
-                else:
-                    # this is likely a leaf node, so let's record what metadata we need to inherit
-                    metadata_to_inherit[child] = my_metadata.copy()
-                # WARNING: 'parent' is not part of inherited metadata, but
-                # we're piggybacking on this recursive traversal to grab
-                # and cache the child's parent, as a performance optimization.
-                # The 'parent' key will be popped out of the dictionary during
-                # CachingDescriptorSystem.load_item
-                metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
+    def _inherit_metadata_down(self, results_by_url, url, metadata_to_inherit):
+        """
+        Record in metadata_to_inherit the metadata which each descendant of the container at url
+        inherits, where results_by_url[url]['metadata'] is the container's own and inherited metadata
+        """
+        my_metadata = results_by_url[url].get('metadata', {})
+
+        # go through all the children and recurse, but only if we have
+        # in the result set. Remember results will not contain leaf nodes
+        for child in results_by_url[url].get('definition', {}).get('children', []):
+            if child in results_by_url:
+                new_child_metadata = copy.deepcopy(my_metadata)
+                new_child_metadata.update(results_by_url[child].get('metadata', {}))
+                results_by_url[child]['metadata'] = new_child_metadata
+                metadata_to_inherit[child] = new_child_metadata
+                self._inherit_metadata_down(results_by_url, child, metadata_to_inherit)
+            else:
+                # this is likely a leaf node, so let's record what metadata we need to inherit
+                metadata_to_inherit[child] = my_metadata.copy()
+            # WARNING: 'parent' is not part of inherited metadata, but
+            # we're piggybacking on this recursive traversal to grab
+            # and cache the child's parent, as a performance optimization.
+            # The 'parent' key will be popped out of the dictionary during
+            # CachingDescriptorSystem.load_item
+            metadata_to_inherit[child].setdefault('parent', {})[self.get_branch_setting()] = url
+
+    def _compute_metadata_inheritance_tree(self, course_id):
+        '''
+        Find all inheritable fields from all xblocks in the course which may define inheritable data
+        '''
+        course_id = self.fill_in_run(course_id)
+        query, record_filter = self._inheritance_query(course_id)
+
+        # call out to the DB
+        results_by_url, root = self._containers_by_url(self.collection.find(query, record_filter), course_id)
 
+        # now traverse the tree and compute down the inherited metadata
+        metadata_to_inherit = {}
         if root is not None:
-            _compute_inherited_metadata(root)
+            self._inherit_metadata_down(results_by_url, root, metadata_to_inherit)
 
         return metadata_to_inherit
 
+    def _compute_metadata_inheritance_subtree(self, course_id, tree, location):
+        """
+        Return a copy of the course's metadata inheritance tree in which only the subtree of the
+        container at location is recomputed, after a change to the container's metadata or children.
+        Returns the tree itself if the container isn't in it (so nothing inherits from it), or None
+        if the whole tree must be recomputed.
+        """
+        url = unicode(as_published(location))
+        if url not in tree:
+            return tree
+        branch = self.get_branch_setting()
+        parent_url = tree[url].get('parent', {}).get(branch)
+        if parent_url is None:
+            # the tree was computed for another branch
+            return None
+
+        # fetch the subtree's containers a level at a time, along with the parent if it is the
+        # root, whose metadata isn't in the tree
+        query, record_filter = self._inheritance_query(course_id)
+        results_by_url = {}
+        level = set([url]) if parent_url in tree else set([url, parent_url])
+        while level:
+            query['_id.name'] = {'$in': [
+                course_id.make_usage_key_from_deprecated_string(level_url).block_id for level_url in level
+            ]}
+            level_results, __ = self._containers_by_url(self.collection.find(query, record_filter), course_id)
+            next_level = set()
+            for result_url, result in level_results.iteritems():
+                if result_url in level:
+                    results_by_url[result_url] = result
+                    if result_url != parent_url:
+                        for child in result.get('definition', {}).get('children', []):
+                            child_key = course_id.make_usage_key_from_deprecated_string(child)
+                            if child_key.category in BLOCK_TYPES_WITH_CHILDREN:
+                                next_level.add(child)
+            level = next_level.difference(results_by_url)
+
+        if url not in results_by_url:
+            return None
+        if parent_url in tree:
+            metadata = {key: value for key, value in tree[parent_url].iteritems() if key != 'parent'}
+        elif parent_url in results_by_url:
+            metadata = results_by_url[parent_url].get('metadata', {})
+        else:
+            return None
+        metadata = copy.deepcopy(metadata)
+        metadata.update(results_by_url[url].get('metadata', {}))
+
+        # remove the old subtree, since its blocks may have since moved or been deleted
+        new_tree = dict(tree)
+        children_by_parent = {}
+        for child_url, child_metadata in tree.iteritems():
+            children_by_parent.setdefault(child_metadata.get('parent', {}).get(branch), []).append(child_url)
+        to_remove = [url]
+        while to_remove:
+            for child_url in children_by_parent.pop(to_remove.pop(), []):
+                del new_tree[child_url]
+                to_remove.append(child_url)
+
+        results_by_url[url]['metadata'] = metadata
+        new_tree[url] = metadata
+        self._inherit_metadata_down(results_by_url, url, new_tree)
+        metadata.setdefault('parent', {})[branch] = parent_url
+        return new_tree
+
+    def _get_inheritance_tree_from_cache(self, course_id):
+        """
+        Return the version of the course's metadata inheritance tree in the caching
+        subsystem, and the tree, or None and {} if it isn't cached
+        """
+        version = self.metadata_inheritance_cache_subsystem.get(u'{}.version'.format(course_id))
+        if version is None:
+            return None, {}
+        return version, self.metadata_inheritance_cache_subsystem.get(u'{}.{}'.format(course_id, version), {})
+
+    def _set_inheritance_tree_in_cache(self, course_id, tree, base_version=None):
+        """
+        Write the course's metadata inheritance tree to the caching subsystem under a new version,
+        and then make that the current version, so that readers never see a partly written tree.
+
+        If base_version is given, then the tree is only written if the current version is still
+        base_version, and no other tree has been written in place of base_version. Returns whether
+        the tree was written.
+        """
+        version_key = u'{}.version'.format(course_id)
+        if base_version is not None:
+            # Checking the current version and then setting it isn't atomic, so each version may
+            # only be replaced by whoever adds its lock first, or concurrent updates of the same
+            # version would each overwrite the other's change.
+            lock_key = u'{}.{}.lock'.format(course_id, base_version)
+            if not self.metadata_inheritance_cache_subsystem.add(lock_key, True):
+                return False
+            if self.metadata_inheritance_cache_subsystem.get(version_key) != base_version:
+                return False
+        version = uuid4().hex
+        self.metadata_inheritance_cache_subsystem.set(u'{}.{}'.format(course_id, version), tree)
+        self.metadata_inheritance_cache_subsystem.set(version_key, version)
+        return True
+
+    def _set_request_inheritance_tree(self, course_id, tree):
+        """
+        Save the course's metadata inheritance tree in the request cache, if available
+        """
+        if self.request_cache is not None:
+            # we can't assume the 'metadatat_inheritance' part of the request cache dict has been
+            # defined
+            if 'metadata_inheritance' not in self.request_cache.data:
+                self.request_cache.data['metadata_inheritance'] = {}
+            self.request_cache.data['metadata_inheritance'][unicode(course_id)] = tree
+
     def _get_cached_metadata_inheritance_tree(self, course_id, force_refresh=False):
         '''
         Compute the metadata inheritance for the course.
@@ -780,7 +906,7 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
             # then look in any caching subsystem (e.g. memcached)
             if self.metadata_inheritance_cache_subsystem is not None:
-                tree = self.metadata_inheritance_cache_subsystem.get(unicode(course_id), {})
+                __, tree = self._get_inheritance_tree_from_cache(course_id)
             else:
                 logging.warning(
                     'Running MongoModuleStore without a metadata_inheritance_cache_subsystem. This is \
@@ -793,32 +919,56 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
 
             # now write out computed tree to caching subsystem (e.g. memcached), if available
             if self.metadata_inheritance_cache_subsystem is not None:
-                self.metadata_inheritance_cache_subsystem.set(unicode(course_id), tree)
+                self._set_inheritance_tree_in_cache(course_id, tree)
 
         # now populate a request_cache, if available. NOTE, we are outside of the
         # scope of the above if: statement so that after a memcache hit, it'll get
         # put into the request_cache
-        if self.request_cache is not None:
-            # we can't assume the 'metadatat_inheritance' part of the request cache dict has been
-            # defined
-            if 'metadata_inheritance' not in self.request_cache.data:
-                self.request_cache.data['metadata_inheritance'] = {}
-            self.request_cache.data['metadata_inheritance'][unicode(course_id)] = tree
+        self._set_request_inheritance_tree(course_id, tree)
 
         return tree
 
-    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None):
+    def _update_cached_metadata_inheritance_tree(self, course_id, location):
+        """
+        Update the course's cached metadata inheritance tree after a change to the block at location,
+        recomputing only the subtree which inherits from it. Returns the updated tree.
+        """
+        course_id = self.fill_in_run(course_id)
+        if self.metadata_inheritance_cache_subsystem is None or location.category == 'course':
+            return self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+        if location.category not in BLOCK_TYPES_WITH_CHILDREN:
+            # only containers pass on their metadata, so the tree hasn't changed
+            return self._get_cached_metadata_inheritance_tree(course_id)
+
+        version, tree = self._get_inheritance_tree_from_cache(course_id)
+        new_tree = self._compute_metadata_inheritance_subtree(course_id, tree, location) if tree else None
+        if new_tree is None:
+            return self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+        if new_tree is not tree and not self._set_inheritance_tree_in_cache(course_id, new_tree, version):
+            # another process changed the tree since it was read, so its change may be missing from new_tree
+            return self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+
+        self._set_request_inheritance_tree(course_id, new_tree)
+        return new_tree
+
+    def refresh_cached_metadata_inheritance_tree(self, course_id, runtime=None, changed_location=None):
         """
         Refresh the cached metadata inheritance tree for the org/course combination
         for location
 
         If given a runtime, it replaces the cached_metadata in that runtime. NOTE: failure to provide
         a runtime may mean that some objects report old values for inherited data.
+
+        If given the location of the only block that changed, then only the part of the tree which
+        inherits from that block is recomputed.
         """
         course_id = course_id.for_branch(None)
         if not self._is_in_bulk_operation(course_id):
             # below is done for side effects when runtime is None
-            cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
+            if changed_location is not None:
+                cached_metadata = self._update_cached_metadata_inheritance_tree(course_id, changed_location)
+            else:
+                cached_metadata = self._get_cached_metadata_inheritance_tree(course_id, force_refresh=True)
             if runtime:
                 runtime.cached_metadata = cached_metadata
 
@@ -1547,7 +1697,9 @@ class MongoModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase, Mongo
             xblock._edit_info = payload['edit_info']
 
             # recompute (and update) the metadata inheritance tree which is cached
-            self.refresh_cached_metadata_inheritance_tree(xblock.scope_ids.usage_id.course_key, xblock.runtime)
+            self.refresh_cached_metadata_inheritance_tree(
+                xblock.scope_ids.usage_id.course_key, xblock.runtime, changed_location=xblock.scope_ids.usage_id,
+            )
             # fire signal that we've written to DB
         except ItemNotFoundError:
             if not allow_not_found:
@@ -3,18 +3,23 @@ Segregation of pymongo functions from the data modeling mechanisms for split mod
 """
 import datetime
 import cPickle as pickle
+import itertools
 import math
+import os
+import threading
 import zlib
 import pymongo
 import pytz
 import re
 from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 from time import time
 
 # Import this just to export it
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -25,8 +30,10 @@ import logging
 
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
+from openedx.core.lib.cache_utils import ProcessLocalLRUCache, SingleFlight
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
+from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
@@ -44,6 +51,73 @@ def get_cache(alias):
     return caches[alias]
 
 
+# Process-local tier in front of the course_structure_cache, which is
+# created upon first use from the COURSE_STRUCTURE_LOCAL_CACHE setting.
+_LOCAL_STRUCTURE_CACHE = None
+
+
+def get_local_structure_cache():
+    """
+    Return the process-local cache of pickled course structures.
+
+    It is disabled unless limits are configured in the
+    COURSE_STRUCTURE_LOCAL_CACHE setting, as in:
+        COURSE_STRUCTURE_LOCAL_CACHE = {'MAX_ENTRIES': 20, 'MAX_BYTES': 200 * 1024 * 1024}
+    """
+    global _LOCAL_STRUCTURE_CACHE  # pylint: disable=global-statement
+    if _LOCAL_STRUCTURE_CACHE is None:
+        limits = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE', {}) if DJANGO_AVAILABLE else {}
+        _LOCAL_STRUCTURE_CACHE = ProcessLocalLRUCache(
+            max_entries=limits.get('MAX_ENTRIES', 0),
+            max_bytes=limits.get('MAX_BYTES', 0),
+        )
+    return _LOCAL_STRUCTURE_CACHE
+
+
+def _course_id_of(course_context):
+    """
+    Return the version and branch agnostic id of the given course_context,
+    used to group the course's entries in the local structure cache.
+    """
+    try:
+        return unicode(course_context.for_branch(None).version_agnostic())
+    except AttributeError:
+        return unicode(course_context) if course_context else None
+
+
+# Seconds a process waits for another process fetching the same structure,
+# before fetching it itself.
+STRUCTURE_FETCH_WAIT_TIMEOUT = 5
+
+# Locks, and the number of threads using each, of the structures which threads
+# of this process are fetching from mongo, by structure version.
+_STRUCTURE_FETCH_LOCKS = {}
+_STRUCTURE_FETCH_LOCKS_LOCK = threading.Lock()
+
+
+@contextmanager
+def structure_fetch_lock(key):
+    """
+    Hold the lock on fetching the structure with the given version, so that
+    threads which miss the cache for the same structure at once fetch it one
+    at a time, and all but the first can read it from the cache instead.
+    """
+    with _STRUCTURE_FETCH_LOCKS_LOCK:
+        lock, num_threads = _STRUCTURE_FETCH_LOCKS.get(key, (None, 0))
+        lock = lock or threading.Lock()
+        _STRUCTURE_FETCH_LOCKS[key] = (lock, num_threads + 1)
+    try:
+        with lock:
+            yield
+    finally:
+        with _STRUCTURE_FETCH_LOCKS_LOCK:
+            lock, num_threads = _STRUCTURE_FETCH_LOCKS[key]
+            if num_threads == 1:
+                del _STRUCTURE_FETCH_LOCKS[key]
+            else:
+                _STRUCTURE_FETCH_LOCKS[key] = (lock, num_threads - 1)
+
+
 def round_power_2(value):
     """
     Return value rounded up to the nearest power of 2.
@@ -225,16 +299,39 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+def structure_delta(structure_doc, base_doc):
+    """
+    Return the changes from base_doc to structure_doc, both in mongo format, as the list
+    of the blocks which were added or changed, and the list of [block_type, block_id]
+    of the blocks which were removed.
+    """
+    base_blocks = {(block['block_type'], block['block_id']): block for block in base_doc['blocks']}
+    changed_blocks = []
+    for block in structure_doc['blocks']:
+        if base_blocks.pop((block['block_type'], block['block_id']), None) != block:
+            changed_blocks.append(block)
+    return changed_blocks, [list(block_key) for block_key in base_blocks]
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
     The course structures are pickled and compressed when cached.
 
+    The uncompressed pickled structures are also kept in a bounded
+    process-local tier, so repeated reads of the same structure in a
+    worker skip the django cache and decompression.  Since structures
+    are keyed by their version, entries never go stale.  The pickled
+    data, rather than the structure object, is kept because callers
+    mutate the structures they read (e.g. loading definitions into
+    their blocks).
+
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
     def __init__(self):
         self.cache = None
+        self.local_cache = get_local_structure_cache()
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
@@ -247,17 +344,24 @@ class CourseStructureCache(object):
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
-            compressed_pickled_data = self.cache.get(key)
-            tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+            local_key = (_course_id_of(course_context), key)
+            pickled_data = self.local_cache.get(local_key)
+            tagger.tag(from_local_cache=str(pickled_data is not None).lower())
 
-            if compressed_pickled_data is None:
-                # Always log cache misses, because they are unexpected
-                tagger.sample_rate = 1
-                return None
+            if pickled_data is None:
+                compressed_pickled_data = self.cache.get(key)
+                tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
 
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+                if compressed_pickled_data is None:
+                    # Always log cache misses, because they are unexpected
+                    tagger.sample_rate = 1
+                    return None
+
+                tagger.measure('compressed_size', len(compressed_pickled_data))
+
+                pickled_data = zlib.decompress(compressed_pickled_data)
+                self.local_cache.set(local_key, pickled_data, len(pickled_data))
 
-            pickled_data = zlib.decompress(compressed_pickled_data)
             tagger.measure('uncompressed_size', len(pickled_data))
 
             return pickle.loads(pickled_data)
@@ -277,6 +381,14 @@ class CourseStructureCache(object):
 
             # Stuctures are immutable, so we set a timeout of "never"
             self.cache.set(key, compressed_pickled_data, None)
+            self.local_cache.set((_course_id_of(course_context), key), pickled_data, len(pickled_data))
+
+    def invalidate_course(self, course_context):
+        """
+        Remove all structures of the given course from the process-local cache.
+        """
+        course_id = _course_id_of(course_context)
+        self.local_cache.delete_matching(lambda local_key: local_key[0] == course_id)
 
 
 class MongoConnection(object):
@@ -285,11 +397,27 @@ class MongoConnection(object):
     """
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, **kwargs
+        asset_collection=None, retry_wait_time=0.1, read_threads=0, read_batch_size=100,
+        structure_snapshot_interval=0, **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        If read_threads is set, then queries for more than read_batch_size structures or
+        definitions by id are split into batches of that many ids, which are queried in
+        parallel by a pool of read_threads threads.
+
+        If structure_snapshot_interval is set, then new structures are stored as their
+        differences from their previous versions, except that every
+        structure_snapshot_interval'th version is stored in full.
         """
+        self.structure_snapshot_interval = structure_snapshot_interval
+        self.read_threads = read_threads
+        self.read_batch_size = read_batch_size
+        self._read_pool = None
+        self._read_pool_pid = None
+        self._read_pool_lock = threading.Lock()
+
         # Set a write concern of 1, which makes writes complete successfully to the primary
         # only before returning. Also makes pymongo report write errors.
         kwargs['w'] = 1
@@ -313,6 +441,35 @@ class MongoConnection(object):
         else:
             raise HeartbeatFailure("Can't connect to {}".format(self.database.name), 'mongo')
 
+    def _get_read_pool(self):
+        """
+        Return the pool of threads for parallel reads, creating it on first use in this process.
+        """
+        with self._read_pool_lock:
+            if self._read_pool_pid != os.getpid():
+                # A pool's threads don't survive forking, so each process needs its own.
+                self._read_pool = ThreadPool(self.read_threads)
+                self._read_pool_pid = os.getpid()
+            return self._read_pool
+
+    def _find_by_ids(self, ids, find_batch, tagger):
+        """
+        Return the list of documents found by calling find_batch with ids, or, if there
+        are too many ids, with each batch of them in parallel.
+
+        Arguments:
+            ids (list): The ids of the documents to find
+            find_batch: A function of a list of ids returning a list of the documents
+            tagger (Tagger): The timer to record the number of batches in
+        """
+        if not self.read_threads or len(ids) <= self.read_batch_size:
+            tagger.measure("batches", 1)
+            return find_batch(ids)
+
+        batches = [ids[start:start + self.read_batch_size] for start in xrange(0, len(ids), self.read_batch_size)]
+        tagger.measure("batches", len(batches))
+        return list(itertools.chain.from_iterable(self._get_read_pool().map(find_batch, batches)))
+
     def get_structure(self, key, course_context=None):
         """
         Get the structure from the persistence mechanism whose id is the given key.
@@ -324,25 +481,44 @@ class MongoConnection(object):
 
             structure = cache.get(key, course_context)
             tagger_get_structure.tag(from_cache=str(bool(structure)).lower())
-            if not structure:
-                # Always log cache misses, because they are unexpected
-                tagger_get_structure.sample_rate = 1
-
-                with TIMER.timer("get_structure.find_one", course_context) as tagger_find_one:
-                    doc = self.structures.find_one({'_id': key})
-                    if doc is None:
-                        log.warning(
-                            "doc was None when attempting to retrieve structure for item with key %s",
-                            unicode(key)
-                        )
-                        return None
-                    tagger_find_one.measure("blocks", len(doc['blocks']))
-                    structure = structure_from_mongo(doc, course_context)
-                    tagger_find_one.sample_rate = 1
-
-                cache.set(key, structure, course_context)
+            if structure:
+                return structure
+
+            # Always log cache misses, because they are unexpected
+            tagger_get_structure.sample_rate = 1
+
+            with structure_fetch_lock(key):
+                # Another thread may have fetched the structure while this one waited.
+                structure = cache.get(key, course_context)
+                tagger_get_structure.tag(from_concurrent_fetch=str(bool(structure)).lower())
+                if structure:
+                    return structure
+
+                # Only one process fetches the structure; the others wait for it to be cached.
+                return SingleFlight(cache.cache, wait_timeout=STRUCTURE_FETCH_WAIT_TIMEOUT).get_or_compute(
+                    u'course_structure.{}'.format(key),
+                    lambda: cache.get(key, course_context),
+                    lambda: self._fetch_structure(key, cache, course_context),
+                )
 
-            return structure
+    def _fetch_structure(self, key, cache, course_context=None):
+        """
+        Get the structure whose id is the given key from mongo, and add it to the cache.
+        """
+        with TIMER.timer("get_structure.find_one", course_context) as tagger_find_one:
+            doc = self.structures.find_one({'_id': key})
+            if doc is None:
+                log.warning(
+                    "doc was None when attempting to retrieve structure for item with key %s",
+                    unicode(key)
+                )
+                return None
+            tagger_find_one.measure("blocks", len(doc['blocks']))
+            structure = self._reassemble_structure(structure_from_mongo(doc, course_context), course_context)
+            tagger_find_one.sample_rate = 1
+
+        cache.set(key, structure, course_context)
+        return structure
 
     @autoretry_read()
     def find_structures_by_id(self, ids, course_context=None):
@@ -354,10 +530,17 @@ class MongoConnection(object):
         """
         with TIMER.timer("find_structures_by_id", course_context) as tagger:
             tagger.measure("requested_ids", len(ids))
-            docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find({'_id': {'$in': ids}})
-            ]
+
+            def find_batch(batch_ids):
+                """
+                Return the structures of the batch of ids.
+                """
+                return [
+                    self._reassemble_structure(structure_from_mongo(structure, course_context), course_context)
+                    for structure in self.structures.find({'_id': {'$in': batch_ids}})
+                ]
+
+            docs = self._find_by_ids(ids, find_batch, tagger)
             tagger.measure("structures", len(docs))
             return docs
 
@@ -371,13 +554,20 @@ class MongoConnection(object):
         """
         with TIMER.timer("find_course_blocks_by_id", course_context) as tagger:
             tagger.measure("requested_ids", len(ids))
-            docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find(
-                    {'_id': {'$in': ids}},
-                    {'blocks': {'$elemMatch': {'block_type': 'course'}}, 'root': 1}
-                )
-            ]
+
+            def find_batch(batch_ids):
+                """
+                Return the course blocks of the structures of the batch of ids.
+                """
+                return [
+                    self._reassemble_course_blocks(structure, course_context)
+                    for structure in self.structures.find(
+                        {'_id': {'$in': batch_ids}},
+                        {'blocks': {'$elemMatch': {'block_type': 'course'}}, 'root': 1, 'delta': 1}
+                    )
+                ]
+
+            docs = self._find_by_ids(ids, find_batch, tagger)
             tagger.measure("structures", len(docs))
             return docs
 
@@ -392,7 +582,7 @@ class MongoConnection(object):
         with TIMER.timer("find_structures_derived_from", course_context) as tagger:
             tagger.measure("base_ids", len(ids))
             docs = [
-                structure_from_mongo(structure, course_context)
+                self._reassemble_structure(structure_from_mongo(structure, course_context), course_context)
                 for structure in self.structures.find({'previous_version': {'$in': ids}})
             ]
             tagger.measure("structures", len(docs))
@@ -409,7 +599,7 @@ class MongoConnection(object):
         """
         with TIMER.timer("find_ancestor_structures", course_context) as tagger:
             docs = [
-                structure_from_mongo(structure, course_context)
+                self._reassemble_structure(structure_from_mongo(structure, course_context), course_context)
                 for structure in self.structures.find({
                     'original_version': original_version,
                     'blocks': {
@@ -426,13 +616,86 @@ class MongoConnection(object):
             tagger.measure("structures", len(docs))
             return docs
 
+    def _reassemble_structure(self, structure, course_context=None):
+        """
+        Return the complete structure, given a structure read from the database, which
+        may only hold the differences from its base structure.
+        """
+        delta = structure.pop('delta', None)
+        if delta is None:
+            return structure
+
+        base = self.get_structure(delta['base'], course_context)
+        if base is None:
+            raise ItemNotFoundError('Structure: {}'.format(delta['base']))
+        blocks = base['blocks']
+        for block_type, block_id in delta['removed']:
+            blocks.pop(BlockKey(block_type, block_id), None)
+        blocks.update(structure['blocks'])
+        structure['blocks'] = blocks
+        return structure
+
+    def _reassemble_course_blocks(self, doc, course_context=None):
+        """
+        Return the structure with only its course blocks, given the doc of a structure
+        read from the database with only its course blocks, which may only hold the
+        differences from its base structure.
+        """
+        if 'delta' not in doc:
+            return structure_from_mongo(doc, course_context)
+
+        # Unless the course block changed in this version, it is in the base structure
+        doc.setdefault('blocks', [])
+        structure = structure_from_mongo(doc, course_context)
+        delta = structure.pop('delta')
+        if not structure['blocks']:
+            base = self.get_structure(delta['base'], course_context)
+            if base is None:
+                raise ItemNotFoundError('Structure: {}'.format(delta['base']))
+            structure['blocks'] = {
+                block_key: block for block_key, block in base['blocks'].iteritems() if block_key.type == 'course'
+            }
+        return structure
+
+    def _delta_encode(self, doc, course_context=None):
+        """
+        Return the document to store for the structure in mongo format doc: either the
+        differences from its previous version, or doc itself, if the structure should be
+        stored in full.
+        """
+        base_id = doc.get('previous_version')
+        if base_id is None:
+            return doc
+
+        # A structure's previous version may not have been stored yet, when both were
+        # created in the same bulk operation.
+        base_doc = self.structures.find_one({'_id': base_id}, {'delta.depth': 1})
+        if base_doc is None:
+            return doc
+        depth = base_doc.get('delta', {}).get('depth', 0) + 1
+        if depth >= self.structure_snapshot_interval:
+            return doc
+
+        base = self.get_structure(base_id, course_context)
+        if base is None:
+            return doc
+        changed_blocks, removed_blocks = structure_delta(doc, structure_to_mongo(base, course_context))
+        delta_doc = dict(doc)
+        delta_doc['blocks'] = changed_blocks
+        delta_doc['delta'] = {'base': base_id, 'depth': depth, 'removed': removed_blocks}
+        return delta_doc
+
     def insert_structure(self, structure, course_context=None):
         """
         Insert a new structure into the database.
         """
         with TIMER.timer("insert_structure", course_context) as tagger:
             tagger.measure("blocks", len(structure["blocks"]))
-            self.structures.insert(structure_to_mongo(structure, course_context))
+            doc = structure_to_mongo(structure, course_context)
+            if self.structure_snapshot_interval:
+                doc = self._delta_encode(doc, course_context)
+                tagger.measure("stored_blocks", len(doc["blocks"]))
+            self.structures.insert(doc)
 
     def get_course_index(self, key, ignore_case=False):
         """
@@ -507,10 +770,16 @@ class MongoConnection(object):
             course_index['last_update'] = datetime.datetime.now(pytz.utc)
             self.course_index.update(query, course_index, upsert=False,)
 
+        # The course's heads have moved on, so free up the local cache entries
+        # of its earlier structures.
+        if course_context is not None:
+            CourseStructureCache().invalidate_course(course_context)
+
     def delete_course_index(self, course_key):
         """
         Delete the course_index from the persistence mechanism whose id is the given course_index
         """
+        CourseStructureCache().invalidate_course(course_key)
         with TIMER.timer("delete_course_index", course_key):
             query = {
                 key_attr: getattr(course_key, key_attr)
@@ -534,8 +803,11 @@ class MongoConnection(object):
         """
         with TIMER.timer("get_definitions", course_context) as tagger:
             tagger.measure('definitions', len(definitions))
-            definitions = self.definitions.find({'_id': {'$in': definitions}})
-            return definitions
+            return self._find_by_ids(
+                list(definitions),
+                lambda batch_ids: list(self.definitions.find({'_id': {'$in': batch_ids}})),
+                tagger,
+            )
 
     def insert_definition(self, definition, course_context=None):
         """
@@ -569,6 +841,10 @@ class MongoConnection(object):
         """
         Closes any open connections to the underlying databases
         """
+        with self._read_pool_lock:
+            if self._read_pool is not None and self._read_pool_pid == os.getpid():
+                self._read_pool.terminate()
+            self._read_pool = self._read_pool_pid = None
         self.database.connection.close()
 
     def mongo_wire_version(self):
@@ -86,6 +86,7 @@ from .caching_descriptor_system import CachingDescriptorSystem
 from xmodule.partitions.partitions_service import PartitionService
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
 from collections import defaultdict
@@ -116,6 +117,9 @@ log = logging.getLogger(__name__)
 # When blacklists are this, all children should be excluded
 EXCLUDE_ALL = '*'
 
+# The most definitions to fetch in one query when prefetching the definitions of a subtree
+DEFINITION_PREFETCH_BATCH_SIZE = 100
+
 
 new_contract('BlockUsageLocator', BlockUsageLocator)
 new_contract('BlockKey', BlockKey)
@@ -338,6 +342,22 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
             version_guid = course_key.as_object_id(version_guid)
             return self.db_connection.get_structure(version_guid, course_key)
 
+    def is_structure_editable(self, course_key, structure):
+        """
+        Return whether the active bulk operation on course_key may still edit the structure,
+        because it hasn't been saved yet, or it is the version of a branch which the bulk
+        operation has changed.
+        """
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        if not bulk_write_record.active:
+            return False
+        if structure['_id'] not in bulk_write_record.structures_in_db:
+            return True
+        return any(
+            bulk_write_record.structure_for_branch(branch) is structure
+            for branch in bulk_write_record.dirty_branches
+        )
+
     def update_structure(self, course_key, structure):
         """
         Update a course structure, respecting the current bulk operation status
@@ -426,9 +446,9 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
         bulk_write_record = self._get_bulk_ops_record(course_key)
         if bulk_write_record.active:
             # Only query for the definitions that aren't already cached.
-            for definition in bulk_write_record.definitions.values():
-                definition_id = definition.get('_id')
-                if definition_id in ids:
+            for definition_id in list(ids):
+                definition = bulk_write_record.definitions.get(definition_id)
+                if definition is not None:
                     ids.remove(definition_id)
                     definitions.append(definition)
 
@@ -823,8 +843,26 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                 del self.request_cache.data.setdefault('course_cache', {})[course_version_guid]
             except KeyError:
                 pass
+            self.request_cache.data.setdefault('structure_index_cache', {}).pop(course_version_guid, None)
         else:
             self.request_cache.data['course_cache'] = {}
+            self.request_cache.data['structure_index_cache'] = {}
+
+    def _get_structure_index(self, course_entry):
+        """
+        Return the StructureIndex of the course's structure, reusing the one built earlier
+        in this request for the same structure version, unless the structure may still be edited.
+        :param course_entry: the CourseEnvelope of the structure
+        """
+        structure = course_entry.structure
+        if self.request_cache is None or self.is_structure_editable(course_entry.course_key, structure):
+            return StructureIndex(structure)
+
+        index_cache = self.request_cache.data.setdefault('structure_index_cache', {})
+        structure_index = index_cache.get(structure['_id'])
+        if structure_index is None:
+            structure_index = index_cache[structure['_id']] = StructureIndex(structure)
+        return structure_index
 
     def _lookup_course(self, course_key, head_validation=True):
         """
@@ -1139,15 +1177,53 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             # The supplied UsageKey is of the wrong type, so it can't possibly be stored in this modulestore.
             raise ItemNotFoundError(usage_key)
 
+        # Lazily loaded definitions are only cached for the rest of the request by an enclosing bulk operation
+        prefetch_definitions = (
+            depth != 0 and kwargs.get('lazy', True) and self._is_in_bulk_operation(usage_key.course_key)
+        )
         with self.bulk_operations(usage_key.course_key):
             course = self._lookup_course(usage_key.course_key)
-            items = self._load_items(course, [BlockKey.from_usage_key(usage_key)], depth, **kwargs)
+            block_key = BlockKey.from_usage_key(usage_key)
+            items = self._load_items(course, [block_key], depth, **kwargs)
             if len(items) == 0:
                 raise ItemNotFoundError(usage_key)
             elif len(items) > 1:
                 log.debug("Found more than one item for '{}'".format(usage_key))
+            if prefetch_definitions:
+                self.prefetch_definitions(course, [block_key], depth)
             return items[0]
 
+    @contract(course_entry=CourseEnvelope, block_keys="list(BlockKey)", depth="int | None")
+    def prefetch_definitions(self, course_entry, block_keys, depth=0):
+        """
+        Fetch the definitions of the given blocks and their descendants out to depth which
+        haven't been loaded yet into the active bulk operation's cache, with one query per
+        DEFINITION_PREFETCH_BATCH_SIZE definitions, so that the blocks' lazily loaded definitions
+        don't each need their own query.
+
+        Arguments:
+            course_entry (CourseEnvelope): the course structure containing the blocks
+            block_keys (list): the BlockKeys of the roots of the subtrees
+            depth (int): how deep below the blocks to prefetch; None for all descendants
+        """
+        course_key = course_entry.course_key
+        bulk_write_record = self._get_bulk_ops_record(course_key)
+        if not bulk_write_record.active:
+            return
+
+        subtree_blocks = {}
+        for block_key in block_keys:
+            subtree_blocks = self.descendants(course_entry.structure['blocks'], block_key, depth, subtree_blocks)
+
+        pending_ids = list(set(
+            block.definition
+            for block in subtree_blocks.itervalues()
+            if block.definition is not None and not block.definition_loaded and
+            bulk_write_record.definitions.get(block.definition) is None
+        ))
+        for start in xrange(0, len(pending_ids), DEFINITION_PREFETCH_BATCH_SIZE):
+            self.get_definitions(course_key, pending_ids[start:start + DEFINITION_PREFETCH_BATCH_SIZE])
+
     def get_items(self, course_locator, settings=None, content=None, qualifiers=None, include_orphans=True, **kwargs):
         """
         Returns:
@@ -1199,11 +1275,21 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         if settings is None:
             settings = {}
+        structure_index = self._get_structure_index(course)
         if 'name' in qualifiers:
             # odd case where we don't search just confirm
             block_name = qualifiers.pop('name')
             block_ids = []
-            for block_id, block in course.structure['blocks'].iteritems():
+            if isinstance(block_name, six.string_types):
+                candidate_ids = structure_index.keys_by_id.get(block_name, [])
+            elif isinstance(block_name, (list, tuple, set, frozenset)):
+                candidate_ids = [
+                    block_id for name in set(block_name) for block_id in structure_index.keys_by_id.get(name, [])
+                ]
+            else:
+                candidate_ids = course.structure['blocks'].keys()
+            for block_id in candidate_ids:
+                block = course.structure['blocks'][block_id]
                 # Don't do an in comparison blindly; first check to make sure
                 # that the name qualifier we're looking at isn't a plain string;
                 # if it is a string, then it should match exactly. If it's other
@@ -1226,20 +1312,21 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         if 'children' in qualifiers:
             settings['children'] = qualifiers.pop('children')
 
-        # No need of these caches unless include_orphans is set to False
-        path_cache = None
-        parents_cache = None
-
-        if not include_orphans:
-            path_cache = {}
-            parents_cache = self.build_block_key_to_parents_mapping(course.structure)
+        # only look at blocks of the requested types, if any
+        block_types = self._block_types_matching(qualifiers.get('block_type'))
+        if block_types is None:
+            candidate_ids = course.structure['blocks'].keys()
+        else:
+            candidate_ids = [
+                block_id for block_type in block_types for block_id in structure_index.keys_by_type.get(block_type, [])
+            ]
 
-        for block_id, value in course.structure['blocks'].iteritems():
-            if _block_matches_all(value):
+        for block_id in candidate_ids:
+            if _block_matches_all(course.structure['blocks'][block_id]):
                 if not include_orphans:
                     if (  # pylint: disable=bad-continuation
                         block_id.type in DETACHED_XBLOCK_TYPES or
-                        self.has_path_to_root(block_id, course, path_cache, parents_cache)
+                        structure_index.has_path_to_root(block_id)
                     ):
                         items.append(block_id)
                 else:
@@ -1250,60 +1337,31 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
         else:
             return []
 
-    def build_block_key_to_parents_mapping(self, structure):
+    @staticmethod
+    def _block_types_matching(block_type_criteria):
         """
-        Given a structure, builds block_key to parents mapping for all block keys in structure
-        and returns it
-
-        :param structure: db json of course structure
-
-        :return dict: a dictionary containing mapping of block_keys against their parents.
+        Return the list of block types which the block_type qualifier can match, or None if
+        they can't be known without testing each block (or there's no block_type qualifier).
         """
-        children_to_parents = defaultdict(list)
-        for parent_key, value in structure['blocks'].iteritems():
-            for child_key in value.fields.get('children', []):
-                children_to_parents[child_key].append(parent_key)
-
-        return children_to_parents
+        if isinstance(block_type_criteria, six.string_types):
+            return [block_type_criteria]
+        if (  # pylint: disable=bad-continuation
+            isinstance(block_type_criteria, dict) and block_type_criteria.keys() == ['$in'] and
+            all(isinstance(block_type, six.string_types) for block_type in block_type_criteria['$in'])
+        ):
+            return list(set(block_type_criteria['$in']))
+        return None
 
-    def has_path_to_root(self, block_key, course, path_cache=None, parents_cache=None):
+    def has_path_to_root(self, block_key, course):
         """
-        Check recursively if an xblock has a path to the course root
+        Check if an xblock has a path to the course root
 
         :param block_key: BlockKey of the component whose path is to be checked
-        :param course: actual db json of course from structures
-        :param path_cache: a dictionary that records which modules have a path to the root so that we don't have to
-        double count modules if we're computing this for a list of modules in a course.
-        :param parents_cache: a dictionary containing mapping of block_key to list of its parents. Optionally, this
-        should be built for course structure to make this method faster.
+        :param course: the CourseEnvelope of the course structure
 
         :return Bool: whether or not component has path to the root
         """
-
-        if path_cache and block_key in path_cache:
-            return path_cache[block_key]
-
-        if parents_cache is None:
-            xblock_parents = self._get_parents_from_structure(block_key, course.structure)
-        else:
-            xblock_parents = parents_cache[block_key]
-
-        if len(xblock_parents) == 0 and block_key.type in ["course", "library"]:
-            # Found, xblock has the path to the root
-            if path_cache is not None:
-                path_cache[block_key] = True
-
-            return True
-
-        has_path = any(
-            self.has_path_to_root(xblock_parent, course, path_cache, parents_cache)
-            for xblock_parent in xblock_parents
-        )
-
-        if path_cache is not None:
-            path_cache[block_key] = has_path
-
-        return has_path
+        return self._get_structure_index(course).has_path_to_root(block_key)
 
     def get_parent_location(self, locator, **kwargs):
         """
@@ -1318,14 +1376,15 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             raise ItemNotFoundError(locator)
 
         course = self._lookup_course(locator.course_key)
-        all_parent_ids = self._get_parents_from_structure(BlockKey.from_usage_key(locator), course.structure)
+        structure_index = self._get_structure_index(course)
+        all_parent_ids = structure_index.get_parents(BlockKey.from_usage_key(locator))
 
         # Check and verify the found parent_ids are not orphans; Remove parent which has no valid path
         # to the course root
         parent_ids = [
             valid_parent
             for valid_parent in all_parent_ids
-            if self.has_path_to_root(valid_parent, course)
+            if structure_index.has_path_to_root(valid_parent)
         ]
 
         if len(parent_ids) == 0:
@@ -1349,16 +1408,10 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
 
         detached_categories = [name for name, __ in XBlock.load_tagged_classes("detached")]
         course = self._lookup_course(course_key)
-        items = set(course.structure['blocks'].keys())
-        items.remove(course.structure['root'])
-        blocks = course.structure['blocks']
-        for block_id, block_data in blocks.iteritems():
-            items.difference_update(BlockKey(*child) for child in block_data.fields.get('children', []))
-            if block_data.block_type in detached_categories:
-                items.discard(block_id)
         return [
             course_key.make_usage_key(block_type=block_id.type, block_id=block_id.id)
-            for block_id in items
+            for block_id in self._get_structure_index(course).parentless_keys()
+            if block_id.type not in detached_categories
         ]
 
     def get_course_index_info(self, course_key):
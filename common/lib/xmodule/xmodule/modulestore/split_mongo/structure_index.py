@@ -0,0 +1,82 @@
+"""
+Indexes of the blocks in a split modulestore structure.
+"""
+from collections import defaultdict
+
+# Block types which are the root of a course tree when they have no parents
+ROOT_BLOCK_TYPES = ('course', 'library')
+
+
+class StructureIndex(object):
+    """
+    Maps of a structure's blocks by their parents, type, and id, and the set of
+    blocks with a path to the course root, so that lookups needn't scan every
+    block in the structure.
+
+    A saved structure never changes, so its index is good for as long as its
+    version; it must not be used for a structure which is still being edited.
+    """
+    def __init__(self, structure):
+        self.root = structure['root']
+
+        # BlockKey: list of BlockKeys of the blocks with it as a child
+        self.parents = {}
+        # block_type: list of BlockKeys of that type
+        self.keys_by_type = defaultdict(list)
+        # block_id: list of BlockKeys with that block_id (the target of name searches)
+        self.keys_by_id = defaultdict(list)
+        for block_key, block_data in structure['blocks'].iteritems():
+            self.keys_by_type[block_key.type].append(block_key)
+            self.keys_by_id[block_key.id].append(block_key)
+            for child_key in block_data.fields.get('children', []):
+                child_parents = self.parents.setdefault(child_key, [])
+                # a block lists each parent once, even if it is the parent's child twice
+                if not child_parents or child_parents[-1] != block_key:
+                    child_parents.append(block_key)
+
+        self.reachable = self._find_reachable(structure['blocks'])
+
+    def _find_reachable(self, blocks):
+        """
+        Return the set of BlockKeys of the blocks which are, or descend from,
+        a root block with no parents.
+        """
+        to_visit = [
+            block_key for block_key in blocks
+            if block_key.type in ROOT_BLOCK_TYPES and block_key not in self.parents
+        ]
+        reachable = set(to_visit)
+        while to_visit:
+            block_data = blocks.get(to_visit.pop())
+            if block_data is None:
+                continue
+            for child_key in block_data.fields.get('children', []):
+                if child_key not in reachable:
+                    reachable.add(child_key)
+                    to_visit.append(child_key)
+        return reachable
+
+    def get_parents(self, block_key):
+        """
+        Return the list of BlockKeys of the block's parents.
+        """
+        return self.parents.get(block_key, [])
+
+    def has_path_to_root(self, block_key):
+        """
+        Return whether the block is a root block, or descends from one.
+        """
+        if block_key in self.reachable:
+            return True
+        return block_key.type in ROOT_BLOCK_TYPES and block_key not in self.parents
+
+    def parentless_keys(self):
+        """
+        Return the BlockKeys of the blocks which are nobody's child, other than the root.
+        """
+        return [
+            block_key
+            for block_keys in self.keys_by_type.itervalues()
+            for block_key in block_keys
+            if block_key not in self.parents and block_key != self.root
+        ]
@@ -8,6 +8,8 @@ import mimetypes
 from tempfile import mkdtemp
 import path
 import shutil
+import pymongo
+from mock import patch
 
 from opaque_keys.edx.locator import CourseLocator, AssetLocator
 from opaque_keys.edx.keys import AssetKey
@@ -165,6 +167,90 @@ class TestContentstore(unittest.TestCase):
         self.assertEqual(count, 0)
         self.assertEqual(course_assets, [])
 
+    @ddt.data(True, False)
+    def test_get_content_page(self, deprecated):
+        """
+        Test get_content_page_for_course
+        """
+        self.set_up_assets(deprecated)
+        names = []
+        cursor = None
+        for __ in range(len(self.course1_files)):
+            assets, count, cursor = self.contentstore.get_content_page_for_course(
+                self.course1_key, 2, sort=[('displayname', pymongo.DESCENDING)], cursor=cursor
+            )
+            self.assertEqual(count, len(self.course1_files))
+            names.extend(asset['asset_key'].name for asset in assets)
+            if cursor is None:
+                break
+        self.assertEqual(names, sorted(self.course1_files, reverse=True))
+
+        # Pages may also be requested by their start.
+        assets, count, __ = self.contentstore.get_content_page_for_course(
+            self.course1_key, 2, sort=[('displayname', pymongo.DESCENDING)], start=2
+        )
+        self.assertEqual(count, len(self.course1_files))
+        self.assertEqual([asset['asset_key'].name for asset in assets], names[2:4])
+
+        # The cursor keeps its place as assets are deleted and saved.
+        assets, __, cursor = self.contentstore.get_content_page_for_course(self.course1_key, 1)
+        self.contentstore.delete(assets[0]['asset_key'])
+        self.save_asset('picture3.jpg', self.course1_key.make_asset_key('asset', 'picture3.jpg'), 'picture3.jpg', False)
+        assets, count, __ = self.contentstore.get_content_page_for_course(self.course1_key, 5, cursor=cursor)
+        self.assertEqual(count, len(self.course1_files))
+        self.assertEqual(len(assets), len(self.course1_files) - 1)
+        self.assertNotIn('picture3.jpg', [asset['asset_key'].name for asset in assets])
+
+        with self.assertRaises(ValueError):
+            self.contentstore.get_content_page_for_course(self.course1_key, 2, cursor='not a cursor')
+
+    @ddt.data(True, False)
+    def test_content_page_summaries(self, deprecated):
+        """
+        Test that the asset summaries are built upon the first listing and kept up to date
+        """
+        self.set_up_assets(deprecated)
+        self.contentstore.asset_summary.remove({})
+        assets, count, __ = self.contentstore.get_content_page_for_course(self.course1_key, 5)
+        self.assertEqual(count, len(self.course1_files))
+
+        asset_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        self.contentstore.set_attr(asset_key, 'locked', True)
+        self.contentstore.set_attr(asset_key, 'displayname', 'renamed')
+        self.contentstore.delete(self.course1_key.make_asset_key('asset', self.course1_files[1]))
+        assets, count, __ = self.contentstore.get_content_page_for_course(self.course1_key, 5)
+        self.assertEqual(count, len(self.course1_files) - 1)
+        asset = next(asset for asset in assets if asset['asset_key'] == asset_key)
+        self.assertEqual((asset['locked'], asset['displayname']), (True, 'renamed'))
+
+        self.contentstore.delete_all_course_assets(self.course1_key)
+        __, count, __ = self.contentstore.get_content_page_for_course(self.course1_key, 5)
+        self.assertEqual(count, 0)
+
+    @ddt.data(True, False)
+    def test_content_page_summaries_deleted_while_built(self, deprecated):
+        """
+        Test that an asset deleted while its course's summaries are built isn't listed
+        """
+        self.set_up_assets(deprecated)
+        self.contentstore.asset_summary.remove({})
+        deleted_key = self.course1_key.make_asset_key('asset', self.course1_files[0])
+        make_summary = self.contentstore._make_summary  # pylint: disable=protected-access
+
+        def make_summary_and_delete(fs_entry):
+            """
+            Deletes the asset after its fs.files entry is read, but before its summary is saved.
+            """
+            summary = make_summary(fs_entry)
+            if summary['name'] == deleted_key.name:
+                self.contentstore.delete(deleted_key)
+            return summary
+
+        with patch.object(self.contentstore, '_make_summary', side_effect=make_summary_and_delete):
+            assets, count, __ = self.contentstore.get_content_page_for_course(self.course1_key, 5)
+        self.assertEqual(count, len(self.course1_files) - 1)
+        self.assertNotIn(deleted_key, [asset['asset_key'] for asset in assets])
+
     @ddt.data(True, False)
     def test_attrs(self, deprecated):
         """
@@ -190,11 +276,18 @@ class TestContentstore(unittest.TestCase):
             dest_key = dest_course.make_asset_key('asset', filename)
             source = self.contentstore.find(asset_key)
             copied = self.contentstore.find(dest_key)
-            for propname in ['name', 'content_type', 'length', 'locked']:
+            for propname in ['name', 'content_type', 'length', 'locked', 'content_digest', 'data']:
                 self.assertEqual(getattr(source, propname), getattr(copied, propname))
 
         __, count = self.contentstore.get_all_content_for_course(dest_course)
         self.assertEqual(count, len(self.course1_files))
+        __, count, __ = self.contentstore.get_content_page_for_course(dest_course, 5)
+        self.assertEqual(count, len(self.course1_files))
+
+        # Copying again replaces the copies.
+        self.contentstore.copy_all_course_assets(self.course1_key, dest_course)
+        __, count = self.contentstore.get_all_content_for_course(dest_course)
+        self.assertEqual(count, len(self.course1_files))
 
     @ddt.data(True, False)
     def test_delete_assets(self, deprecated):
@@ -42,7 +42,7 @@ from git.test.lib.asserts import assert_not_none
 from xmodule.x_module import XModuleMixin
 from xmodule.modulestore.mongo.base import as_draft
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
-from xmodule.modulestore.tests.utils import LocationMixin, mock_tab_from_json
+from xmodule.modulestore.tests.utils import LocationMixin, MemoryCache, mock_tab_from_json
 from xmodule.modulestore.edit_info import EditInfoMixin
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.inheritance import InheritanceMixin
@@ -707,6 +707,65 @@ class TestMongoModuleStore(TestMongoModuleStoreBase):
         # Clean up the data so we don't break other tests which apparently expect a particular state
         self.draft_store.delete_course(course.id, self.dummy_user)
 
+    def test_incremental_metadata_inheritance_tree(self):
+        """
+        Test that editing a container updates only its subtree of the cached inheritance tree, with
+        the same result as recomputing the whole tree
+        """
+        store = self.draft_store
+        with patch.object(store, 'metadata_inheritance_cache_subsystem', MemoryCache()):
+            course = store.create_course("TestX", "InheritanceTest", "1234_A1", self.dummy_user)
+            chapter = store.create_child(self.dummy_user, course.location, "chapter")
+            sequential = store.create_child(self.dummy_user, chapter.location, "sequential")
+            vertical = store.create_child(self.dummy_user, sequential.location, "vertical")
+            store.create_child(self.dummy_user, vertical.location, "html")
+            store.create_child(self.dummy_user, chapter.location, "sequential")
+
+            sequential = store.get_item(sequential.location)
+            sequential.visible_to_staff_only = True
+            with patch.object(
+                store, '_compute_metadata_inheritance_tree', wraps=store._compute_metadata_inheritance_tree
+            ) as mock_compute:
+                store.update_item(sequential, self.dummy_user)
+                self.assertFalse(mock_compute.called)
+
+            __, tree = store._get_inheritance_tree_from_cache(course.id)
+            self.assertEqual(tree, store._compute_metadata_inheritance_tree(course.id))
+            self.assertTrue(tree[unicode(vertical.location)]['visible_to_staff_only'])
+
+            store.delete_course(course.id, self.dummy_user)
+
+    def test_concurrent_metadata_inheritance_tree_updates(self):
+        """
+        Test that only one update of each version of the cached inheritance tree is written, and that
+        the others recompute the whole tree instead
+        """
+        store = self.draft_store
+        with patch.object(store, 'metadata_inheritance_cache_subsystem', MemoryCache()):
+            course = store.create_course("TestX", "InheritanceRace", "1234_A1", self.dummy_user)
+            chapter = store.create_child(self.dummy_user, course.location, "chapter")
+            store.create_child(self.dummy_user, chapter.location, "sequential")
+
+            version, tree = store._get_inheritance_tree_from_cache(course.id)
+            self.assertTrue(store._set_inheritance_tree_in_cache(course.id, dict(tree), version))
+            self.assertFalse(store._set_inheritance_tree_in_cache(course.id, dict(tree), version))
+
+            # Another process has started to replace the current version.
+            version, __ = store._get_inheritance_tree_from_cache(course.id)
+            store.metadata_inheritance_cache_subsystem.add(u'{}.{}.lock'.format(course.id, version), True)
+            chapter = store.get_item(chapter.location)
+            chapter.visible_to_staff_only = True
+            with patch.object(
+                store, '_compute_metadata_inheritance_tree', wraps=store._compute_metadata_inheritance_tree
+            ) as mock_compute:
+                store.update_item(chapter, self.dummy_user)
+                self.assertTrue(mock_compute.called)
+
+            __, tree = store._get_inheritance_tree_from_cache(course.id)
+            self.assertEqual(tree, store._compute_metadata_inheritance_tree(course.id))
+
+            store.delete_course(course.id, self.dummy_user)
+
     def test_make_course_usage_key(self):
         """Test that we get back the appropriate usage key for the root of a course key."""
         course_key = CourseLocator(org="edX", course="101", run="2015")
@@ -1,7 +1,7 @@
 """
     Test split modulestore w/o using any django stuff.
 """
-from mock import patch
+from mock import Mock, patch
 import datetime
 from importlib import import_module
 from path import Path as path
@@ -16,6 +16,7 @@ from nose.plugins.attrib import attr
 from django.core.cache import caches, InvalidCacheBackendError
 
 from openedx.core.lib import tempdir
+from openedx.core.lib.cache_utils import ProcessLocalLRUCache
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
 from xmodule.course_module import CourseDescriptor
 from xmodule.modulestore import ModuleStoreEnum
@@ -32,6 +33,8 @@ from xmodule.fields import Date, Timedelta
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache
+from xmodule.modulestore.split_mongo.structure_index import StructureIndex
 from xmodule.modulestore.tests.factories import check_mongo_calls
 from xmodule.modulestore.tests.mongo_connection import MONGO_PORT_NUM, MONGO_HOST
 from xmodule.modulestore.tests.utils import mock_tab_from_json
@@ -987,6 +990,32 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_local_cache(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        local_cache = ProcessLocalLRUCache(max_entries=10, max_bytes=10 ** 7)
+        structure_id = self.new_course.location.as_object_id(self.new_course.location.version_guid)
+        db_connection = modulestore().db_connection
+
+        with patch('xmodule.modulestore.split_mongo.mongo_connection._LOCAL_STRUCTURE_CACHE', local_cache):
+            with check_mongo_calls(1):
+                not_cached_structure = db_connection.get_structure(structure_id, self.new_course.id)
+
+            # the structure is now read from the local cache, even once
+            # evicted from the django cache
+            self.cache.clear()
+            with check_mongo_calls(0):
+                cached_structure = db_connection.get_structure(structure_id, self.new_course.id)
+            self.assertEqual(cached_structure, not_cached_structure)
+            self.assertEqual(local_cache.hits, 1)
+
+            # the local cache returns a new copy of the structure each time
+            self.assertIsNot(cached_structure, db_connection.get_structure(structure_id, self.new_course.id))
+
+            CourseStructureCache().invalidate_course(self.new_course.id)
+            self.assertEqual(local_cache.stats()['entries'], 0)
+
     def test_dummy_cache(self):
         with check_mongo_calls(1):
             not_cached_structure = self._get_structure(self.new_course)
@@ -1205,6 +1234,10 @@ class SplitModuleItemTests(SplitModuleTest):
         self.assertEqual(len(matches), 4)
         matches = modulestore().get_items(locator, qualifiers={'category': 'garbage'})
         self.assertEqual(len(matches), 0)
+        matches = modulestore().get_items(locator, qualifiers={'category': {'$in': ['chapter', 'course']}})
+        self.assertEqual(len(matches), 5)
+        matches = modulestore().get_items(locator, qualifiers={'category': re.compile(r'^chap')})
+        self.assertEqual(len(matches), 4)
         # Test that we don't accidentally get an item with a similar name.
         matches = modulestore().get_items(locator, qualifiers={'name': 'chapter1'})
         self.assertEqual(len(matches), 1)
@@ -1242,6 +1275,40 @@ class SplitModuleItemTests(SplitModuleTest):
         parent = modulestore().get_parent_location(locator)
         self.assertIsNone(parent)
 
+    def test_get_item_prefetches_definitions(self):
+        """
+        Test that getting an item with depth in a bulk operation caches its subtree's definitions
+        """
+        # pylint: disable=protected-access
+        store = modulestore()
+        course_key = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        with store.bulk_operations(course_key):
+            store.get_item(course_key.make_usage_key('course', 'head12345'), depth=None)
+            structure = store._lookup_course(course_key).structure
+            definition_ids = [block.definition for block in structure['blocks'].values()]
+            cached_definitions = store._get_bulk_ops_record(course_key).definitions
+            for definition_id in definition_ids:
+                self.assertIsNotNone(cached_definitions.get(definition_id))
+            with check_mongo_calls(0):
+                store.get_definitions(course_key, definition_ids)
+
+    def test_structure_index_cache(self):
+        """
+        Test that the structure's index is built once per request for the lookups which use it
+        """
+        course_key = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        with patch.object(modulestore(), 'request_cache', Mock(data={})):
+            with patch(
+                'xmodule.modulestore.split_mongo.split.StructureIndex', wraps=StructureIndex
+            ) as mock_structure_index:
+                for block_id in ['chapter1', 'chapter2', 'chapter3']:
+                    parent = modulestore().get_parent_location(course_key.make_usage_key('chapter', block_id))
+                    self.assertEqual(parent.block_id, 'head12345')
+                items = modulestore().get_items(course_key, include_orphans=False)
+                orphans = modulestore().get_orphans(course_key)
+                self.assertEqual(len(items) + len(orphans), len(modulestore().get_items(course_key)))
+                self.assertEqual(mock_structure_index.call_count, 1)
+
     @patch('xmodule.tabs.CourseTab.from_json', side_effect=mock_tab_from_json)
     def test_get_children(self, _from_json):
         """
@@ -1,6 +1,11 @@
 """ Test the behavior of split_mongo/MongoConnection """
+import copy
 import unittest
-from mock import patch
+
+import ddt
+from mock import Mock, patch
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
 from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
 from xmodule.exceptions import HeartbeatFailure
 
@@ -17,3 +22,110 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+@ddt.ddt
+class TestFindByIds(unittest.TestCase):
+    """ Test that queries for many ids are split into batches when configured """
+    @patch('pymongo.MongoClient')
+    @patch('pymongo.database.Database')
+    def create_connection(self, read_threads, *calls):
+        # pylint: disable=W0613
+        """ Return a connection whose definitions collection finds a definition for any id """
+        with patch('mongodb_proxy.MongoProxy'):
+            conn = MongoConnection('useless', 'useless', 'useless', read_threads=read_threads, read_batch_size=3)
+        self.addCleanup(conn.close_connections)
+        conn.definitions = Mock()
+        conn.definitions.find.side_effect = lambda query: iter([{'_id': _id} for _id in query['_id']['$in']])
+        return conn
+
+    @ddt.data((0, 1), (2, 3))
+    @ddt.unpack
+    def test_get_definitions(self, read_threads, expected_finds):
+        conn = self.create_connection(read_threads)
+        definitions = conn.get_definitions(range(8))
+        self.assertEqual([definition['_id'] for definition in definitions], range(8))
+        self.assertEqual(conn.definitions.find.call_count, expected_finds)
+
+    def test_few_ids_not_batched(self):
+        conn = self.create_connection(2)
+        conn.get_definitions(range(3))
+        self.assertEqual(conn.definitions.find.call_count, 1)
+
+
+class MemoryCollection(object):
+    """ A collection of documents kept in memory, supporting the queries of structures by id """
+    def __init__(self):
+        self.docs = {}
+
+    def insert(self, doc):
+        """ Store a copy of the doc """
+        self.docs[doc['_id']] = copy.deepcopy(doc)
+
+    def find_one(self, query, projection=None):  # pylint: disable=unused-argument
+        """ Return a copy of the doc with the queried id """
+        return copy.deepcopy(self.docs.get(query['_id']))
+
+    def find(self, query):
+        """ Return copies of the docs with the queried ids """
+        return [copy.deepcopy(self.docs[_id]) for _id in query['_id']['$in'] if _id in self.docs]
+
+
+class TestDeltaStructures(unittest.TestCase):
+    """ Test storing structures as the differences from their previous versions """
+    @patch('pymongo.MongoClient')
+    @patch('pymongo.database.Database')
+    def setUp(self, *calls):
+        # pylint: disable=W0613
+        super(TestDeltaStructures, self).setUp()
+        with patch('mongodb_proxy.MongoProxy'):
+            self.conn = MongoConnection('useless', 'useless', 'useless', structure_snapshot_interval=3)
+        self.conn.structures = MemoryCollection()
+        cache_patcher = patch('xmodule.modulestore.split_mongo.mongo_connection.CourseStructureCache')
+        cache_patcher.start().return_value.get.return_value = None
+        self.addCleanup(cache_patcher.stop)
+
+    def make_structure(self, version, previous_version, block_fields):
+        """ Return a structure with a block with each of the given fields """
+        return {
+            '_id': version,
+            'previous_version': previous_version,
+            'root': BlockKey('course', 'course'),
+            'blocks': {
+                BlockKey(block_type, block_id): BlockData(block_type=block_type, definition=None, fields=fields)
+                for (block_type, block_id), fields in block_fields.iteritems()
+            },
+        }
+
+    def assert_structures_equal(self, structure, expected):
+        """ Assert that the structures have the same blocks """
+        self.assertEqual(
+            {block_key: block.to_storable() for block_key, block in structure['blocks'].iteritems()},
+            {block_key: block.to_storable() for block_key, block in expected['blocks'].iteritems()},
+        )
+
+    def test_delta_structures(self):
+        versions = [
+            self.make_structure('v1', None, {('course', 'course'): {}, ('html', 'a'): {}, ('html', 'b'): {}}),
+            self.make_structure('v2', 'v1', {('course', 'course'): {}, ('html', 'a'): {'x': 1}, ('html', 'c'): {}}),
+            self.make_structure('v3', 'v2', {('course', 'course'): {'y': 2}, ('html', 'a'): {'x': 1}}),
+            self.make_structure('v4', 'v3', {('course', 'course'): {'y': 2}}),
+        ]
+        for structure in versions:
+            self.conn.insert_structure(copy.deepcopy(structure))
+
+        stored = self.conn.structures.docs
+        self.assertNotIn('delta', stored['v1'])
+        self.assertEqual(stored['v2']['delta'], {'base': 'v1', 'depth': 1, 'removed': [['html', 'b']]})
+        self.assertItemsEqual([block['block_id'] for block in stored['v2']['blocks']], ['a', 'c'])
+        self.assertEqual(stored['v3']['delta']['depth'], 2)
+        self.assertItemsEqual([block['block_id'] for block in stored['v3']['blocks']], ['course'])
+        self.assertNotIn('delta', stored['v4'])
+
+        for structure in versions:
+            self.assert_structures_equal(self.conn.get_structure(structure['_id']), structure)
+        for structure, expected in zip(self.conn.find_structures_by_id(['v2', 'v3']), versions[1:3]):
+            self.assert_structures_equal(structure, expected)
+
+        course_blocks = self.conn.find_course_blocks_by_id(['v2'])[0]
+        self.assertEqual(course_blocks['blocks'].keys(), [BlockKey('course', 'course')])
@@ -216,6 +216,21 @@ class MemoryCache(object):
         """
         self.data[key] = value
 
+    def add(self, key, value):
+        """
+        Set a key in the cache, unless it has been set previously.
+
+        Args:
+            key: The key to add.
+            value: The value to set the key to.
+
+        Returns whether the key was set.
+        """
+        if key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
 
 class MongoContentstoreBuilder(object):
     """
@@ -22,12 +22,15 @@ Modulestore virtual   |          XML physical (draft, published)
 """
 import logging
 from abc import abstractmethod
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 from opaque_keys.edx.locator import LibraryLocator
 import os
 import mimetypes
 from path import Path as path
 import json
 import re
+from itertools import chain
 from lxml import etree
 
 from xmodule.library_tools import LibraryToolsService
@@ -54,10 +57,13 @@ from xmodule.util.misc import escape_invalid_characters
 
 log = logging.getLogger(__name__)
 
+# Number of static files imported at once.
+IMPORT_STATIC_WORKERS = 8
+
 
 def import_static_content(
         course_data_path, static_content_store,
-        target_id, subpath='static', verbose=False):
+        target_id, subpath='static', verbose=False, workers=IMPORT_STATIC_WORKERS):
 
     remap_dict = {}
 
@@ -77,6 +83,9 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
+    # StaticContent.compute_location maps '/' to '_', so distinct files can share an asset key, or a
+    # thumbnail key.  Those files are imported in turn, in os.walk order, rather than concurrently.
+    content_paths_by_key = OrderedDict()
     for dirname, _, filenames in os.walk(static_dir):
         for filename in filenames:
 
@@ -87,63 +96,115 @@ def import_static_content(
                     log.debug('skipping static content %s...', content_path)
                 continue
 
+            asset_key = StaticContent.compute_location(target_id, _static_file_name(content_path, static_dir))
+            # The thumbnail name is derived from the asset name, so it's shared by files sharing either key.
+            thumbnail_name = StaticContent.generate_thumbnail_name(asset_key.name)
+            content_paths_by_key.setdefault(thumbnail_name, []).append(content_path)
+
+    def import_files(content_paths):
+        """
+        Imports the static files at content_paths in turn, returning a list of their names and asset keys,
+        or None for those skipped.
+        """
+        results = []
+        for content_path in content_paths:
             if verbose:
                 log.debug('importing static content %s...', content_path)
+            results.append(_import_static_file(
+                content_path, static_dir, static_content_store, target_id, policy, mimetypes_list
+            ))
+        return results
+
+    # Files are read, thumbnailed and saved by a pool of threads, since each spends most of its
+    # time waiting on the disk, the contentstore or PIL, none of which hold the GIL.
+    content_path_groups = content_paths_by_key.values()
+    workers = min(workers, len(content_path_groups))
+    if workers > 1:
+        pool = ThreadPool(workers)
+        try:
+            results = pool.map(import_files, content_path_groups)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [import_files(content_paths) for content_paths in content_path_groups]
 
-            try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
-                raise
+    for result in chain.from_iterable(results):
+        if result is not None:
+            # store the remapping information which will be needed
+            # to subsitute in the module data
+            fullname_with_subpath, asset_key = result
+            remap_dict[fullname_with_subpath] = asset_key
 
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+    return remap_dict
 
-            policy_ele = policy.get(asset_key.path, {})
 
-            # During export display name is used to create files, strip away slashes from name
-            displayname = escape_invalid_characters(
-                name=policy_ele.get('displayname', filename),
-                invalid_char_list=['/', '\\']
-            )
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+def _import_static_file(content_path, static_dir, static_content_store, target_id, policy, mimetypes_list):
+    """
+    Imports the static file at content_path, with its thumbnail, into the static_content_store.
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+    Returns:
+        The file's name within the static_dir and its asset key, or None if it's skipped.
+    """
+    filename = os.path.basename(content_path)
+    try:
+        with open(content_path, 'rb') as f:
+            data = f.read()
+    except IOError:
+        if filename.startswith('._'):
+            # OS X "companion files". See
+            # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+            return None
+        # Not a 'hidden file', then re-raise exception
+        raise
+
+    fullname_with_subpath = _static_file_name(content_path, static_dir)
+    asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+
+    policy_ele = policy.get(asset_key.path, {})
+
+    # During export display name is used to create files, strip away slashes from name
+    displayname = escape_invalid_characters(
+        name=policy_ele.get('displayname', filename),
+        invalid_char_list=['/', '\\']
+    )
+    locked = policy_ele.get('locked', False)
+    mime_type = policy_ele.get('contentType')
+
+    # Check extracted contentType in list of all valid mimetypes
+    if not mime_type or mime_type not in mimetypes_list:
+        mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
+    content = StaticContent(
+        asset_key, displayname, mime_type, data,
+        import_path=fullname_with_subpath, locked=locked
+    )
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+    # first let's save a thumbnail so we can get back a thumbnail location
+    thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+    if thumbnail_content is not None:
+        content.thumbnail_location = thumbnail_location
 
-            # store the remapping information which will be needed
-            # to subsitute in the module data
-            remap_dict[fullname_with_subpath] = asset_key
+    # then commit the content
+    try:
+        static_content_store.save(content)
+    except Exception as err:
+        log.exception(u'Error importing {0}, error={1}'.format(
+            fullname_with_subpath, err
+        ))
 
-    return remap_dict
+    return fullname_with_subpath, asset_key
+
+
+def _static_file_name(content_path, static_dir):
+    """
+    Returns the name of the static file at content_path within the static_dir.
+    """
+    # strip away leading path from the name
+    fullname_with_subpath = content_path.replace(static_dir, '')
+    if fullname_with_subpath.startswith('/'):
+        fullname_with_subpath = fullname_with_subpath[1:]
+    return fullname_with_subpath
 
 
 class ImportManager(object):
@@ -439,14 +500,21 @@ class ImportManager(object):
                 # Retrieve the course itself.
                 source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
-
-                # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
-
-                # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                # Import all static pieces, in the background while the rest is imported, since they're
+                # only written to the static content store.
+                static_pool = ThreadPool(1)
+                static_import = static_pool.apply_async(self.import_static, (data_path, dest_id))
+                static_pool.close()
+                try:
+                    # Import asset metadata stored in XML.
+                    self.import_asset_metadata(data_path, dest_id)
+
+                    # Import all children
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                finally:
+                    static_pool.join()
+                # Raises any error from importing the static pieces.
+                static_import.get()
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
@@ -3,6 +3,7 @@ Grading tests
 """
 
 import unittest
+from collections import OrderedDict
 from datetime import datetime, timedelta
 
 import ddt
@@ -295,6 +296,48 @@ class GraderTest(unittest.TestCase):
         self.assertAlmostEqual(graded['percent'], 0.11)
         self.assertEqual(len(graded['section_breakdown']), 12 + 1)
 
+    @ddt.data(
+        graders.AssignmentFormatGrader("Homework", 12, 2),
+        graders.AssignmentFormatGrader("Homework", 12, 0),
+        graders.AssignmentFormatGrader("Lab", 3, 2),
+        graders.AssignmentFormatGrader("Lab", 7, 3),
+        graders.AssignmentFormatGrader("Lab", 7, 10),
+        graders.AssignmentFormatGrader("Midterm", 1, 0),
+        graders.grader_from_conf([
+            {'type': "Homework", 'min_count': 12, 'drop_count': 2, 'weight': 0.25},
+            {'type': "Lab", 'min_count': 7, 'drop_count': 3, 'weight': 0.25},
+            {'type': "Midterm", 'min_count': 0, 'drop_count': 0, 'weight': 0.5},
+        ]),
+        graders.grader_from_conf([]),
+    )
+    def test_grade_matrix(self, grader):
+        grade_sheets = [self.empty_gradesheet, self.incomplete_gradesheet, self.test_gradesheet]
+        # The same scores, with a subsection missing from the grade sheet.
+        grade_sheets.append(dict(self.test_gradesheet, Lab={
+            key: value for key, value in self.test_gradesheet['Lab'].iteritems() if key != 'lab3'
+        }))
+        columns = [
+            (subsection_format, subsection_key)
+            for subsection_format, subsection_grades in sorted(self.test_gradesheet.iteritems())
+            for subsection_key in sorted(subsection_grades)
+        ]
+        for grade_sheet in grade_sheets:
+            for subsection_format in grade_sheet:
+                grade_sheet[subsection_format] = OrderedDict(sorted(grade_sheet[subsection_format].iteritems()))
+
+        score_matrix = graders.ScoreMatrix.from_grade_sheets(grade_sheets, columns)
+        self.assertEqual(
+            list(grader.grade_matrix(score_matrix)),
+            [grader.grade(grade_sheet)['percent'] for grade_sheet in grade_sheets],
+        )
+        if isinstance(grader, graders.WeightedSubsectionsGrader):
+            for assignment_type, weighted_percents in grader.grade_breakdown_matrix(score_matrix).iteritems():
+                self.assertEqual(
+                    list(weighted_percents),
+                    [grader.grade(grade_sheet)['grade_breakdown'][assignment_type]['percent']
+                     for grade_sheet in grade_sheets],
+                )
+
     @ddt.data(
         (
             # empty
@@ -1,8 +1,12 @@
 """
 Tests that check that we ignore the appropriate files when importing courses.
 """
+import os
+import shutil
+import tempfile
 import unittest
 from mock import Mock
+from path import Path as path
 from xmodule.modulestore.xml_importer import import_static_content
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.tests import DATA_DIR
@@ -39,3 +43,48 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+    def test_import_with_workers(self):
+        """
+        Test that importing with a pool of workers imports the same files as importing inline
+        """
+        course_dir = DATA_DIR / "dot-underscore"
+        course_id = SlashSeparatedCourseKey("edX", "dot-underscore", "2014_Fall")
+        remap_dicts = []
+        saved_names = []
+        for workers in [1, 4]:
+            content_store = Mock()
+            content_store.generate_thumbnail.return_value = (None, "location")
+            remap_dicts.append(import_static_content(course_dir, content_store, course_id, workers=workers))
+            saved_names.append(sorted(call[0][0].name for call in content_store.save.call_args_list))
+        self.assertEqual(remap_dicts[0], remap_dicts[1])
+        self.assertEqual(saved_names[0], saved_names[1])
+        self.assertIn("example.txt", remap_dicts[1])
+
+    def test_import_same_asset_key_in_turn(self):
+        """
+        Test that files sharing an asset key are imported in os.walk order, even with a pool of workers
+        """
+        course_dir = path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, course_dir)
+        os.makedirs(course_dir / "static" / "sub")
+        for name in ["sub_example.txt", "sub/example.txt", "other.txt", "another.txt"]:
+            with open(course_dir / "static" / name, "w") as static_file:
+                static_file.write(name)
+        walked_names = [
+            os.path.relpath(os.path.join(dirname, filename), course_dir / "static")
+            for dirname, _, filenames in os.walk(course_dir / "static")
+            for filename in filenames
+            if filename.endswith("example.txt")
+        ]
+
+        course_id = SlashSeparatedCourseKey("edX", "same_key", "2014_Fall")
+        content_store = Mock()
+        content_store.generate_thumbnail.return_value = (None, "location")
+        remap_dict = import_static_content(course_dir, content_store, course_id, workers=4)
+        saved_paths = [
+            call[0][0].import_path for call in content_store.save.call_args_list
+            if call[0][0].location.name == "sub_example.txt"
+        ]
+        self.assertEqual(saved_paths, walked_names)
+        self.assertEqual(remap_dict["sub_example.txt"], remap_dict["sub/example.txt"])
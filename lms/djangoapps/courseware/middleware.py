@@ -4,6 +4,7 @@ Middleware for the courseware app
 
 from django.shortcuts import redirect
 
+from courseware.user_state_client import flush_pending_states
 from lms.djangoapps.courseware.exceptions import Redirect
 
 
@@ -17,3 +18,21 @@ class RedirectMiddleware(object):
         """
         if isinstance(exception, Redirect):
             return redirect(exception.url)
+
+
+class UserStateWriteBehindMiddleware(object):
+    """
+    Write the updates of XBlock user state which were written behind during the request.
+    """
+    def process_response(self, _request, response):
+        """
+        Write the pending updates, if they're due, before the request cache is cleared.
+        """
+        flush_pending_states()
+        return response
+
+    def process_exception(self, _request, _exception):
+        """
+        Write the pending updates of a failed request, which were saved before it failed.
+        """
+        flush_pending_states()
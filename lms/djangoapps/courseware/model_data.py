@@ -161,19 +161,31 @@ class DjangoOrmFieldCache(object):
 
     def __init__(self):
         self._cache = {}
+        # The cache keys of all fields which have been read, whether or not they were stored.
+        self._read_keys = set()
 
     def cache_fields(self, fields, xblocks, aside_types):
         """
         Load all fields specified by ``fields`` for the supplied ``xblocks``
         and ``aside_types`` into this cache.
 
+        Fields which have already been read aren't read again, nor refreshed.
+
         Arguments:
             fields (list of str): Field names to cache.
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
-        for field_object in self._read_objects(fields, xblocks, aside_types):
-            self._cache[self._cache_key_for_field_object(field_object)] = field_object
+        cache_keys = self._cache_keys_for_fields(fields, xblocks, aside_types) - self._read_keys
+        if not cache_keys:
+            return
+
+        self._read_keys.update(cache_keys)
+        for field_object in self._read_objects(cache_keys):
+            cache_key = self._cache_key_for_field_object(field_object)
+            # The query may also return fields read before, which this cache may have changed since.
+            if cache_key in cache_keys:
+                self._cache[cache_key] = field_object
 
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def get(self, kvs_key):
@@ -306,20 +318,31 @@ class DjangoOrmFieldCache(object):
         raise NotImplementedError()
 
     @abstractmethod
-    def _read_objects(self, fields, xblocks, aside_types):
+    def _cache_keys_for_fields(self, fields, xblocks, aside_types):
         """
-        Return an iterator for all objects stored in the underlying datastore
-        for the ``fields`` on the ``xblocks`` and the ``aside_types`` associated
-        with them.
+        Return the set of keys used in this DjangoOrmFieldCache for the ``fields``
+        on the ``xblocks`` and the ``aside_types`` associated with them.
 
         Arguments:
-            fields (list of str): Field names to return values for
-            xblocks (list of :class:`~XBlock`): XBlocks to load fields for
-            aside_types (list of str): Asides to load field for (which annotate the supplied
+            fields (list of :class:`~Field`): Fields to return keys for
+            xblocks (list of :class:`~XBlock`): XBlocks to return keys for
+            aside_types (list of str): Asides to return keys for (which annotate the supplied
                 xblocks).
         """
         raise NotImplementedError()
 
+    @abstractmethod
+    def _read_objects(self, cache_keys):
+        """
+        Return an iterator for all objects stored in the underlying datastore
+        for the fields identified by ``cache_keys``. The iterator may also return
+        objects for other fields.
+
+        Arguments:
+            cache_keys (set): Keys used in this DjangoOrmFieldCache for the fields to load
+        """
+        raise NotImplementedError()
+
     @abstractmethod
     def _cache_key_for_field_object(self, field_object):
         """
@@ -347,6 +370,8 @@ class UserStateCache(object):
     """
     def __init__(self, user, course_id):
         self._cache = defaultdict(dict)
+        # The usage keys of all blocks whose state has been read, whether or not it was stored.
+        self._read_usage_keys = set()
         self.course_id = course_id
         self.user = user
         self._client = DjangoXBlockUserStateClient(self.user)
@@ -356,14 +381,21 @@ class UserStateCache(object):
         Load all fields specified by ``fields`` for the supplied ``xblocks``
         and ``aside_types`` into this cache.
 
+        The state of blocks which has already been read isn't read again, nor refreshed.
+
         Arguments:
             fields (list of str): Field names to cache.
             xblocks (list of :class:`XBlock`): XBlocks to cache fields for.
             aside_types (list of str): Aside types to cache fields for.
         """
+        usage_keys = _all_usage_keys(xblocks, aside_types) - self._read_usage_keys
+        if not usage_keys:
+            return
+
+        self._read_usage_keys.update(usage_keys)
         block_field_state = self._client.get_many(
             self.user.username,
-            _all_usage_keys(xblocks, aside_types),
+            usage_keys,
         )
         for user_state in block_field_state:
             self._cache[user_state.block_key] = user_state.state
@@ -517,22 +549,35 @@ class UserStateSummaryCache(DjangoOrmFieldCache):
             value=value,
         )
 
-    def _read_objects(self, fields, xblocks, aside_types):
+    def _cache_keys_for_fields(self, fields, xblocks, aside_types):
         """
-        Return an iterator for all objects stored in the underlying datastore
-        for the ``fields`` on the ``xblocks`` and the ``aside_types`` associated
-        with them.
+        Return the set of keys used in this DjangoOrmFieldCache for the ``fields``
+        on the ``xblocks`` and the ``aside_types`` associated with them.
 
         Arguments:
-            fields (list of :class:`~Field`): Fields to return values for
-            xblocks (list of :class:`~XBlock`): XBlocks to load fields for
-            aside_types (list of str): Asides to load field for (which annotate the supplied
+            fields (list of :class:`~Field`): Fields to return keys for
+            xblocks (list of :class:`~XBlock`): XBlocks to return keys for
+            aside_types (list of str): Asides to return keys for (which annotate the supplied
                 xblocks).
         """
+        return set(
+            (usage_key, field.name)
+            for usage_key in _all_usage_keys(xblocks, aside_types)
+            for field in fields
+        )
+
+    def _read_objects(self, cache_keys):
+        """
+        Return an iterator for all objects stored in the underlying datastore
+        for the fields identified by ``cache_keys``.
+
+        Arguments:
+            cache_keys (set): Keys used in this DjangoOrmFieldCache for the fields to load
+        """
         return XModuleUserStateSummaryField.objects.chunked_filter(
             'usage_id__in',
-            _all_usage_keys(xblocks, aside_types),
-            field_name__in=set(field.name for field in fields),
+            set(usage_key for usage_key, __ in cache_keys),
+            field_name__in=set(field_name for __, field_name in cache_keys),
         )
 
     def _cache_key_for_field_object(self, field_object):
@@ -579,23 +624,36 @@ class PreferencesCache(DjangoOrmFieldCache):
             value=value,
         )
 
-    def _read_objects(self, fields, xblocks, aside_types):
+    def _cache_keys_for_fields(self, fields, xblocks, aside_types):
         """
-        Return an iterator for all objects stored in the underlying datastore
-        for the ``fields`` on the ``xblocks`` and the ``aside_types`` associated
-        with them.
+        Return the set of keys used in this DjangoOrmFieldCache for the ``fields``
+        on the ``xblocks`` and the ``aside_types`` associated with them.
 
         Arguments:
-            fields (list of str): Field names to return values for
-            xblocks (list of :class:`~XBlock`): XBlocks to load fields for
-            aside_types (list of str): Asides to load field for (which annotate the supplied
+            fields (list of :class:`~Field`): Fields to return keys for
+            xblocks (list of :class:`~XBlock`): XBlocks to return keys for
+            aside_types (list of str): Asides to return keys for (which annotate the supplied
                 xblocks).
         """
+        return set(
+            (block_type, field.name)
+            for block_type in _all_block_types(xblocks, aside_types)
+            for field in fields
+        )
+
+    def _read_objects(self, cache_keys):
+        """
+        Return an iterator for all objects stored in the underlying datastore
+        for the fields identified by ``cache_keys``.
+
+        Arguments:
+            cache_keys (set): Keys used in this DjangoOrmFieldCache for the fields to load
+        """
         return XModuleStudentPrefsField.objects.chunked_filter(
             'module_type__in',
-            _all_block_types(xblocks, aside_types),
+            set(block_type for block_type, __ in cache_keys),
             student=self.user.pk,
-            field_name__in=set(field.name for field in fields),
+            field_name__in=set(field_name for __, field_name in cache_keys),
         )
 
     def _cache_key_for_field_object(self, field_object):
@@ -641,21 +699,30 @@ class UserInfoCache(DjangoOrmFieldCache):
             value=value,
         )
 
-    def _read_objects(self, fields, xblocks, aside_types):
+    def _cache_keys_for_fields(self, fields, xblocks, aside_types):  # pylint: disable=unused-argument
         """
-        Return an iterator for all objects stored in the underlying datastore
-        for the ``fields`` on the ``xblocks`` and the ``aside_types`` associated
-        with them.
+        Return the set of keys used in this DjangoOrmFieldCache for the ``fields``
+        on the ``xblocks`` and the ``aside_types`` associated with them.
 
         Arguments:
-            fields (list of str): Field names to return values for
-            xblocks (list of :class:`~XBlock`): XBlocks to load fields for
-            aside_types (list of str): Asides to load field for (which annotate the supplied
+            fields (list of :class:`~Field`): Fields to return keys for
+            xblocks (list of :class:`~XBlock`): XBlocks to return keys for
+            aside_types (list of str): Asides to return keys for (which annotate the supplied
                 xblocks).
         """
+        return set(field.name for field in fields)
+
+    def _read_objects(self, cache_keys):
+        """
+        Return an iterator for all objects stored in the underlying datastore
+        for the fields identified by ``cache_keys``.
+
+        Arguments:
+            cache_keys (set): Keys used in this DjangoOrmFieldCache for the fields to load
+        """
         return XModuleStudentInfoField.objects.filter(
             student=self.user.pk,
-            field_name__in=set(field.name for field in fields),
+            field_name__in=cache_keys,
         )
 
     def _cache_key_for_field_object(self, field_object):
@@ -727,6 +794,12 @@ class FieldDataCache(object):
     def add_descriptors_to_cache(self, descriptors):
         """
         Add all `descriptors` to this FieldDataCache.
+
+        Only the fields which this FieldDataCache hasn't read yet are queried, so
+        adding descriptors which overlap those added before, as when walking down
+        a course, doesn't read their fields again. Fields which were read before
+        aren't refreshed: they keep the values read then, or set through this
+        FieldDataCache since, rather than any saved elsewhere in the meantime.
         """
         if self.user.is_authenticated():
             self.scorable_locations.update(desc.location for desc in descriptors if desc.has_score)
@@ -988,6 +1061,31 @@ class ScoresClient(object):
         client.fetch_scores(scorable_locations)
         return client
 
+    @classmethod
+    def create_for_users(cls, course_id, user_ids, scorable_locations):
+        """
+        Create ScoresClients with pre-fetched data for the given locations
+        for each of the given users, using a single query.
+
+        Returns a dict mapping each user_id to its ScoresClient.
+        """
+        clients = {user_id: cls(course_id, user_id) for user_id in user_ids}
+        scores_qset = StudentModule.objects.filter(
+            student_id__in=list(clients),
+            course_id=course_id,
+            module_state_key__in=set(scorable_locations),
+        )
+        for user_id, location, correct, total, created in scores_qset.values_list(
+                'student_id', 'module_state_key', 'grade', 'max_grade', 'created'
+        ):
+            # pylint: disable=protected-access
+            clients[user_id]._locations_to_scores[UsageKey.from_string(location).map_into_course(course_id)] = (
+                cls.Score(correct, total, created)
+            )
+        for client in clients.itervalues():
+            client._has_fetched = True  # pylint: disable=protected-access
+        return clients
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
@@ -877,10 +877,13 @@ def handle_xblock_callback(request, course_id, usage_id, handler, suffix=None):
         return _invoke_xblock_handler(request, course_id, usage_id, handler, suffix, course=course)
 
 
-def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_info=False, course=None):
+def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_info=False, course=None, depth=0):
     """
     Gets a module instance based on its `usage_id` in a course, for a given request/user
 
+    `depth` is how many levels of the module's descendants the modulestore should
+    prefetch, as in get_item; pass None when rendering all of them.
+
     Returns (instance, tracking_context)
     """
     user = request.user
@@ -892,7 +895,7 @@ def get_module_by_usage_id(request, course_id, usage_id, disable_staff_debug_inf
         raise Http404("Invalid location")
 
     try:
-        descriptor = modulestore().get_item(usage_key)
+        descriptor = modulestore().get_item(usage_key, depth=depth)
         descriptor_orig_usage_key, descriptor_orig_version = modulestore().get_block_original_usage(usage_key)
     except ItemNotFoundError:
         log.warn(
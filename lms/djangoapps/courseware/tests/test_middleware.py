@@ -2,12 +2,14 @@
 Tests for courseware middleware
 """
 
-from django.http import Http404
+from django.http import Http404, HttpResponse
+from django.test import TestCase
 from django.test.client import RequestFactory
+from mock import patch
 from nose.plugins.attrib import attr
 
 from lms.djangoapps.courseware.exceptions import Redirect
-from lms.djangoapps.courseware.middleware import RedirectMiddleware
+from lms.djangoapps.courseware.middleware import RedirectMiddleware, UserStateWriteBehindMiddleware
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory
 
@@ -42,3 +44,20 @@ class CoursewareMiddlewareTestCase(SharedModuleStoreTestCase):
         self.assertEqual(response.status_code, 302)
         target_url = response._headers['location'][1]
         self.assertTrue(target_url.endswith(test_url))
+
+
+@attr(shard=1)
+@patch('lms.djangoapps.courseware.middleware.flush_pending_states')
+class UserStateWriteBehindMiddlewareTestCase(TestCase):
+    """Tests that the user state written behind is written at the end of requests"""
+
+    def test_process_response(self, mock_flush):
+        request = RequestFactory().get("dummy_url")
+        response = HttpResponse()
+        self.assertIs(UserStateWriteBehindMiddleware().process_response(request, response), response)
+        mock_flush.assert_called_once_with()
+
+    def test_process_exception(self, mock_flush):
+        request = RequestFactory().get("dummy_url")
+        self.assertIsNone(UserStateWriteBehindMiddleware().process_exception(request, Exception()))
+        mock_flush.assert_called_once_with()
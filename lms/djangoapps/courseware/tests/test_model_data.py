@@ -140,6 +140,12 @@ class TestStudentModuleStorage(OtherUserFailureTestMixin, TestCase):
         with self.assertNumQueries(0):
             self.assertRaises(KeyError, self.kvs.get, user_state_key('not_a_field'))
 
+    def test_add_cached_descriptors(self):
+        "Test that adding descriptors whose state has already been read doesn't read it again"
+        with self.assertNumQueries(0):
+            self.field_data_cache.add_descriptors_to_cache([mock_descriptor([mock_field(Scope.user_state, 'a_field')])])
+        self.assertEquals('a_value', self.kvs.get(user_state_key('a_field')))
+
     def test_set_existing_field(self):
         "Test that setting an existing user_state field changes the value"
         # We are updating a problem, so we write to courseware_studentmodulehistory
@@ -337,6 +343,25 @@ class StorageTestBase(object):
         with self.assertNumQueries(0):
             self.assertRaises(KeyError, self.kvs.get, self.key_factory('missing_field'))
 
+    def test_add_cached_descriptors(self):
+        "Test that only the fields which haven't already been read are read"
+        with self.assertNumQueries(0):
+            self.field_data_cache.add_descriptors_to_cache([self.mock_descriptor])
+
+        new_descriptor = mock_descriptor([
+            mock_field(self.scope, 'existing_field'),
+            mock_field(self.scope, 'new_field')])
+        with self.assertNumQueries(1):
+            self.field_data_cache.add_descriptors_to_cache([new_descriptor])
+        with self.assertNumQueries(0):
+            self.assertEquals('old_value', self.kvs.get(self.key_factory('existing_field')))
+
+    def test_add_cached_descriptors_not_refreshed(self):
+        "Test that fields which have already been read keep their values when their descriptors are added again"
+        self.storage_class.objects.all().update(value=json.dumps('saved_elsewhere'))
+        self.field_data_cache.add_descriptors_to_cache([self.mock_descriptor])
+        self.assertEquals('old_value', self.kvs.get(self.key_factory('existing_field')))
+
     def test_set_existing_field(self):
         "Test that setting an existing field changes the value"
         with self.assertNumQueries(1):
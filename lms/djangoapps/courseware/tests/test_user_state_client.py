@@ -3,14 +3,24 @@ Black-box tests of the DjangoUserStateClient against the semantics
 defined in edx_user_state_client.
 """
 
+import json
 from collections import defaultdict
 from unittest import skip
 
 from django.test import TestCase
+from django.test.utils import override_settings
 from edx_user_state_client.tests import UserStateClientTestBase
+from mock import Mock, patch
+from opaque_keys.edx.locator import CourseLocator
 
+import request_cache
+from courseware.models import StudentModule
 from courseware.tests.factories import UserFactory
-from courseware.user_state_client import DjangoXBlockUserStateClient
+from courseware.user_state_client import (
+    WRITE_BEHIND_REQUEST_CACHE,
+    DjangoXBlockUserStateClient,
+    flush_pending_states
+)
 
 
 class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
@@ -67,3 +77,88 @@ class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
     @skip("Not supported by DjangoXBlockUserStateClient")
     def test_iter_course_many_users(self):
         pass
+
+
+WRITE_BEHIND = {
+    'BLOCK_TYPES': {'video': ['saved_video_position'], 'problem': ['attempts']},
+    'FLUSH_ON_REQUEST_END': True,
+}
+
+
+@override_settings(STUDENT_MODULE_WRITE_BEHIND=WRITE_BEHIND)
+class TestWriteBehind(TestCase):
+    """
+    Tests of the updates of user state which are written behind.
+    """
+    def setUp(self):
+        super(TestWriteBehind, self).setUp()
+        self.user = UserFactory.create()
+        self.client = DjangoXBlockUserStateClient(self.user)
+        self.video_key = CourseLocator('org', 'course', 'run').make_usage_key('video', 'video')
+        self.addCleanup(request_cache.clear_cache, WRITE_BEHIND_REQUEST_CACHE)
+
+        patcher = patch('courseware.user_state_client.crum.get_current_request', return_value=Mock())
+        self.mock_get_current_request = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _stored_state(self, usage_key):
+        """
+        Returns the state stored in the StudentModule of the block, or None.
+        """
+        student_module = StudentModule.objects.filter(student=self.user, module_state_key=usage_key).first()
+        return json.loads(student_module.state) if student_module else None
+
+    def _get_state(self, usage_key):
+        """
+        Returns the state of the block read by the client.
+        """
+        return {state.block_key: state.state for state in self.client.get_many(self.user.username, [usage_key])}
+
+    def test_coalesced(self):
+        self.client.set_many(self.user.username, {self.video_key: {'saved_video_position': 1}})
+        self.client.set_many(self.user.username, {self.video_key: {'saved_video_position': 2}})
+        self.assertIsNone(self._stored_state(self.video_key))
+        self.assertEqual(self._get_state(self.video_key), {self.video_key: {'saved_video_position': 2}})
+
+        flush_pending_states()
+        self.assertEqual(self._stored_state(self.video_key), {'saved_video_position': 2})
+
+        self.client.set_many(self.user.username, {self.video_key: {'saved_video_position': 3}})
+        flush_pending_states()
+        self.assertEqual(self._stored_state(self.video_key), {'saved_video_position': 3})
+
+    def test_written_with_other_fields(self):
+        self.client.set_many(self.user.username, {self.video_key: {'saved_video_position': 1}})
+        self.client.set_many(self.user.username, {self.video_key: {'speed': 2}})
+        self.assertEqual(self._stored_state(self.video_key), {'saved_video_position': 1, 'speed': 2})
+
+        flush_pending_states()
+        self.assertEqual(self._stored_state(self.video_key), {'saved_video_position': 1, 'speed': 2})
+
+    def test_history_types_written(self):
+        problem_key = self.video_key.replace(block_type='problem')
+        self.client.set_many(self.user.username, {problem_key: {'attempts': 1}})
+        self.assertEqual(self._stored_state(problem_key), {'attempts': 1})
+
+    def test_written_outside_requests(self):
+        self.mock_get_current_request.return_value = None
+        self.client.set_many(self.user.username, {self.video_key: {'saved_video_position': 1}})
+        self.assertEqual(self._stored_state(self.video_key), {'saved_video_position': 1})
+
+    def test_deleted(self):
+        self.client.set_many(self.user.username, {self.video_key: {'saved_video_position': 1}})
+        self.client.delete_many(self.user.username, [self.video_key], fields=['saved_video_position'])
+        self.assertEqual(self._get_state(self.video_key), {})
+
+        flush_pending_states()
+        self.assertIsNone(self._stored_state(self.video_key))
+
+    @override_settings(STUDENT_MODULE_WRITE_BEHIND=dict(WRITE_BEHIND, FLUSH_ON_REQUEST_END=False, WINDOW=60))
+    def test_window(self):
+        self.addCleanup(flush_pending_states, force=True)
+        self.client.set_many(self.user.username, {self.video_key: {'saved_video_position': 1}})
+        flush_pending_states()
+        self.assertIsNone(self._stored_state(self.video_key))
+
+        flush_pending_states(force=True)
+        self.assertEqual(self._stored_state(self.video_key), {'saved_video_position': 1})
@@ -1,20 +1,46 @@
 """
 An implementation of :class:`XBlockUserStateClient`, which stores XBlock Scope.user_state
 data in a Django ORM model.
+
+Updates of selected fields of selected block types may be written behind, rather than
+as XBlocks save them, as configured by the STUDENT_MODULE_WRITE_BEHIND setting::
+
+    STUDENT_MODULE_WRITE_BEHIND = {
+        # The fields which may be written behind, by block type.
+        'BLOCK_TYPES': {'video': ['saved_video_position']},
+        # Whether to write the updates at the end of each request. Otherwise the updates
+        # of all requests of the process are written at the end of the first request
+        # after WINDOW seconds or MAX_PENDING updates, and are lost if the process dies.
+        'FLUSH_ON_REQUEST_END': True,
+        'WINDOW': 5,
+        'MAX_PENDING': 1000,
+    }
+
+Updates are coalesced per user and block, and written in bulk by
+:func:`flush_pending_states`, which
+:class:`~courseware.middleware.UserStateWriteBehindMiddleware` calls.
 """
 
+import atexit
 import itertools
 import logging
+import threading
+from collections import defaultdict, namedtuple
+from datetime import datetime
 from operator import attrgetter
 from time import time
 
+import crum
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db import transaction
+from django.db import DatabaseError, transaction
 from django.db.utils import IntegrityError
 from edx_user_state_client.interface import XBlockUserState, XBlockUserStateClient
+from pytz import UTC
 from xblock.fields import Scope
 
 import dogstats_wrapper as dog_stats_api
+import request_cache
 from courseware.models import BaseStudentModuleHistory, StudentModule
 from openedx.core.djangoapps import monitoring_utils
 
@@ -26,6 +52,134 @@ except ImportError:
 
 log = logging.getLogger(__name__)
 
+WRITE_BEHIND_REQUEST_CACHE = 'courseware.user_state_client.write_behind'
+
+PendingState = namedtuple('PendingState', ['user', 'state', 'modified'])
+
+
+class _PendingStates(object):
+    """
+    Updates of XBlock user state which haven't been written yet, coalesced per user and block.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+        self._since = None
+
+    def add(self, user, usage_key, state):
+        """
+        Overlays the ``state`` dict of the block over that pending for the user.
+        """
+        with self._lock:
+            pending = self._states.get((user.username, usage_key))
+            merged_state = dict(pending.state) if pending is not None else {}
+            merged_state.update(state)
+            self._states[(user.username, usage_key)] = PendingState(user, merged_state, datetime.now(UTC))
+            if self._since is None:
+                self._since = time()
+
+    def get_many(self, username, block_keys):
+        """
+        Returns a dict mapping those of the ``block_keys`` with pending state for the user to it.
+        """
+        with self._lock:
+            return {
+                usage_key: self._states[(username, usage_key)]
+                for usage_key in block_keys
+                if (username, usage_key) in self._states
+            }
+
+    def pop(self, username, usage_key):
+        """
+        Removes and returns the pending state of the block for the user, or None.
+        """
+        with self._lock:
+            return self._states.pop((username, usage_key), None)
+
+    def pop_all(self):
+        """
+        Removes and returns all pending states, as a dict mapping (username, usage_key) to them.
+        """
+        with self._lock:
+            states, self._states, self._since = self._states, {}, None
+            return states
+
+    def is_due(self, window, max_pending):
+        """
+        Returns whether the oldest pending update is ``window`` seconds old,
+        or there are ``max_pending`` updates.
+        """
+        with self._lock:
+            return self._since is not None and (
+                time() - self._since >= window or len(self._states) >= max_pending
+            )
+
+
+# The updates pending in this process, when they aren't written at the end of each request.
+_SHARED_PENDING_STATES = _PendingStates()
+
+
+def _write_behind_settings():
+    """
+    Returns the STUDENT_MODULE_WRITE_BEHIND setting.
+    """
+    return getattr(settings, 'STUDENT_MODULE_WRITE_BEHIND', {})
+
+
+def _pending_states():
+    """
+    Returns the updates pending for the current request, or for the process.
+    """
+    if _write_behind_settings().get('FLUSH_ON_REQUEST_END', True):
+        return request_cache.get_cache(WRITE_BEHIND_REQUEST_CACHE).setdefault('pending', _PendingStates())
+    return _SHARED_PENDING_STATES
+
+
+def _can_write_behind(usage_key, state):
+    """
+    Returns whether the update of the block's ``state`` may be written behind.
+
+    Updates are only written behind in requests, after which they're written, and
+    never for blocks with state history, which bulk writes wouldn't record.
+    """
+    fields = _write_behind_settings().get('BLOCK_TYPES', {}).get(usage_key.block_type)
+    return (
+        bool(fields) and
+        usage_key.block_type not in BaseStudentModuleHistory.HISTORY_SAVING_TYPES and
+        set(state).issubset(fields) and
+        crum.get_current_request() is not None
+    )
+
+
+def flush_pending_states(force=False):
+    """
+    Writes the pending updates of XBlock user state, in bulk for each user.
+
+    Unless ``force`` is set, the updates of the process are only written once
+    they're due, when they aren't written at the end of each request.
+    """
+    config = _write_behind_settings()
+    pending_states = _pending_states()
+    if not (force or config.get('FLUSH_ON_REQUEST_END', True) or
+            pending_states.is_due(config.get('WINDOW', 5), config.get('MAX_PENDING', 1000))):
+        return
+
+    users = {}
+    states_by_user = defaultdict(dict)
+    for (username, usage_key), pending in pending_states.pop_all().items():
+        users[username] = pending.user
+        states_by_user[username][usage_key] = pending.state
+
+    for username, states in states_by_user.items():
+        client = DjangoXBlockUserStateClient(users[username])
+        try:
+            client._write_pending_states(states)  # pylint: disable=protected-access
+        except DatabaseError:
+            log.exception("Writing %d pending states for user %s failed", len(states), username)
+
+
+atexit.register(flush_pending_states, force=True)
+
 
 class DjangoXBlockUserStateClient(XBlockUserStateClient):
     """
@@ -196,8 +350,20 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         self._ddog_histogram(evt_time, 'get_many.blks_requested', len(block_keys))
         self._nr_stat_accumulate('get_many', 'blocks_requested', len(block_keys))
 
+        pending_states = {}
+        if _write_behind_settings().get('BLOCK_TYPES'):
+            pending_states = _pending_states().get_many(username, block_keys)
+
         modules = self._get_student_modules(username, block_keys)
         for module, usage_key in modules:
+            # Overlay the updates which haven't been written yet.
+            pending = pending_states.pop(usage_key, None)
+            if pending is not None:
+                module_state = json.loads(module.state) if module.state else {}
+                module_state.update(pending.state)
+                module.state = json.dumps(module_state)
+                module.modified = pending.modified
+
             if module.state is None:
                 self._ddog_increment(evt_time, 'get_many.empty_state')
                 continue
@@ -228,6 +394,14 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
                 }
             yield XBlockUserState(username, usage_key, state, module.modified, scope)
 
+        # Blocks whose state hasn't been written yet at all.
+        for usage_key, pending in pending_states.items():
+            total_block_count += 1
+            state = dict(pending.state)
+            if fields is not None:
+                state = {field: state[field] for field in fields if field in state}
+            yield XBlockUserState(username, usage_key, state, pending.modified, scope)
+
         # The rest of this method exists only to report metrics.
         finish_time = time()
         duration = (finish_time - evt_time) * 1000  # milliseconds
@@ -268,6 +442,75 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             # what we have.
             return
 
+        if _write_behind_settings().get('BLOCK_TYPES'):
+            block_keys_to_state = self._write_behind(user, block_keys_to_state)
+        self._save_states(user, block_keys_to_state)
+
+    def _write_behind(self, user, block_keys_to_state):
+        """
+        Adds the updates which may be written behind to those pending, and returns the others,
+        with any pending updates of the same blocks overlaid by them.
+        """
+        pending_states = _pending_states()
+        states = {}
+        for usage_key, state in block_keys_to_state.items():
+            if _can_write_behind(usage_key, state):
+                pending_states.add(user, usage_key, state)
+                self._ddog_increment(time(), 'set_many.state_deferred')
+                continue
+
+            # Write the pending update along with this one, so that it isn't written after it.
+            pending = pending_states.pop(user.username, usage_key)
+            if pending is not None:
+                merged_state = dict(pending.state)
+                merged_state.update(state)
+                state = merged_state
+            states[usage_key] = state
+        return states
+
+    def _write_pending_states(self, block_keys_to_state):
+        """
+        Writes the updates of state which were written behind, for the user of this client,
+        creating the missing StudentModules with a single insert.
+
+        Arguments:
+            block_keys_to_state (dict): A dict mapping UsageKeys to state dicts.
+        """
+        student_modules = self._get_student_modules(self.user.username, block_keys_to_state.keys())
+        existing = {usage_key: student_module for student_module, usage_key in student_modules}
+        new_modules = [
+            StudentModule(
+                student=self.user,
+                course_id=usage_key.course_key,
+                module_state_key=usage_key,
+                module_type=usage_key.block_type,
+                state=json.dumps(state),
+            )
+            for usage_key, state in block_keys_to_state.items()
+            if usage_key not in existing
+        ]
+        try:
+            with transaction.atomic():
+                StudentModule.objects.bulk_create(new_modules)
+                for usage_key, student_module in existing.items():
+                    current_state = json.loads(student_module.state) if student_module.state else {}
+                    current_state.update(block_keys_to_state[usage_key])
+                    student_module.state = json.dumps(current_state)
+                    student_module.save(force_update=True)
+        except IntegrityError:
+            # Some of the StudentModules were created since they were read, so write them one at a time.
+            self._save_states(self.user, block_keys_to_state)
+
+        self._ddog_histogram(time(), 'write_behind.blks_written', len(block_keys_to_state))
+
+    def _save_states(self, user, block_keys_to_state):
+        """
+        Writes the updates of state for the user, one block at a time.
+
+        Arguments:
+            user (:class:`~User`): The user whose state should be written
+            block_keys_to_state (dict): A dict mapping UsageKeys to state dicts.
+        """
         evt_time = time()
 
         for usage_key, state in block_keys_to_state.items():
@@ -350,6 +593,16 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         if scope != Scope.user_state:
             raise ValueError("Only Scope.user_state is supported")
 
+        if _write_behind_settings().get('BLOCK_TYPES'):
+            pending_states = _pending_states()
+            for usage_key in block_keys:
+                pending = pending_states.pop(username, usage_key)
+                if pending is not None and fields is not None:
+                    # Keep the updates of the other fields pending.
+                    state = {field: value for field, value in pending.state.items() if field not in fields}
+                    if state:
+                        pending_states.add(pending.user, usage_key, state)
+
         evt_time = time()
         if fields is None:
             self._ddog_increment(evt_time, 'delete_many.empty_state')
@@ -1454,7 +1454,7 @@ def render_xblock(request, usage_key_string, check_if_enrolled=True):
 
         # get the block, which verifies whether the user has access to the block.
         block, _ = get_module_by_usage_id(
-            request, unicode(course_key), unicode(usage_key), disable_staff_debug_info=True, course=course
+            request, unicode(course_key), unicode(usage_key), disable_staff_debug_info=True, course=course, depth=None
         )
 
         student_view_context = request.GET.dict()
@@ -6,12 +6,14 @@ import ddt
 import mock
 from django.core.urlresolvers import reverse
 from django.test import RequestFactory, TestCase
+from django.test.utils import override_settings
 from django.utils.timezone import UTC as django_utc
 from mock import Mock, patch
 from nose.plugins.attrib import attr
 from pytz import UTC
 
 import django_comment_client.utils as utils
+import request_cache
 from course_modes.models import CourseMode
 from course_modes.tests.factories import CourseModeFactory
 from courseware.tabs import get_course_tab_list
@@ -24,12 +26,20 @@ from django_comment_common.models import CourseDiscussionSettings, ForumsConfig
 from django_comment_common.utils import get_course_discussion_settings, set_course_discussion_settings
 from edxmako import add_lookup
 from lms.djangoapps.teams.tests.factories import CourseTeamFactory
-from lms.lib.comment_client.utils import CommentClientMaintenanceError, perform_request
+from lms.lib.comment_client.thread import Thread
+from lms.lib.comment_client.cache import REQUEST_CACHE_NAME
+from lms.lib.comment_client.utils import (
+    CommentClientMaintenanceError,
+    CommentClientRequestError,
+    perform_request,
+    perform_requests
+)
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from openedx.core.djangoapps.course_groups import cohorts
 from openedx.core.djangoapps.course_groups.cohorts import set_course_cohorted
 from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory, config_course_cohorts
 from openedx.core.djangoapps.util.testing import ContentGroupTestCase
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
 from student.roles import CourseStaffRole
 from student.tests.factories import AdminFactory, CourseEnrollmentFactory, UserFactory
 from xmodule.modulestore import ModuleStoreEnum
@@ -1709,6 +1719,144 @@ class ClientConfigurationTestCase(TestCase):
         result = perform_request('GET', 'http://www.google.com')
         self.assertEqual(result, {})
 
+    def test_config_read_once(self):
+        """Ensures that the config is read once per request, until it's changed."""
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+
+        response = Mock(status_code=200, json=lambda: {})
+        with patch('requests.request', return_value=response):
+            perform_request('GET', 'http://www.google.com')
+            with patch.object(ForumsConfig, 'current') as mock_current:
+                perform_request('GET', 'http://www.google.com')
+            self.assertFalse(mock_current.called)
+
+            config = ForumsConfig.current()
+            config.enabled = False
+            config.save()
+            with self.assertRaises(CommentClientMaintenanceError):
+                perform_request('GET', 'http://www.google.com')
+
+
+@override_settings(COMMENTS_SERVICE_HTTP_POOL={'ENABLED': True, 'POOL_MAXSIZE': 4})
+class PooledRequestsTestCase(TestCase):
+    """Tests requests to the comments service over the pooled session."""
+
+    def setUp(self):
+        super(PooledRequestsTestCase, self).setUp()
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+
+    @staticmethod
+    def _respond(method, url, **kwargs):  # pylint: disable=unused-argument
+        """Responds to a request with its url, or a 404 for a missing url."""
+        if 'missing' in url:
+            return Mock(status_code=404, text='Not found')
+        return Mock(status_code=200, json=lambda: {'url': url})
+
+    @patch('requests.Session.request', autospec=True)
+    @patch('requests.request')
+    def test_session_reused(self, mock_request, mock_session_request):
+        mock_session_request.side_effect = lambda session, method, url, **kwargs: self._respond(method, url)
+        self.assertEqual(perform_request('get', 'http://a'), {'url': 'http://a'})
+        self.assertEqual(perform_request('get', 'http://b'), {'url': 'http://b'})
+        self.assertFalse(mock_request.called)
+        sessions = [call_args[0][0] for call_args in mock_session_request.call_args_list]
+        self.assertIs(sessions[0], sessions[1])
+
+    @patch('requests.Session.request', autospec=True)
+    def test_perform_requests(self, mock_session_request):
+        mock_session_request.side_effect = lambda session, method, url, **kwargs: self._respond(method, url)
+        urls = ['http://{}'.format(index) for index in range(6)]
+        results = perform_requests([{'method': 'get', 'url': url} for url in urls])
+        self.assertEqual(results, [{'url': url} for url in urls])
+
+        with self.assertRaises(CommentClientRequestError):
+            perform_requests([{'method': 'get', 'url': 'http://a'}, {'method': 'get', 'url': 'http://missing'}])
+
+
+@override_settings(COMMENTS_SERVICE_CACHE={'ENABLED': True, 'CACHE': 'default', 'TIMEOUT': 10})
+class CachedRequestsTestCase(CacheIsolationTestCase):
+    """Tests the cache of responses from the comments service."""
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(CachedRequestsTestCase, self).setUp()
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+        self.thread_data = {'id': 'test_thread', 'course_id': 'edX/test/2017', 'title': 'Test', 'body': 'Test'}
+
+    def _mock_request(self, mock_request):
+        """Responds to each request with the test thread."""
+        mock_request.return_value = Mock(
+            status_code=200, text=json.dumps(self.thread_data), json=Mock(return_value=self.thread_data)
+        )
+
+    def _retrieve(self, **kwargs):
+        """Retrieves the test thread, in a new instance."""
+        thread = Thread(id='test_thread')
+        thread.retrieve(**kwargs)
+        return thread
+
+    @patch('requests.request')
+    def test_retrieve_cached(self, mock_request):
+        self._mock_request(mock_request)
+        self.assertEqual(self._retrieve(mark_as_read=False).title, 'Test')
+        self.assertEqual(self._retrieve(mark_as_read=False).title, 'Test')
+        self.assertEqual(mock_request.call_count, 1)
+
+        # Later requests read the shared cache.
+        request_cache.clear_cache(REQUEST_CACHE_NAME)
+        self.assertEqual(self._retrieve(mark_as_read=False).title, 'Test')
+        self.assertEqual(mock_request.call_count, 1)
+
+    @patch('requests.request')
+    def test_mark_as_read_not_cached(self, mock_request):
+        self._mock_request(mock_request)
+        self._retrieve()
+        self._retrieve()
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch('requests.request')
+    def test_invalidated_on_mark_as_read(self, mock_request):
+        self._mock_request(mock_request)
+        self._retrieve(mark_as_read=False, user_id='1')
+        self._retrieve(mark_as_read=True, user_id='1')
+        self.assertEqual(mock_request.call_count, 2)
+
+        request_cache.clear_cache(REQUEST_CACHE_NAME)
+        self._retrieve(mark_as_read=False, user_id='1')
+        self.assertEqual(mock_request.call_count, 3)
+
+    @patch('requests.request')
+    def test_search_invalidated_on_mark_as_read(self, mock_request):
+        self.thread_data.update({'collection': [], 'page': 1, 'num_pages': 1})
+        self._mock_request(mock_request)
+        query_params = {'course_id': 'edX/test/2017', 'user_id': '1'}
+        Thread.search(query_params)
+        Thread.search(query_params)
+        self.assertEqual(mock_request.call_count, 1)
+
+        self._retrieve(mark_as_read=True, user_id='1')
+        Thread.search(query_params)
+        self.assertEqual(mock_request.call_count, 3)
+
+    @patch('requests.request')
+    def test_invalidated_on_save(self, mock_request):
+        self._mock_request(mock_request)
+        thread = self._retrieve(mark_as_read=False)
+        self.thread_data['title'] = 'Changed'
+        thread.title = 'Changed'
+        thread.save()
+        self.assertEqual(mock_request.call_count, 2)
+
+        request_cache.clear_cache(REQUEST_CACHE_NAME)
+        self.assertEqual(self._retrieve(mark_as_read=False).title, 'Changed')
+        self.assertEqual(mock_request.call_count, 3)
+
 
 def set_discussion_division_settings(
         course_key, enable_cohorts=False, always_divide_inline_discussions=False,
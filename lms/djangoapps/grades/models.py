@@ -11,7 +11,7 @@ persisted, course grades are also immune to changes in course content.
 import json
 import logging
 from base64 import b64encode
-from collections import namedtuple
+from collections import defaultdict, namedtuple
 from hashlib import sha1
 
 from django.db import models
@@ -340,6 +340,8 @@ class PersistentSubsectionGrade(DeleteGradesMixin, TimeStampedModel):
     # track which blocks were visible at the time of grade calculation
     visible_blocks = models.ForeignKey(VisibleBlocks, db_column='visible_blocks_hash', to_field='hashed')
 
+    CACHE_NAMESPACE = u"grades.models.PersistentSubsectionGrade"
+
     @property
     def full_usage_key(self):
         """
@@ -395,10 +397,39 @@ class PersistentSubsectionGrade(DeleteGradesMixin, TimeStampedModel):
             user_id: The user associated with the desired grades
             course_key: The course identifier for the desired grades
         """
-        return cls.objects.select_related('visible_blocks').filter(
-            user_id=user_id,
-            course_id=course_key,
-        )
+        try:
+            prefetched_grades = get_cache(cls.CACHE_NAMESPACE)[cls._cache_key(course_key)]
+            return prefetched_grades.get(user_id, [])
+        except KeyError:
+            # grades were not prefetched for the course, so fetch them
+            return cls.objects.select_related('visible_blocks').filter(
+                user_id=user_id,
+                course_id=course_key,
+            )
+
+    @classmethod
+    def prefetch(cls, course_key, users):
+        """
+        Prefetches all subsection grades for the given users in the given course.
+        """
+        prefetched_grades = defaultdict(list)
+        for record in cls.objects.select_related('visible_blocks').filter(
+                user_id__in=[user.id for user in users],
+                course_id=course_key,
+        ):
+            prefetched_grades[record.user_id].append(record)
+        get_cache(cls.CACHE_NAMESPACE)[cls._cache_key(course_key)] = prefetched_grades
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key):
+        """
+        Clears the prefetched subsection grades for the given course.
+        """
+        get_cache(cls.CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"subsection_grades_cache.{}".format(course_key)
 
     @classmethod
     def update_or_create_grade(cls, **params):
@@ -597,6 +628,13 @@ class PersistentCourseGrade(DeleteGradesMixin, TimeStampedModel):
             cls.objects.filter(user_id__in=[user.id for user in users], course_id=course_id)
         }
 
+    @classmethod
+    def clear_prefetched_data(cls, course_id):
+        """
+        Clears the prefetched grades for the given course.
+        """
+        get_cache(cls.CACHE_NAMESPACE).pop(cls._cache_key(course_id), None)
+
     @classmethod
     def read(cls, user_id, course_id):
         """
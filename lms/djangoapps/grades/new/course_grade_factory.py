@@ -1,5 +1,6 @@
 from collections import namedtuple
 from contextlib import contextmanager
+from itertools import izip_longest
 from logging import getLogger
 
 import dogstats_wrapper as dog_stats_api
@@ -7,10 +8,11 @@ import dogstats_wrapper as dog_stats_api
 from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED, COURSE_GRADE_NOW_PASSED
 
 from ..config import assume_zero_if_absent, should_persist_grades
-from ..config.waffle import WRITE_ONLY_IF_ENGAGED, waffle
+from ..config.waffle import BULK_PREFETCH_GRADE_DATA, WRITE_ONLY_IF_ENGAGED, waffle
 from ..models import PersistentCourseGrade, VisibleBlocks
 from .course_data import CourseData
 from .course_grade import CourseGrade, ZeroCourseGrade
+from .subsection_grade_factory import SubsectionGradeFactory
 
 log = getLogger(__name__)
 
@@ -21,6 +23,9 @@ class CourseGradeFactory(object):
     """
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'error'])
 
+    # Batch size for chunking users when prefetching their grade data in bulk.
+    USER_BATCH_SIZE = 100
+
     def create(self, user, course=None, collected_block_structure=None, course_structure=None, course_key=None):
         """
         Returns the CourseGrade for the given user in the course.
@@ -112,9 +117,43 @@ class CourseGradeFactory(object):
         )
         stats_tags = [u'action:{}'.format(course_data.course_key)]
         with self._course_transaction(course_data.course_key):
-            for user in users:
-                with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
-                    yield self._iter_grade_result(user, course_data, force_update)
+            for users_batch in self._batch_users(users):
+                with self._prefetched_grade_data(course_data, users_batch):
+                    for user in users_batch:
+                        with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=stats_tags):
+                            yield self._iter_grade_result(user, course_data, force_update)
+
+    def _batch_users(self, users):
+        """
+        Returns a generator of batches of the given users.  When bulk
+        prefetching is disabled, all users are in a single lazy batch.
+        """
+        if not waffle().is_enabled(BULK_PREFETCH_GRADE_DATA):
+            yield users
+            return
+
+        args = [iter(users)] * self.USER_BATCH_SIZE
+        for users_batch in izip_longest(*args, fillvalue=None):
+            yield [user for user in users_batch if user is not None]
+
+    @contextmanager
+    def _prefetched_grade_data(self, course_data, users):
+        """
+        Provides a context in which the scores and persisted grades of
+        the given users are prefetched in a few set-based queries, rather
+        than queried for each user, when bulk prefetching is enabled.
+        """
+        if not waffle().is_enabled(BULK_PREFETCH_GRADE_DATA):
+            yield
+            return
+
+        SubsectionGradeFactory.prefetch(course_data, users)
+        PersistentCourseGrade.prefetch(course_data.course_key, users)
+        try:
+            yield
+        finally:
+            SubsectionGradeFactory.clear_prefetched_data(course_data.course_key)
+            PersistentCourseGrade.clear_prefetched_data(course_data.course_key)
 
     def _iter_grade_result(self, user, course_data, force_update):
         try:
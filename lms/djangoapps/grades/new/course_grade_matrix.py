@@ -0,0 +1,161 @@
+"""
+CourseGradeMatrix Class
+"""
+import numpy
+from lazy import lazy
+
+from xmodule.graders import ScoreMatrix
+
+from ..config import should_persist_grades
+from ..context import grading_context
+from ..models import PersistentCourseGrade, PersistentSubsectionGrade
+from .course_data import CourseData
+
+
+class CourseGradeMatrix(object):
+    """
+    Computes the course grades of many learners at once from a
+    ScoreMatrix of their graded subsection scores, using the course's
+    grading policy.  The results are the same as those of CourseGrade
+    for each learner, with percents rounded the same way.
+
+    persisted_grades, if built from_persisted_grades, is a list of the
+    PersistentSubsectionGrades of each learner, keyed by subsection.
+    """
+    def __init__(self, course, score_matrix, persisted_grades=None):
+        self.course = course
+        self.score_matrix = score_matrix
+        self.persisted_grades = persisted_grades
+
+    @classmethod
+    def from_course_grades(cls, course, course_grades, columns=None):
+        """
+        Returns a CourseGradeMatrix for the graded subsections of the given
+        course grades.  See ScoreMatrix.from_grade_sheets for columns.
+        """
+        return cls(
+            course,
+            ScoreMatrix.from_grade_sheets(
+                [course_grade.graded_subsections_by_format for course_grade in course_grades],
+                columns,
+            ),
+        )
+
+    @classmethod
+    def from_persisted_grades(cls, course, course_structure, users):
+        """
+        Returns a CourseGradeMatrix for the given users from their persisted
+        subsection grades, with a column for each graded subsection of the
+        given collected course structure.  The grades are read from those
+        prefetched by PersistentSubsectionGrade.prefetch, if any.
+
+        A subsection is only in a learner's grade sheet if its grade is
+        persisted, so the results are the same as those of CourseGrade for
+        learners with a persisted grade for each of their graded subsections,
+        such as the users_with_current_grades.
+        """
+        columns = [
+            (subsection_format, subsection_info['subsection_block'].location)
+            for subsection_format, subsection_infos
+            in grading_context(course_structure)['all_graded_subsections_by_type'].iteritems()
+            for subsection_info in subsection_infos
+        ]
+        column_of = {subsection_key: column for column, (_, subsection_key) in enumerate(columns)}
+
+        earned = numpy.zeros((len(users), len(columns)))
+        possible = numpy.zeros((len(users), len(columns)))
+        persisted_grades = []
+        for row, user in enumerate(users):
+            persisted_grades.append({})
+            for subsection_grade in PersistentSubsectionGrade.bulk_read_grades(user.id, course.id):
+                column = column_of.get(subsection_grade.full_usage_key)
+                if column is not None:
+                    earned[row, column] = subsection_grade.earned_graded
+                    possible[row, column] = subsection_grade.possible_graded
+                    persisted_grades[row][subsection_grade.full_usage_key] = subsection_grade
+        return cls(
+            course,
+            ScoreMatrix([subsection_format for subsection_format, _ in columns], earned, possible),
+            persisted_grades,
+        )
+
+    @staticmethod
+    def users_with_current_grades(course, course_structure, users):
+        """
+        Returns those of the given users whose persisted course grade was
+        computed with the current grading policy and content of the given
+        collected course structure.  Each of their graded subsections had
+        its grade persisted then, so from_persisted_grades grades them the
+        same as CourseGrade.
+        """
+        course_data = CourseData(None, course=course, collected_block_structure=course_structure)
+        if not should_persist_grades(course_data.course_key):
+            return []
+
+        current_users = []
+        for user in users:
+            try:
+                course_grade = PersistentCourseGrade.read(user.id, course_data.course_key)
+            except PersistentCourseGrade.DoesNotExist:
+                continue
+            if (
+                    course_grade.grading_policy_hash == course_data.grading_policy_hash and
+                    course_grade.course_edited_timestamp == course_data.edited_on
+            ):
+                current_users.append(user)
+        return current_users
+
+    @lazy
+    def percents(self):
+        """
+        Returns an array of the percent grade of each learner.
+        """
+        self.course.set_grading_policy(self.course.grading_policy)
+        return _round_half_away_from_zero(self.course.grader.grade_matrix(self.score_matrix) * 100 + 0.05) / 100
+
+    @lazy
+    def grade_breakdowns(self):
+        """
+        Returns an OrderedDict of the array of the weighted percent of each
+        learner for each assignment category, as in the grade_breakdown of
+        CourseGrade.grader_result.
+        """
+        self.course.set_grading_policy(self.course.grading_policy)
+        return self.course.grader.grade_breakdown_matrix(self.score_matrix)
+
+    @lazy
+    def letter_grades(self):
+        """
+        Returns a list of the letter grade of each learner, or None for
+        learners who did not pass.
+        """
+        grade_cutoffs = self.course.grade_cutoffs
+        letter_grades = numpy.empty(len(self.score_matrix), dtype=object)
+        graded = numpy.zeros(len(self.score_matrix), dtype=bool)
+
+        # Possible grades, sorted in descending order of score
+        for possible_grade in sorted(grade_cutoffs, key=lambda x: grade_cutoffs[x], reverse=True):
+            earned = ~graded & (self.percents >= grade_cutoffs[possible_grade])
+            letter_grades[earned] = possible_grade
+            graded |= earned
+        return letter_grades.tolist()
+
+    @lazy
+    def passed(self):
+        """
+        Returns a list of whether each learner passed the course.
+        """
+        nonzero_cutoffs = [cutoff for cutoff in self.course.grade_cutoffs.values() if cutoff > 0]
+        if not nonzero_cutoffs:
+            return [False] * len(self.score_matrix)
+        return (self.percents >= min(nonzero_cutoffs)).tolist()
+
+
+def _round_half_away_from_zero(values):
+    """
+    Rounds the given array to integral values as python's round() does,
+    rather than to the nearest even value as numpy.round() does.
+    """
+    magnitudes = numpy.abs(values)
+    floors = numpy.floor(magnitudes)
+    return numpy.copysign(floors + (magnitudes - floors >= 0.5), values)
@@ -8,8 +8,11 @@ from lms.djangoapps.grades.config import assume_zero_if_absent, should_persist_g
 from lms.djangoapps.grades.models import PersistentSubsectionGrade
 from lms.djangoapps.grades.scores import possibly_scored
 from openedx.core.lib.grade_utils import is_score_higher_or_equal
+from request_cache import get_cache
 from student.models import anonymous_id_for_user
 from submissions import api as submissions_api
+from submissions.models import ScoreSummary
+from submissions.serializers import UnannotatedScoreSerializer
 
 from .course_data import CourseData
 from .subsection_grade import SubsectionGrade, ZeroSubsectionGrade
@@ -21,6 +24,8 @@ class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
     """
+    CACHE_NAMESPACE = u"grades.new.SubsectionGradeFactory"
+
     def __init__(self, student, course=None, course_structure=None, course_data=None):
         self.student = student
         self.course_data = course_data or CourseData(student, course=course, structure=course_structure)
@@ -98,12 +103,55 @@ class SubsectionGradeFactory(object):
 
         return calculated_grade
 
+    @classmethod
+    def prefetch(cls, course_data, users):
+        """
+        Prefetches, in bulk, the scores stored in CSM and by the
+        Submissions API for all the given users in the course, so
+        factories subsequently created for those users don't query
+        for them individually.  Also prefetches their persisted
+        subsection grades.
+        """
+        course_key = course_data.course_key
+        scorable_locations = [
+            block_key for block_key in course_data.collected_structure if possibly_scored(block_key)
+        ]
+        csm_scores = ScoresClient.create_for_users(course_key, [user.id for user in users], scorable_locations)
+        submissions_scores = _bulk_submissions_scores(course_key, users)
+        get_cache(cls.CACHE_NAMESPACE)[cls._cache_key(course_key)] = {
+            user.id: (submissions_scores[user.id], csm_scores[user.id]) for user in users
+        }
+        PersistentSubsectionGrade.prefetch(course_key, users)
+
+    @classmethod
+    def clear_prefetched_data(cls, course_key):
+        """
+        Clears the data prefetched for the given course.
+        """
+        get_cache(cls.CACHE_NAMESPACE).pop(cls._cache_key(course_key), None)
+        PersistentSubsectionGrade.clear_prefetched_data(course_key)
+
+    @classmethod
+    def _cache_key(cls, course_key):
+        return u"subsection_grade_factory_cache.{}".format(course_key)
+
+    def _get_prefetched_scores(self):
+        """
+        Returns the (submissions_scores, csm_scores) prefetched for
+        this student, or None if they were not prefetched.
+        """
+        prefetched_scores = get_cache(self.CACHE_NAMESPACE).get(self._cache_key(self.course_data.course_key), {})
+        return prefetched_scores.get(self.student.id)
+
     @lazy
     def _csm_scores(self):
         """
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        prefetched_scores = self._get_prefetched_scores()
+        if prefetched_scores is not None:
+            return prefetched_scores[1]
         scorable_locations = [block_key for block_key in self.course_data.structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course_data.course_key, self.student.id, scorable_locations)
 
@@ -113,6 +161,9 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        prefetched_scores = self._get_prefetched_scores()
+        if prefetched_scores is not None:
+            return prefetched_scores[0]
         anonymous_user_id = anonymous_id_for_user(self.student, self.course_data.course_key)
         return submissions_api.get_scores(str(self.course_data.course_key), anonymous_user_id)
 
@@ -163,3 +214,25 @@ class SubsectionGradeFactory(object):
             getattr(subsection, 'subtree_edited_on', None),
             self.student.id,
         ))
+
+
+def _bulk_submissions_scores(course_key, users):
+    """
+    Returns a dict mapping the id of each of the given users to their
+    scores stored by the Submissions API for the course, in the same
+    form as returned by submissions_api.get_scores, using a single query.
+    """
+    # The anonymous ids are computed without saving them, as persisting
+    # them would cost a query per user.  Users with Submissions API scores
+    # already have their anonymous ids persisted.
+    users_by_anonymous_id = {anonymous_id_for_user(user, course_key, save=False): user.id for user in users}
+    scores = {user.id: {} for user in users}
+    score_summaries = ScoreSummary.objects.filter(
+        student_item__course_id=str(course_key),
+        student_item__student_id__in=list(users_by_anonymous_id),
+    ).select_related('latest', 'latest__submission', 'student_item')
+    for summary in score_summaries:
+        if not summary.latest.is_hidden():
+            user_id = users_by_anonymous_id[summary.student_item.student_id]
+            scores[user_id][summary.student_item.item_id] = UnannotatedScoreSerializer(summary.latest).data
+    return scores
@@ -16,7 +16,9 @@ from courseware.access import has_access
 from courseware.tests.test_submitting_problems import ProblemSubmissionTestMixin
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from openedx.core.djangolib.testing.utils import get_mock_request
+from request_cache import get_cache
 from student.models import CourseEnrollment
 from student.tests.factories import UserFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase, SharedModuleStoreTestCase
@@ -24,11 +26,12 @@ from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.modulestore.tests.utils import TEST_DATA_DIR
 from xmodule.modulestore.xml_importer import import_course_from_xml
 
-from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, WRITE_ONLY_IF_ENGAGED, waffle
+from ..config.waffle import ASSUME_ZERO_GRADE_IF_ABSENT, BULK_PREFETCH_GRADE_DATA, WRITE_ONLY_IF_ENGAGED, waffle
 from ..models import PersistentSubsectionGrade
 from ..new.course_data import CourseData
 from ..new.course_grade import CourseGrade, ZeroCourseGrade
 from ..new.course_grade_factory import CourseGradeFactory
+from ..new.course_grade_matrix import CourseGradeMatrix
 from ..new.subsection_grade import SubsectionGrade, ZeroSubsectionGrade
 from ..new.subsection_grade_factory import SubsectionGradeFactory
 from .utils import mock_get_score, mock_get_submissions_score
@@ -236,6 +239,33 @@ class TestCourseGradeFactory(GradeTestBase):
         self._update_grading_policy(passing=0.9)
         _assert_read()
 
+    @ddt.data(True, False)
+    def test_iter_bulk_prefetch(self, force_update):
+        users = [self.request.user] + [UserFactory() for _ in range(2)]
+        for user in users[1:]:
+            CourseEnrollment.enroll(user, self.course.id)
+
+        def _iter_grades():
+            """
+            Returns the percent grades of all users, ensuring there were no errors.
+            """
+            results = list(CourseGradeFactory().iter(users, self.course, force_update=force_update))
+            self.assertEqual([result.error for result in results], [None] * len(users))
+            return [result.course_grade.percent for result in results]
+
+        with mock_get_score(1, 2):
+            expected_percents = _iter_grades()
+
+            with waffle().override(BULK_PREFETCH_GRADE_DATA):
+                with patch('courseware.model_data.ScoresClient.create_for_locations') as mock_scores_client:
+                    with patch('submissions.api.get_scores') as mock_submissions_scores:
+                        self.assertEqual(_iter_grades(), expected_percents)
+        self.assertFalse(mock_scores_client.called)
+        self.assertFalse(mock_submissions_scores.called)
+        self.assertIsNone(get_cache(SubsectionGradeFactory.CACHE_NAMESPACE).get(
+            SubsectionGradeFactory._cache_key(self.course.id)
+        ))
+
     @ddt.data(True, False)
     def test_read_zero(self, assume_zero_enabled):
         with waffle().override(ASSUME_ZERO_GRADE_IF_ABSENT, active=assume_zero_enabled):
@@ -247,6 +277,54 @@ class TestCourseGradeFactory(GradeTestBase):
                 self.assertIsNone(course_grade)
 
 
+@ddt.ddt
+class TestCourseGradeMatrix(GradeTestBase):
+    """
+    Test that CourseGradeMatrix computes the same grades as CourseGradeFactory.
+    """
+    @ddt.data(0.5, 0.75, 1.0)
+    def test_same_as_course_grade_factory(self, passing):
+        self._update_grading_policy(passing=passing)
+        course_grades = []
+        for earned in range(4):
+            with mock_get_score(earned, 3):
+                course_grades.append(CourseGradeFactory().update(UserFactory(), self.course))
+
+        grade_matrix = CourseGradeMatrix.from_course_grades(self.course, course_grades)
+        self.assertEqual(list(grade_matrix.percents), [course_grade.percent for course_grade in course_grades])
+        self.assertEqual(grade_matrix.letter_grades, [course_grade.letter_grade for course_grade in course_grades])
+        self.assertEqual(grade_matrix.passed, [bool(course_grade.passed) for course_grade in course_grades])
+
+    def test_from_persisted_grades(self):
+        self._update_grading_policy(passing=0.5)
+        users = [UserFactory() for _ in range(4)]
+        with persistent_grades_feature_flags(global_flag=True, enabled_for_all_courses=True):
+            course_grades = []
+            for earned, user in enumerate(users):
+                with mock_get_score(earned, 3):
+                    course_grades.append(CourseGradeFactory().update(user, self.course))
+
+            self.assertEqual(
+                CourseGradeMatrix.users_with_current_grades(
+                    self.course, get_course_in_cache(self.course.id), users + [UserFactory()],
+                ),
+                users,
+            )
+            grade_matrix = CourseGradeMatrix.from_persisted_grades(
+                self.course, self.course_structure, users,
+            )
+        self.assertEqual(list(grade_matrix.percents), [course_grade.percent for course_grade in course_grades])
+        self.assertEqual(grade_matrix.letter_grades, [course_grade.letter_grade for course_grade in course_grades])
+        for assignment_type, weighted_percents in grade_matrix.grade_breakdowns.iteritems():
+            self.assertEqual(
+                list(weighted_percents),
+                [
+                    course_grade.grader_result['grade_breakdown'][assignment_type]['percent']
+                    for course_grade in course_grades
+                ],
+            )
+
+
 @ddt.ddt
 class TestSubsectionGradeFactory(ProblemSubmissionTestMixin, GradeTestBase):
     """
@@ -16,11 +16,13 @@ import csv
 import hashlib
 import json
 import os.path
+import shutil
+from tempfile import NamedTemporaryFile
 from uuid import uuid4
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import models, transaction
 
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
@@ -177,9 +179,8 @@ class InstructorTask(models.Model):
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Rows can be passed in as a generator, for the sake of memory
+    efficiency, rather than passing in the whole dataset.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -263,12 +264,46 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+        The rows are written to a temporary file as they are iterated, so
+        a generator of rows is never held in memory in its entirety.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        with NamedTemporaryFile() as output_file:
+            csvwriter = csv.writer(output_file)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            output_file.seek(0)
+            self.store(course_id, filename, File(output_file))
+
+    def store_concatenated_rows(self, course_id, filename, rows, part_filenames):
+        """
+        Given a course_id, filename, rows and the filenames of previously
+        stored csv parts, write the rows in csv format followed by the
+        contents of each part, in order, to the storage backend.
+        """
+        with NamedTemporaryFile() as output_file:
+            csvwriter = csv.writer(output_file)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            for part_filename in part_filenames:
+                with self.storage.open(self.path_to(course_id, part_filename)) as part_file:
+                    shutil.copyfileobj(part_file, output_file)
+            output_file.seek(0)
+            self.store(course_id, filename, File(output_file))
+
+    def filenames_in(self, course_id, dirname):
+        """
+        For a given `course_id`, return the sorted list of filenames in the
+        given directory, or an empty list if it does not exist.
+        """
+        try:
+            _, filenames = self.storage.listdir(self.path_to(course_id, dirname))
+        except OSError:
+            return []
+        return sorted(filenames)
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file with the given filename for the given `course_id`.
+        """
+        self.storage.delete(self.path_to(course_id, filename))
 
     def links_for(self, course_id):
         """
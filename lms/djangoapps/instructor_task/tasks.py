@@ -20,13 +20,16 @@ of the query for traversing StudentModule objects.
 
 """
 import logging
+import traceback
 from functools import partial
 
 from celery import task
+from celery.states import FAILURE
 from django.conf import settings
 from django.utils.translation import ugettext_noop
 
 from bulk_email.tasks import perform_delegate_email_batches
+from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.tasks_base import BaseInstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
@@ -35,7 +38,13 @@ from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_may_enroll_csv,
     upload_students_csv
 )
-from lms.djangoapps.instructor_task.tasks_helper.grades import CourseGradeReport, ProblemGradeReport, ProblemResponses
+from lms.djangoapps.instructor_task.subtasks import SubtaskStatus, check_subtask_is_valid, update_subtask_status
+from lms.djangoapps.instructor_task.tasks_helper.grades import (
+    GRADE_REPORTS,
+    CourseGradeReport,
+    ProblemGradeReport,
+    ProblemResponses
+)
 from lms.djangoapps.instructor_task.tasks_helper.misc import (
     cohort_students_and_upload,
     upload_course_survey_report,
@@ -190,6 +199,73 @@ def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def generate_grade_report_shard(entry_id, report_name, action_name, user_ids, subtask_status_dict):
+    """
+    Generate the rows of a grade report for a shard of a course's enrolled
+    users, as a subtask of the InstructorTask identified by `entry_id`.
+
+    `report_name` is the name of the grade report class in GRADE_REPORTS.
+    `user_ids` is the list of ids of the users in this shard.
+    `subtask_status_dict` is the dict of the shard's initial SubtaskStatus.
+
+    The last shard to complete merges the rows of all shards into the report.
+    """
+    report = GRADE_REPORTS[report_name]
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    TASK_LOG.info(
+        u"Task: %s, InstructorTask ID: %s, Generating %s shard of %d users",
+        current_task_id, entry_id, report_name, len(user_ids)
+    )
+
+    # Raises an exception if this subtask has been run twice, or is unknown to its InstructorTask.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    try:
+        subtask_status = report.generate_shard(entry_id, action_name, user_ids, subtask_status)
+    except Exception as exc:
+        # Count all users of the shard as failed, so the counts stay consistent,
+        # list them in the report's errors, and still merge the report if this
+        # was the last shard.
+        TASK_LOG.exception(u"Task: %s, InstructorTask ID: %s, Grade report shard failed", current_task_id, entry_id)
+        try:
+            report.store_failed_shard(entry_id, user_ids, exc)
+        except Exception:  # pylint: disable=broad-except
+            TASK_LOG.exception(
+                u"Task: %s, InstructorTask ID: %s, Failed to store errors of grade report shard",
+                current_task_id, entry_id,
+            )
+        subtask_status.increment(failed=len(user_ids), state=FAILURE)
+        _merge_if_last_shard(report, entry_id, action_name, current_task_id, subtask_status)
+        raise
+
+    _merge_if_last_shard(report, entry_id, action_name, current_task_id, subtask_status)
+    return subtask_status.to_dict()
+
+
+def _merge_if_last_shard(report, entry_id, action_name, current_task_id, subtask_status):
+    """
+    Records the given final status of a grade report shard, and merges
+    the report if all of its shards have completed.
+
+    The InstructorTask is marked as succeeded once all of its shards have
+    completed, so it's marked as failed instead if the merge fails.
+    """
+    subtasks = update_subtask_status(entry_id, current_task_id, subtask_status)
+    if subtasks['succeeded'] + subtasks['failed'] >= subtasks['total']:
+        try:
+            report.merge_shards(entry_id, action_name)
+        except Exception as exc:
+            TASK_LOG.exception(u"Task: %s, InstructorTask ID: %s, Failed to merge grade report shards",
+                               current_task_id, entry_id)
+            entry = InstructorTask.objects.get(pk=entry_id)
+            entry.task_output = InstructorTask.create_output_for_failure(exc, traceback.format_exc())
+            entry.task_state = FAILURE
+            entry.save_now()
+            raise
+
+
 @task(base=BaseInstructorTask)  # pylint: disable=not-callable
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
     """
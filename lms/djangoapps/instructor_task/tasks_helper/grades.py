@@ -1,13 +1,18 @@
 """
 Functionality for generating grade reports.
 """
+import json
 import logging
+import os
 import re
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 from datetime import datetime
-from itertools import chain, izip, izip_longest
+from itertools import chain, izip_longest
 from time import time
 
+from celery.states import SUCCESS
+from django.conf import settings
+from django.contrib.auth.models import User
 from lazy import lazy
 from pytz import UTC
 
@@ -16,8 +21,11 @@ from courseware.courses import get_course_by_id
 from instructor_analytics.basic import list_problem_responses
 from instructor_analytics.csvs import format_dictlist
 from lms.djangoapps.grades.context import grading_context, grading_context_for_course
-from lms.djangoapps.grades.models import PersistentCourseGrade
+from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
 from lms.djangoapps.grades.new.course_grade_factory import CourseGradeFactory
+from lms.djangoapps.grades.new.course_grade_matrix import CourseGradeMatrix
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.subtasks import queue_subtasks_for_query
 from lms.djangoapps.teams.models import CourseTeamMembership
 from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
@@ -30,7 +38,7 @@ from xmodule.partitions.partitions_service import PartitionService
 from xmodule.split_test_module import get_split_user_partitions
 
 from .runner import TaskProgress
-from .utils import upload_csv_to_report_store
+from .utils import upload_csv_to_report_store, upload_merged_csv_to_report_store
 
 TASK_LOG = logging.getLogger('edx.celery.task')
 
@@ -184,10 +192,191 @@ class _CourseGradeBulkContext(object):
         BulkCourseTags.prefetch(context.course_id, users)
 
 
-class CourseGradeReport(object):
+class _ShardedGradeReportMixin(object):
+    """
+    Mixin for grade reports that, when GRADES_DOWNLOAD_USERS_PER_SHARD is
+    set, are generated in parallel by subtasks that each grade a shard of
+    the enrolled users.  Each shard's rows are stored as CSV parts, which
+    are merged into the report once the last shard completes.
+
+    Subclasses implement _shard_headers, _shard_rows and _error_row.
+    """
+    # Name of the report's CSV.  The name of its errors CSV has an '_err' suffix.
+    REPORT_NAME = None
+
+    @classmethod
+    def _shard_headers(cls, context):
+        """
+        Returns the (success_headers, error_headers) of this report.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def _shard_rows(cls, context, users):
+        """
+        Returns the (success_rows, error_rows) of this report for the given
+        users.  Once the rows are consumed, context.task_progress counts the
+        users that succeeded and failed.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def _error_row(cls, student, error):
+        """
+        Returns the error row of this report for the given student, who
+        could not be graded because of the given error.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def _queue_shards(cls, entry_id, course_id, action_name):
+        """
+        Queues a subtask for each shard of the course's enrolled users, if
+        sharding is enabled and they don't all fit in a single shard.
+        Returns the task progress, or None if the report is not sharded.
+        """
+        users_per_shard = settings.GRADES_DOWNLOAD_USERS_PER_SHARD
+        if not users_per_shard or entry_id is None:
+            return None
+        users = CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True).order_by('id')
+        total_num_users = users.count()
+        if total_num_users <= users_per_shard:
+            return None
+
+        entry = InstructorTask.objects.get(pk=entry_id)
+        # If the parent task is requeued, its subtasks have already been queued.
+        if len(entry.subtasks) > 0 and len(entry.task_output) > 0:
+            TASK_LOG.warning(u'Task %s has already queued its grade report shards', entry.task_id)
+            return json.loads(entry.task_output)
+
+        # Import here, as the tasks module depends on this one.
+        from lms.djangoapps.instructor_task.tasks import generate_grade_report_shard
+
+        def _create_shard_subtask(user_list, initial_subtask_status):
+            """
+            Creates a subtask to generate the report rows of the given users.
+            """
+            return generate_grade_report_shard.subtask(
+                (
+                    entry_id,
+                    cls.__name__,
+                    action_name,
+                    [user['pk'] for user in user_list],
+                    initial_subtask_status.to_dict(),
+                ),
+                task_id=initial_subtask_status.task_id,
+                routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+            )
+
+        return queue_subtasks_for_query(
+            entry, action_name, _create_shard_subtask, [users], [], users_per_shard, total_num_users,
+        )
+
+    @classmethod
+    def generate_shard(cls, entry_id, action_name, user_ids, subtask_status):
+        """
+        Generates the report rows for the given shard of users and stores
+        them as CSV parts.  Returns the updated subtask_status.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        course_id = entry.course_id
+        with modulestore().bulk_operations(course_id):
+            context = _CourseGradeReportContext(
+                {'task_id': subtask_status.task_id}, entry_id, course_id, json.loads(entry.task_input), action_name,
+            )
+            users = CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True)
+            users = users.filter(id__in=user_ids).order_by('id').select_related('profile__allow_certificate')
+            success_rows, error_rows = cls._shard_rows(context, users)
+
+            part_filename = cls._part_filename(entry, user_ids)
+            report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+            report_store.store_rows(course_id, part_filename + u'.csv', success_rows)
+            if error_rows:
+                report_store.store_rows(course_id, part_filename + u'_err.csv', error_rows)
+
+        subtask_status.increment(
+            succeeded=context.task_progress.succeeded,
+            failed=context.task_progress.failed,
+            skipped=len(user_ids) - context.task_progress.attempted,
+            state=SUCCESS,
+        )
+        return subtask_status
+
+    @classmethod
+    def store_failed_shard(cls, entry_id, user_ids, error):
+        """
+        Stores an error row for each user of the given shard, which failed
+        with the given error, so the users are accounted for in the errors
+        CSV of the report rather than missing from it.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        users = User.objects.filter(id__in=user_ids).order_by('id')
+        ReportStore.from_config('GRADES_DOWNLOAD').store_rows(
+            entry.course_id,
+            cls._part_filename(entry, user_ids) + u'_err.csv',
+            [cls._error_row(user, error) for user in users],
+        )
+
+    @classmethod
+    def merge_shards(cls, entry_id, action_name):
+        """
+        Merges the CSV parts stored by all shards into the report.
+        """
+        entry = InstructorTask.objects.get(pk=entry_id)
+        course_id = entry.course_id
+        with modulestore().bulk_operations(course_id):
+            context = _CourseGradeReportContext(None, entry_id, course_id, json.loads(entry.task_input), action_name)
+            success_headers, error_headers = cls._shard_headers(context)
+
+        shards_dirname = cls._shards_dirname(entry)
+        part_filenames = [
+            os.path.join(shards_dirname, filename)
+            for filename in ReportStore.from_config('GRADES_DOWNLOAD').filenames_in(course_id, shards_dirname)
+        ]
+        error_part_filenames = [filename for filename in part_filenames if filename.endswith(u'_err.csv')]
+        success_part_filenames = [filename for filename in part_filenames if filename not in error_part_filenames]
+
+        date = datetime.now(UTC)
+        upload_merged_csv_to_report_store(
+            [success_headers], success_part_filenames, cls.REPORT_NAME, course_id, date,
+        )
+        if error_part_filenames:
+            upload_merged_csv_to_report_store(
+                [error_headers], error_part_filenames, cls.REPORT_NAME + '_err', course_id, date,
+            )
+        TASK_LOG.info(
+            u'Task: %s, InstructorTask ID: %s, Course: %s, Merged %d grade report shards',
+            entry.task_id, entry_id, course_id, len(success_part_filenames),
+        )
+
+    @classmethod
+    def _part_filename(cls, entry, user_ids):
+        """
+        Returns the name, without extension, of the CSV parts of the given
+        shard of users.  Parts are named by the shard's first user id, so
+        they merge in user id order.
+        """
+        return os.path.join(cls._shards_dirname(entry), u'{:012d}'.format(min(user_ids)))
+
+    @staticmethod
+    def _shards_dirname(entry):
+        """
+        Returns the name of the directory in the report store to which the
+        shards of the given task's report are stored.  Being a directory,
+        its files are not listed as downloadable reports.
+        """
+        return u'shards_{}'.format(entry.task_id)
+
+
+class CourseGradeReport(_ShardedGradeReportMixin):
     """
     Class to encapsulate functionality related to generating Grade Reports.
     """
+    REPORT_NAME = 'grade_report'
+
+    # The percent and letter grade of a learner graded by a CourseGradeMatrix.
+    MatrixGrade = namedtuple('MatrixGrade', ['percent', 'letter_grade'])
+
     # Batch size for chunking the list of enrollees in the course.
     USER_BATCH_SIZE = 100
 
@@ -196,6 +385,10 @@ class CourseGradeReport(object):
         """
         Public method to generate a grade report.
         """
+        progress = cls._queue_shards(_entry_id, course_id, action_name)
+        if progress is not None:
+            return progress
+
         with modulestore().bulk_operations(course_id):
             context = _CourseGradeReportContext(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name)
             return CourseGradeReport()._generate(context)
@@ -212,7 +405,6 @@ class CourseGradeReport(object):
         context.update_status(u'Compiling grades')
         success_rows, error_rows = self._compile(context, batched_rows)
 
-        context.update_status(u'Uploading grades')
         self._upload(context, success_headers, success_rows, error_headers, error_rows)
 
         return context.update_status(u'Completed grades')
@@ -238,40 +430,68 @@ class CourseGradeReport(object):
         """
         return ["Student ID", "Username", "Error"]
 
-    def _batched_rows(self, context):
+    @classmethod
+    def _shard_headers(cls, context):
+        report = cls()
+        return report._success_headers(context), report._error_headers()
+
+    @classmethod
+    def _shard_rows(cls, context, users):
+        report = cls()
+        return report._compile(context, report._batched_rows(context, users))
+
+    @classmethod
+    def _error_row(cls, student, error):
+        return [student.id, student.username, error.message]
+
+    def _batched_rows(self, context, users=None):
         """
         A generator of batches of (success_rows, error_rows) for this report.
+        Defaults to the rows of all users enrolled in the course.
         """
-        for users in self._batch_users(context):
+        for users in self._batch_users(context, users):
             users = filter(lambda u: u is not None, users)
             yield self._rows_for_users(context, users)
 
     def _compile(self, context, batched_rows):
         """
-        Compiles and returns the complete list of (success_rows, error_rows) for
-        the given batched_rows and context.
-        """
-        # partition and chain successes and errors
-        success_rows, error_rows = izip(*batched_rows)
-        success_rows = list(chain(*success_rows))
-        error_rows = list(chain(*error_rows))
-
-        # update metrics on task status
-        context.task_progress.succeeded = len(success_rows)
-        context.task_progress.failed = len(error_rows)
-        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
-        context.task_progress.total = context.task_progress.attempted
-        return success_rows, error_rows
+        Compiles the given batched_rows and context into a generator of
+        success rows and a list of error rows.  Rows are generated as each
+        batch of users is graded, so only one batch is held in memory at a
+        time.  Error rows are appended to the list as the success rows are
+        generated, and progress on the task is updated after each batch.
+        """
+        error_rows = []
+
+        def success_rows():
+            """
+            Generates the success rows of each batch, while collecting its
+            error rows and updating metrics on task status.
+            """
+            for batch_success_rows, batch_error_rows in batched_rows:
+                error_rows.extend(batch_error_rows)
+                context.task_progress.succeeded += len(batch_success_rows)
+                context.task_progress.failed += len(batch_error_rows)
+                context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
+                context.task_progress.update_task_state(extra_meta={'step': u'Compiling grades'})
+                for row in batch_success_rows:
+                    yield row
+            context.task_progress.total = context.task_progress.attempted
+
+        return success_rows(), error_rows
 
     def _upload(self, context, success_headers, success_rows, error_headers, error_rows):
         """
-        Creates and uploads a CSV for the given headers and rows.
+        Creates and uploads a CSV for the given headers and rows.  The
+        success_rows may be a generator, which is consumed as it is
+        written, before the error_rows are uploaded.
         """
         date = datetime.now(UTC)
-        upload_csv_to_report_store([success_headers] + success_rows, 'grade_report', context.course_id, date)
+        upload_csv_to_report_store(chain([success_headers], success_rows), self.REPORT_NAME, context.course_id, date)
+        context.update_status(u'Uploading grades')
         if len(error_rows) > 0:
             error_rows = [error_headers] + error_rows
-            upload_csv_to_report_store(error_rows, 'grade_report_err', context.course_id, date)
+            upload_csv_to_report_store(error_rows, self.REPORT_NAME + '_err', context.course_id, date)
 
     def _grades_header(self, context):
         """
@@ -285,16 +505,18 @@ class CourseGradeReport(object):
             grades_header.append(assignment_info['average_header'])
         return grades_header
 
-    def _batch_users(self, context):
+    def _batch_users(self, context, users=None):
         """
-        Returns a generator of batches of users.
+        Returns a generator of batches of the given users, defaulting to
+        all users enrolled in the course.
         """
         def grouper(iterable, chunk_size=self.USER_BATCH_SIZE, fillvalue=None):
             args = [iter(iterable)] * chunk_size
             return izip_longest(*args, fillvalue=fillvalue)
 
-        users = CourseEnrollment.objects.users_enrolled_in(context.course_id, include_inactive=True)
-        users = users.select_related('profile__allow_certificate')
+        if users is None:
+            users = CourseEnrollment.objects.users_enrolled_in(context.course_id, include_inactive=True)
+            users = users.select_related('profile__allow_certificate')
         return grouper(users)
 
     def _user_grade_results(self, course_grade, context):
@@ -322,6 +544,29 @@ class CourseGradeReport(object):
                 grade_results.append([assignment_average])
         return [course_grade.percent] + _flatten(grade_results)
 
+    def _user_matrix_grade_results(self, grade_matrix, row, context):
+        """
+        Returns a list of grade results for the learner of the given row of
+        the grade_matrix, the same as _user_grade_results returns for their
+        course grade.
+        """
+        grade_results = []
+        persisted_grades = grade_matrix.persisted_grades[row]
+        for assignment_type, assignment_info in context.graded_assignments.iteritems():
+            for subsection_location in assignment_info['subsection_headers']:
+                subsection_grade = persisted_grades.get(subsection_location)
+                if subsection_grade is None or not subsection_grade.possible_graded:
+                    grade_result = u'Not Available'
+                elif subsection_grade.first_attempted is not None:
+                    grade_result = subsection_grade.earned_graded / subsection_grade.possible_graded
+                else:
+                    grade_result = u'Not Attempted'
+                grade_results.append([grade_result])
+            if assignment_info['separate_subsection_avg_headers']:
+                assignment_averages = grade_matrix.grade_breakdowns.get(assignment_type)
+                grade_results.append([float(assignment_averages[row]) if assignment_averages is not None else None])
+        return [float(grade_matrix.percents[row])] + _flatten(grade_results)
+
     def _user_cohort_group_names(self, user, context):
         """
         Returns a list of names of cohort groups in which the given user
@@ -401,19 +646,14 @@ class CourseGradeReport(object):
             bulk_context = _CourseGradeBulkContext(context, users)
 
             success_rows, error_rows = [], []
-            for user, course_grade, error in CourseGradeFactory().iter(
-                users,
-                course=context.course,
-                collected_block_structure=context.course_structure,
-                course_key=context.course_id,
-            ):
+            for user, course_grade, grade_results, error in self._iter_grade_results(context, users):
                 if not course_grade:
                     # An empty gradeset means we failed to grade a student.
-                    error_rows.append([user.id, user.username, error.message])
+                    error_rows.append(self._error_row(user, error))
                 else:
                     success_rows.append(
                         [user.id, user.email, user.username] +
-                        self._user_grade_results(course_grade, context) +
+                        grade_results +
                         self._user_cohort_group_names(user, context) +
                         self._user_experiment_group_names(user, context) +
                         self._user_team_names(user, bulk_context.teams) +
@@ -423,30 +663,78 @@ class CourseGradeReport(object):
                     )
             return success_rows, error_rows
 
+    def _iter_grade_results(self, context, users):
+        """
+        Yields a (user, course_grade, grade_results, error) tuple for each
+        of the given users, in order.
+
+        Users whose persisted grades are current are graded all at once by
+        a CourseGradeMatrix of their persisted subsection grades.  The
+        others are graded by the CourseGradeFactory.
+        """
+        matrix_users = CourseGradeMatrix.users_with_current_grades(context.course, context.course_structure, users)
+        grade_matrix = None
+        if matrix_users:
+            PersistentSubsectionGrade.prefetch(context.course_id, matrix_users)
+            try:
+                grade_matrix = CourseGradeMatrix.from_persisted_grades(
+                    context.course, context.course_structure, matrix_users,
+                )
+            finally:
+                PersistentSubsectionGrade.clear_prefetched_data(context.course_id)
+        matrix_rows = {user.id: row for row, user in enumerate(matrix_users)}
+
+        # The factory yields the results of the other users in order, as they're graded.
+        factory_results = iter(CourseGradeFactory().iter(
+            [user for user in users if user.id not in matrix_rows],
+            course=context.course,
+            collected_block_structure=context.course_structure,
+            course_key=context.course_id,
+        ))
+
+        for user in users:
+            row = matrix_rows.get(user.id)
+            if row is not None:
+                course_grade = self.MatrixGrade(float(grade_matrix.percents[row]), grade_matrix.letter_grades[row])
+                yield user, course_grade, self._user_matrix_grade_results(grade_matrix, row, context), None
+            else:
+                user, course_grade, error = next(factory_results)
+                grade_results = self._user_grade_results(course_grade, context) if course_grade else None
+                yield user, course_grade, grade_results, error
+
+
+class ProblemGradeReport(_ShardedGradeReportMixin):
+    """
+    Class to encapsulate functionality related to generating Problem Grade Reports.
+    """
+    REPORT_NAME = 'problem_grade_report'
+
+    # This struct encapsulates both the display names of each static item in the
+    # header row as values as well as the django User field names of those items
+    # as the keys.  It is structured in this way to keep the values related.
+    HEADER_ROW = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
 
-class ProblemGradeReport(object):
     @classmethod
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
         """
         Generate a CSV containing all students' problem grades within a given
         `course_id`.
         """
+        progress = cls._queue_shards(_entry_id, course_id, action_name)
+        if progress is not None:
+            return progress
+
         start_time = time()
         start_date = datetime.now(UTC)
         status_interval = 100
         enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id, include_inactive=True)
         task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
 
-        # This struct encapsulates both the display names of each static item in the
-        # header row as values as well as the django User field names of those items
-        # as the keys.  It is structured in this way to keep the values related.
-        header_row = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
-
         graded_scorable_blocks = cls._graded_scorable_blocks_to_header(course_id)
 
         # Just generate the static fields for now.
-        rows = [list(header_row.values()) + ['Enrollment Status', 'Grade'] + _flatten(graded_scorable_blocks.values())]
-        error_rows = [list(header_row.values()) + ['error_msg']]
+        rows = [cls._headers(graded_scorable_blocks)]
+        error_rows = [cls._error_headers()]
         current_step = {'step': 'Calculating Grades'}
 
         # Bulk fetch and cache enrollment states so we can efficiently determine
@@ -455,33 +743,14 @@ class ProblemGradeReport(object):
 
         course = get_course_by_id(course_id)
         for student, course_grade, error in CourseGradeFactory().iter(enrolled_students, course):
-            student_fields = [getattr(student, field_name) for field_name in header_row]
             task_progress.attempted += 1
 
             if not course_grade:
-                err_msg = error.message
-                # There was an error grading this student.
-                if not err_msg:
-                    err_msg = u'Unknown error'
-                error_rows.append(student_fields + [err_msg])
+                error_rows.append(cls._error_row(student, error))
                 task_progress.failed += 1
                 continue
 
-            enrollment_status = _user_enrollment_status(student, course_id)
-
-            earned_possible_values = []
-            for block_location in graded_scorable_blocks:
-                try:
-                    problem_score = course_grade.problem_scores[block_location]
-                except KeyError:
-                    earned_possible_values.append([u'Not Available', u'Not Available'])
-                else:
-                    if problem_score.first_attempted:
-                        earned_possible_values.append([problem_score.earned, problem_score.possible])
-                    else:
-                        earned_possible_values.append([u'Not Attempted', problem_score.possible])
-
-            rows.append(student_fields + [enrollment_status, course_grade.percent] + _flatten(earned_possible_values))
+            rows.append(cls._success_row(student, course_grade, course_id, graded_scorable_blocks))
 
             task_progress.succeeded += 1
             if task_progress.attempted % status_interval == 0:
@@ -489,13 +758,84 @@ class ProblemGradeReport(object):
 
         # Perform the upload if any students have been successfully graded
         if len(rows) > 1:
-            upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
+            upload_csv_to_report_store(rows, cls.REPORT_NAME, course_id, start_date)
         # If there are any error rows, write them out as well
         if len(error_rows) > 1:
-            upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
+            upload_csv_to_report_store(error_rows, cls.REPORT_NAME + '_err', course_id, start_date)
 
         return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
 
+    @classmethod
+    def _headers(cls, graded_scorable_blocks):
+        """
+        Returns a list of all applicable column headers for this report.
+        """
+        return (
+            list(cls.HEADER_ROW.values()) + ['Enrollment Status', 'Grade'] + _flatten(graded_scorable_blocks.values())
+        )
+
+    @classmethod
+    def _error_headers(cls):
+        """
+        Returns a list of error headers for this report.
+        """
+        return list(cls.HEADER_ROW.values()) + ['error_msg']
+
+    @classmethod
+    def _success_row(cls, student, course_grade, course_id, graded_scorable_blocks):
+        """
+        Returns the report row for the given successfully graded student.
+        """
+        student_fields = [getattr(student, field_name) for field_name in cls.HEADER_ROW]
+        enrollment_status = _user_enrollment_status(student, course_id)
+
+        earned_possible_values = []
+        for block_location in graded_scorable_blocks:
+            try:
+                problem_score = course_grade.problem_scores[block_location]
+            except KeyError:
+                earned_possible_values.append([u'Not Available', u'Not Available'])
+            else:
+                if problem_score.first_attempted:
+                    earned_possible_values.append([problem_score.earned, problem_score.possible])
+                else:
+                    earned_possible_values.append([u'Not Attempted', problem_score.possible])
+
+        return student_fields + [enrollment_status, course_grade.percent] + _flatten(earned_possible_values)
+
+    @classmethod
+    def _error_row(cls, student, error):
+        """
+        Returns the error row for the given student, who could not be graded.
+        """
+        student_fields = [getattr(student, field_name) for field_name in cls.HEADER_ROW]
+        err_msg = error.message
+        # There was an error grading this student.
+        if not err_msg:
+            err_msg = u'Unknown error'
+        return student_fields + [err_msg]
+
+    @classmethod
+    def _shard_headers(cls, context):
+        return cls._headers(cls._graded_scorable_blocks_to_header(context.course_id)), cls._error_headers()
+
+    @classmethod
+    def _shard_rows(cls, context, users):
+        graded_scorable_blocks = cls._graded_scorable_blocks_to_header(context.course_id)
+        CourseEnrollment.bulk_fetch_enrollment_states(users, context.course_id)
+
+        success_rows, error_rows = [], []
+        for student, course_grade, error in CourseGradeFactory().iter(users, context.course):
+            if not course_grade:
+                error_rows.append(cls._error_row(student, error))
+            else:
+                success_rows.append(cls._success_row(student, course_grade, context.course_id, graded_scorable_blocks))
+
+        context.task_progress.succeeded = len(success_rows)
+        context.task_progress.failed = len(error_rows)
+        context.task_progress.attempted = context.task_progress.succeeded + context.task_progress.failed
+        return success_rows, error_rows
+
     @classmethod
     def _graded_scorable_blocks_to_header(cls, course_key):
         """
@@ -521,6 +861,10 @@ class ProblemGradeReport(object):
         return scorable_blocks_map
 
 
+# Grade reports that may be generated in shards, by class name.
+GRADE_REPORTS = {report.__name__: report for report in (CourseGradeReport, ProblemGradeReport)}
+
+
 class ProblemResponses(object):
     @classmethod
     def generate(cls, _xmodule_instance_args, _entry_id, course_id, task_input, action_name):
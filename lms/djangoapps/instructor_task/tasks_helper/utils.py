@@ -28,18 +28,39 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
         course_id: ID of the course
     """
     report_store = ReportStore.from_config(config_name)
-    report_store.store_rows(
-        course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=course_filename_prefix_generator(course_id),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
-        rows
+    report_store.store_rows(course_id, _report_filename(csv_name, course_id, timestamp), rows)
+    tracker_emit(csv_name)
+
+
+def upload_merged_csv_to_report_store(
+        header_rows, part_filenames, csv_name, course_id, timestamp, config_name='GRADES_DOWNLOAD'
+):
+    """
+    Upload data as a CSV using ReportStore, merged from the given header
+    rows followed by the rows of each of the given CSV parts previously
+    stored in the ReportStore, in order.  The parts are deleted once the
+    merged CSV is uploaded.
+    """
+    report_store = ReportStore.from_config(config_name)
+    report_store.store_concatenated_rows(
+        course_id, _report_filename(csv_name, course_id, timestamp), header_rows, part_filenames,
     )
+    for part_filename in part_filenames:
+        report_store.delete(course_id, part_filename)
     tracker_emit(csv_name)
 
 
+def _report_filename(csv_name, course_id, timestamp):
+    """
+    Returns the filename of the named report CSV for the given course and timestamp.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def tracker_emit(report_name):
     """
     Emits a 'report.requested' event for the given report.
@@ -8,6 +8,7 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 import tempfile
@@ -16,6 +17,7 @@ from datetime import datetime
 
 import ddt
 import unicodecsv
+from celery.states import FAILURE, SUCCESS
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from django.test.utils import override_settings
@@ -32,7 +34,9 @@ from course_modes.models import CourseMode
 from courseware.tests.factories import InstructorFactory
 from instructor_analytics.basic import UNAVAILABLE
 from lms.djangoapps.grades.models import PersistentCourseGrade
+from lms.djangoapps.grades.new.course_grade_factory import CourseGradeFactory
 from lms.djangoapps.grades.transformer import GradesTransformer
+from lms.djangoapps.instructor_task.models import InstructorTask
 from lms.djangoapps.instructor_task.tasks_helper.certs import generate_students_certificates
 from lms.djangoapps.instructor_task.tasks_helper.enrollments import (
     upload_enrollment_report,
@@ -52,6 +56,7 @@ from lms.djangoapps.instructor_task.tasks_helper.misc import (
     upload_course_survey_report,
     upload_ora2_data
 )
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from lms.djangoapps.instructor_task.tests.test_base import (
     InstructorTaskCourseTestCase,
     InstructorTaskModuleTestCase,
@@ -133,6 +138,118 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         num_students = len(emails)
         self.assertDictContainsSubset({'attempted': num_students, 'succeeded': num_students, 'failed': 0}, result)
 
+    @patch('lms.djangoapps.instructor_task.tasks_helper.grades.CourseGradeReport.USER_BATCH_SIZE', 2)
+    def test_progress_per_batch(self):
+        """
+        Test that progress is reported as each batch of students is graded.
+        """
+        for i in range(5):
+            self.create_student('student{0}'.format(i), 'student{0}@example.com'.format(i))
+
+        self.current_task = Mock()
+        self.current_task.update_state = Mock()
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task') as mock_current_task:
+            mock_current_task.return_value = self.current_task
+            result = CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+        self.assertDictContainsSubset({'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5}, result)
+
+        compiling_progress = [
+            call[1]['meta']['attempted'] for call in self.current_task.update_state.call_args_list
+            if call[1]['meta']['step'] == u'Compiling grades'
+        ]
+        self.assertEqual(compiling_progress, [0, 2, 4, 5])
+        self.verify_rows_in_csv([
+            {u'Username': u'student{0}'.format(i)} for i in range(5)
+        ], verify_order=False, ignore_other_columns=True)
+
+    @override_settings(GRADES_DOWNLOAD_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_report(self, _mock_current_task):
+        """
+        Test that a report generated in shards by subtasks is merged into
+        a single report, once all of its shards are complete.
+        """
+        for i in range(5):
+            self.create_student('student{0}'.format(i), 'student{0}@example.com'.format(i))
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_id='grade-report-task')
+
+        result = CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+        self.assertDictContainsSubset({'attempted': 0, 'total': 5}, result)
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertDictContainsSubset({'total': 3, 'succeeded': 3, 'failed': 0}, json.loads(entry.subtasks))
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5},
+            json.loads(entry.task_output),
+        )
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.verify_rows_in_csv([
+            {u'Username': u'student{0}'.format(i)} for i in range(5)
+        ], ignore_other_columns=True)
+
+    @override_settings(GRADES_DOWNLOAD_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_report_failed_shard(self, _mock_current_task):
+        """
+        Test that the users of a shard that failed are listed in the errors
+        of the merged report.
+        """
+        students = [self.create_student('student{0}'.format(i), 'student{0}@example.com'.format(i)) for i in range(5)]
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_id='grade-report-task')
+        shard_rows = CourseGradeReport._shard_rows
+
+        def _shard_rows(context, users):
+            """
+            Fails the shard of the first student.
+            """
+            if students[0] in users:
+                raise TypeError('Cannot grade shard')
+            return shard_rows(context, users)
+
+        with patch.object(CourseGradeReport, '_shard_rows', side_effect=_shard_rows):
+            CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertDictContainsSubset({'total': 3, 'succeeded': 2, 'failed': 1}, json.loads(entry.subtasks))
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        filenames = [filename for filename, _ in report_store.links_for(self.course.id)]
+        self.assertEqual(len(filenames), 2)
+        error_index = 0 if 'grade_report_err' in filenames[0] else 1
+        self.verify_rows_in_csv([
+            {u'Username': u'student{0}'.format(i), u'Error': u'Cannot grade shard'} for i in range(2)
+        ], file_index=error_index, ignore_other_columns=True)
+        self.verify_rows_in_csv([
+            {u'Username': u'student{0}'.format(i)} for i in range(2, 5)
+        ], file_index=1 - error_index, ignore_other_columns=True)
+
+    @override_settings(GRADES_DOWNLOAD_USERS_PER_SHARD=2)
+    @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
+    def test_sharded_report_failed_merge(self, _mock_current_task):
+        """
+        Test that a report whose shards fail to merge is marked as failed,
+        although all of its shards succeeded.
+        """
+        for i in range(5):
+            self.create_student('student{0}'.format(i), 'student{0}@example.com'.format(i))
+        entry = InstructorTaskFactory.create(course_id=self.course.id, task_id='grade-report-task')
+
+        with patch.object(CourseGradeReport, 'merge_shards', side_effect=IOError('Cannot merge shards')):
+            CourseGradeReport.generate(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertDictContainsSubset({'total': 3, 'succeeded': 3, 'failed': 0}, json.loads(entry.subtasks))
+        self.assertDictContainsSubset(
+            {'exception': 'IOError', 'message': 'Cannot merge shards'},
+            json.loads(entry.task_output),
+        )
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(report_store.links_for(self.course.id), [])
+
     @patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task')
     @patch('lms.djangoapps.grades.new.course_grade_factory.CourseGradeFactory.iter')
     def test_grading_failure(self, mock_grades_iter, _mock_current_task):
@@ -1789,6 +1906,39 @@ class TestGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
                 ignore_other_columns=True,
             )
 
+    def test_grade_report_from_persisted_grades(self):
+        self.submit_student_answer(self.student.username, u'Problem1', ['Option 1'])
+        ungraded_student = self.create_student(u'üser_2')
+
+        with patch('lms.djangoapps.instructor_task.tasks_helper.runner._get_current_task'):
+            with patch(
+                'lms.djangoapps.grades.new.course_grade_factory.CourseGradeFactory.iter',
+                wraps=CourseGradeFactory().iter,
+            ) as mock_grades_iter:
+                CourseGradeReport.generate(None, None, self.course.id, None, 'graded')
+
+        # Only the learner without persisted grades is graded by the factory.
+        graded_users = [user for call in mock_grades_iter.call_args_list for user in call[0][0]]
+        self.assertEqual(graded_users, [ungraded_student])
+        self.verify_rows_in_csv(
+            [
+                {
+                    u'Username': self.student.username,
+                    u'Grade': '0.13',
+                    u'Homework 1: Subsection': '0.5',
+                    u'Homework 2: Hidden': u'Not Available',
+                    u'Homework 3: Unattempted': u'Not Attempted',
+                    u'Homework 4: Empty': u'Not Available',
+                    u'Homework (Avg)': '0.125',
+                },
+                {
+                    u'Username': ungraded_student.username,
+                    u'Grade': '0.0',
+                },
+            ],
+            ignore_other_columns=True,
+        )
+
 
 @ddt.ddt
 @patch('lms.djangoapps.instructor_task.tasks_helper.misc.DefaultStorage', new=MockDefaultStorage)
@@ -216,6 +216,8 @@ BOOK_URL = ENV_TOKENS['BOOK_URL']
 LOG_DIR = ENV_TOKENS['LOG_DIR']
 
 CACHES = ENV_TOKENS['CACHES']
+COURSE_STRUCTURE_LOCAL_CACHE = ENV_TOKENS.get('COURSE_STRUCTURE_LOCAL_CACHE', COURSE_STRUCTURE_LOCAL_CACHE)
+CONTENTSERVER_DISK_CACHE.update(ENV_TOKENS.get('CONTENTSERVER_DISK_CACHE', {}))
 # Cache used for location mapping -- called many times with the same key/value
 # in a given request.
 if 'loc_cache' not in CACHES:
@@ -351,6 +353,8 @@ VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 META_UNIVERSITIES = ENV_TOKENS.get('META_UNIVERSITIES', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_HTTP_POOL.update(ENV_TOKENS.get("COMMENTS_SERVICE_HTTP_POOL", {}))
+COMMENTS_SERVICE_CACHE.update(ENV_TOKENS.get("COMMENTS_SERVICE_CACHE", {}))
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 ZENDESK_URL = ENV_TOKENS.get('ZENDESK_URL', ZENDESK_URL)
 ZENDESK_CUSTOM_FIELDS = ENV_TOKENS.get('ZENDESK_CUSTOM_FIELDS', ZENDESK_CUSTOM_FIELDS)
@@ -505,6 +509,8 @@ XBLOCK_FIELD_DATA_WRAPPERS = ENV_TOKENS.get(
     XBLOCK_FIELD_DATA_WRAPPERS
 )
 
+STUDENT_MODULE_WRITE_BEHIND.update(ENV_TOKENS.get('STUDENT_MODULE_WRITE_BEHIND', {}))
+
 ############### Mixed Related(Secure/Not-Secure) Items ##########
 LMS_SEGMENT_KEY = AUTH_TOKENS.get('SEGMENT_KEY')
 
@@ -644,6 +650,7 @@ DISABLE_ACCOUNT_ACTIVATION_REQUIREMENT_SWITCH = ENV_TOKENS.get(
 
 # Grades download
 GRADES_DOWNLOAD_ROUTING_KEY = ENV_TOKENS.get('GRADES_DOWNLOAD_ROUTING_KEY', HIGH_MEM_QUEUE)
+GRADES_DOWNLOAD_USERS_PER_SHARD = ENV_TOKENS.get('GRADES_DOWNLOAD_USERS_PER_SHARD', GRADES_DOWNLOAD_USERS_PER_SHARD)
 
 GRADES_DOWNLOAD = ENV_TOKENS.get("GRADES_DOWNLOAD", GRADES_DOWNLOAD)
 
@@ -57,6 +57,24 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# Pool of keep-alive connections to the comments service, shared by the
+# threads of each process. Off by default; enable it per deployment.
+COMMENTS_SERVICE_HTTP_POOL = {
+    'ENABLED': False,
+    'POOL_CONNECTIONS': 1,
+    'POOL_MAXSIZE': 10,
+    'MAX_RETRIES': 0,
+}
+
+# Seconds for which responses of the comments service are cached, which is
+# as stale as reads may be after writes not made through the comment client.
+# Off by default; enable it per deployment.
+COMMENTS_SERVICE_CACHE = {
+    'ENABLED': False,
+    'CACHE': 'default',
+    'TIMEOUT': 10,
+}
+
 LMS_ROOT_URL = "http://localhost:8000"
 
 # Features
@@ -774,6 +792,15 @@ XBLOCK_SELECT_FUNCTION = prefer_xmodules
 # Paths to wrapper methods which should be applied to every XBlock's FieldData.
 XBLOCK_FIELD_DATA_WRAPPERS = ()
 
+# Fields of XBlock user state, by block type, whose updates are written behind
+# in bulk rather than as they're saved. See courseware.user_state_client.
+STUDENT_MODULE_WRITE_BEHIND = {
+    'BLOCK_TYPES': {},
+    'FLUSH_ON_REQUEST_END': True,
+    'WINDOW': 5,
+    'MAX_PENDING': 1000,
+}
+
 ############# ModuleStore Configuration ##########
 
 MODULESTORE_BRANCH = 'published-only'
@@ -830,6 +857,15 @@ CODE_JAIL = {
         # How many CPU seconds can jailed code use?
         'CPU': 1,
     },
+
+    # Pool of reusable sandbox workers, with the modules problem code uses
+    # already imported.  A size of 0 starts a new sandbox for each execution.
+    'pool': {
+        # How many idle workers can be kept?
+        'size': 0,
+        # How many executions can a worker run before it is replaced?
+        'max_executions': 100,
+    },
 }
 
 # Some courses are allowed to run unsafe code. This is a list of regexes, one
@@ -1229,6 +1265,9 @@ MIDDLEWARE_CLASSES = (
     # to redirected unenrolled students to the course info page
     'courseware.middleware.RedirectMiddleware',
 
+    # Writes the XBlock user state written behind, before the RequestCache is cleared
+    'courseware.middleware.UserStateWriteBehindMiddleware',
+
     'course_wiki.middleware.WikiAccessMiddleware',
 
     'openedx.core.djangoapps.theming.middleware.CurrentSiteThemeMiddleware',
@@ -1872,12 +1911,36 @@ BLOCK_STRUCTURES_SETTINGS = dict(
     # Maximum number of retries per task.
     TASK_MAX_RETRIES=5,
 
+    # Limits of the process-local cache of block structures, kept in
+    # front of the django cache.  Used only with storage backing, since
+    # cache keys are then versioned.  Set to 0 to disable.
+    LOCAL_CACHE_MAX_ENTRIES=0,
+    LOCAL_CACHE_MAX_BYTES=0,
+
     # Backend storage
     # STORAGE_CLASS='storages.backends.s3boto.S3BotoStorage',
     # STORAGE_KWARGS=dict(bucket='nim-beryl-test'),
     # DIRECTORY_PREFIX='/modeltest/',
 )
 
+# Limits of the process-local cache of split modulestore course
+# structures, kept in front of the course_structure_cache.  Set to 0 to
+# disable.
+COURSE_STRUCTURE_LOCAL_CACHE = dict(
+    MAX_ENTRIES=0,
+    MAX_BYTES=0,
+)
+
+# Local disk cache of chunks of course assets too large for the
+# course_assets cache, used by the contentserver.  Disabled unless a
+# DIRECTORY is set.
+CONTENTSERVER_DISK_CACHE = dict(
+    DIRECTORY=None,
+    MAX_BYTES=10 * 1024 ** 3,
+    CHUNK_SIZE=1024 ** 2,
+    MIN_ASSET_BYTES=1024 ** 2,
+)
+
 ################################ Bulk Email ###################################
 
 # Suffix used to construct 'from' email address for bulk emails.
@@ -2526,6 +2589,10 @@ BADGR_TIMEOUT = 10
 # the ones that contain information other than grades.
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
+# Number of enrolled users whose grades are reported by each parallel subtask
+# of a course or problem grade report.  Reports are not parallelized if 0.
+GRADES_DOWNLOAD_USERS_PER_SHARD = 0
+
 GRADES_DOWNLOAD = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-grades',
@@ -0,0 +1,184 @@
+"""
+A short-lived read-through cache of responses from the comments service.
+
+Responses are cached for the rest of the request, and in a shared cache for
+a few seconds, so that views and rapid navigation which read the same threads
+and users don't each make a request of the comments service for them.
+
+Each cached response is keyed by the version stamps of the objects it
+depends on, such as u'Thread.<id>' or u'course.<course_id>'.  Writes through
+the comment client replace the stamps of the objects they change, so that
+later reads miss the responses cached before the writes.  Writes made
+elsewhere are seen once the responses expire.
+
+The cache is off unless enabled by the COMMENTS_SERVICE_CACHE setting, as in:
+    COMMENTS_SERVICE_CACHE = {
+        'ENABLED': True,
+        'CACHE': 'default',
+        'TIMEOUT': 10,
+    }
+"""
+import copy
+import hashlib
+import json
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+import dogstats_wrapper as dog_stats_api
+import request_cache
+
+from .utils import perform_request
+
+REQUEST_CACHE_NAME = 'comment_client.cache'
+
+# Seconds for which version stamps are kept, which must be longer than any response is cached.
+VERSION_TIMEOUT = 24 * 60 * 60
+
+
+def _cache_settings():
+    """
+    Returns the COMMENTS_SERVICE_CACHE setting.
+    """
+    return getattr(settings, 'COMMENTS_SERVICE_CACHE', {})
+
+
+def is_enabled():
+    """
+    Returns whether responses are cached.
+    """
+    return _cache_settings().get('ENABLED', False)
+
+
+def _shared_cache():
+    """
+    Returns the cache shared by processes.
+    """
+    return caches[_cache_settings().get('CACHE', 'default')]
+
+
+def _version_key(stamp):
+    """
+    Returns the cache key of the version of the given stamp.
+    """
+    return u'comment_client.version.{}'.format(hashlib.md5(stamp.encode('utf-8')).hexdigest())
+
+
+def _get_version(stamp):
+    """
+    Returns the current version of the given stamp, which is read once per request.
+    """
+    versions = request_cache.get_cache(REQUEST_CACHE_NAME).setdefault('versions', {})
+    if stamp not in versions:
+        shared_cache = _shared_cache()
+        key = _version_key(stamp)
+        version = shared_cache.get(key)
+        if version is None:
+            version = uuid4().hex
+            if not shared_cache.add(key, version, VERSION_TIMEOUT):
+                version = shared_cache.get(key) or version
+        versions[stamp] = version
+    return versions[stamp]
+
+
+def invalidate(*stamps):
+    """
+    Replaces the versions of the given stamps, so that no responses cached before are read.
+    """
+    if not is_enabled():
+        return
+    versions = request_cache.get_cache(REQUEST_CACHE_NAME).setdefault('versions', {})
+    shared_cache = _shared_cache()
+    for stamp in stamps:
+        shared_cache.set(_version_key(stamp), uuid4().hex, VERSION_TIMEOUT)
+        versions.pop(stamp, None)
+
+
+def _response_key(stamps, request_kwargs):
+    """
+    Returns the cache key of the response to the request, for the current versions of the stamps.
+    """
+    key_data = json.dumps(
+        [
+            [(stamp, _get_version(stamp)) for stamp in stamps],
+            request_kwargs['method'],
+            request_kwargs['url'],
+            request_kwargs.get('data_or_params'),
+            request_kwargs.get('raw', False),
+        ],
+        sort_keys=True,
+        default=unicode,
+    )
+    return u'comment_client.response.{}'.format(hashlib.md5(key_data).hexdigest())
+
+
+def _record(request_kwargs, result, layer=None):
+    """
+    Records a metric for a cache lookup, from which hit rates are charted.
+    """
+    tags = [u'result:{}'.format(result)]
+    if layer:
+        tags.append(u'layer:{}'.format(layer))
+    if request_kwargs.get('metric_action'):
+        tags.append(u'action:{}'.format(request_kwargs['metric_action']))
+    dog_stats_api.increment('comment_client.cache.lookup', tags=tags)
+
+
+def get_response(stamps, request_kwargs):
+    """
+    Returns the cached response to the request with the given keyword arguments of
+    perform_request, or None if it isn't cached.
+    """
+    if not is_enabled():
+        return None
+    key = _response_key(stamps, request_kwargs)
+    responses = request_cache.get_cache(REQUEST_CACHE_NAME).setdefault('responses', {})
+    if key in responses:
+        _record(request_kwargs, 'hit', 'request')
+    else:
+        response = _shared_cache().get(key)
+        if response is None:
+            _record(request_kwargs, 'miss')
+            return None
+        _record(request_kwargs, 'hit', 'shared')
+        responses[key] = response
+    # Copied, since models keep and change the values of responses.
+    return copy.deepcopy(responses[key])
+
+
+def set_response(stamps, request_kwargs, response):
+    """
+    Caches the response to the request with the given keyword arguments of perform_request.
+    """
+    if not is_enabled():
+        return
+    key = _response_key(stamps, request_kwargs)
+    request_cache.get_cache(REQUEST_CACHE_NAME).setdefault('responses', {})[key] = copy.deepcopy(response)
+    _shared_cache().set(key, response, _cache_settings().get('TIMEOUT', 10))
+
+
+def perform_cached_request(stamps, request_kwargs):
+    """
+    Returns the response to the request with the given keyword arguments of perform_request,
+    from the cache if it's there, otherwise performing the request and caching its response.
+    """
+    response = get_response(stamps, request_kwargs)
+    if response is None:
+        response = perform_request(**request_kwargs)
+        set_response(stamps, request_kwargs, response)
+    return response
+
+
+def model_stamp(model_class, model_id):
+    """
+    Returns the version stamp of the model of the given class and id.
+    """
+    return u'{}.{}'.format(model_class.__name__, model_id)
+
+
+def course_stamp(course_id):
+    """
+    Returns the version stamp of the threads of the given course.
+    """
+    return u'course.{}'.format(course_id)
@@ -1,4 +1,4 @@
-from lms.lib.comment_client import models, settings
+from lms.lib.comment_client import cache, models, settings
 
 from .thread import Thread, _url_for_flag_abuse_thread, _url_for_unflag_abuse_thread
 from .utils import CommentClientRequestError, perform_request
@@ -36,6 +36,13 @@ class Comment(models.Model):
             self._cached_thread = Thread(id=self.thread_id, type='thread')
         return self._cached_thread
 
+    def _invalidation_stamps(self):
+        stamps = super(Comment, self)._invalidation_stamps()
+        # A comment is also part of its thread.
+        if self.attributes.get('thread_id'):
+            stamps.append(cache.model_stamp(Thread, self.attributes['thread_id']))
+        return stamps
+
     @property
     def context(self):
         """Return the context of the thread which this comment belongs to."""
@@ -71,6 +78,7 @@ class Comment(models.Model):
             metric_action='comment.abuse.flagged'
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cache()
 
     def unFlagAbuse(self, user, voteable, removeAll):
         if voteable.type == 'thread':
@@ -92,6 +100,7 @@ class Comment(models.Model):
             metric_action='comment.abuse.unflagged'
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cache()
 
 
 def _url_for_thread_comments(thread_id):
@@ -1,6 +1,7 @@
 import logging
 
-from .utils import CommentClientRequestError, extract, perform_request
+from . import cache
+from .utils import CommentClientRequestError, extract, perform_request, perform_requests
 
 log = logging.getLogger(__name__)
 
@@ -66,15 +67,112 @@ class Model(object):
         return self
 
     def _retrieve(self, *args, **kwargs):
-        url = self.url(action='get', params=self.attributes)
-        response = perform_request(
-            'get',
-            url,
-            self.default_retrieve_params,
-            metric_tags=self._metric_tags,
-            metric_action='model.retrieve'
-        )
+        request_kwargs = self._retrieve_request(**kwargs)
+        response = self._perform_retrieve(request_kwargs)
         self._update_from_response(response)
+        cache.invalidate(*self._retrieval_invalidation_stamps(request_kwargs))
+
+    def _perform_retrieve(self, request_kwargs):
+        """
+        Performs the request for retrieving this model, through the cache if it may be cached.
+        """
+        stamps = self._cache_stamps(request_kwargs)
+        if stamps is None:
+            return perform_request(**request_kwargs)
+        return cache.perform_cached_request(stamps, request_kwargs)
+
+    def _cache_stamps(self, request_kwargs):
+        """
+        Returns the version stamps of the response to the request for retrieving this model,
+        or None if the response mustn't be cached.
+        """
+        return [cache.model_stamp(self.__class__, self.id)]
+
+    def _retrieval_invalidation_stamps(self, request_kwargs):
+        """
+        Returns the version stamps of the cached responses which the request for retrieving
+        this model changes, for requests which write as they read.
+        """
+        return []
+
+    def _invalidation_stamps(self):
+        """
+        Returns the version stamps of the cached responses which a write to this model changes.
+        """
+        stamps = [cache.model_stamp(self.__class__, self.id)]
+        # Read from the attributes, since reading a missing field would retrieve the model.
+        if self.attributes.get('course_id'):
+            stamps.append(cache.course_stamp(self.attributes['course_id']))
+        return stamps
+
+    def _invalidate_cache(self, *others):
+        """
+        Invalidates the cached responses which a write to this model and the given others changes.
+        """
+        stamps = list(self._invalidation_stamps())
+        for other in others:
+            stamps.extend(other._invalidation_stamps())  # pylint: disable=protected-access
+        cache.invalidate(*stamps)
+
+    def _retrieve_request(self, **kwargs):
+        """
+        Returns the keyword arguments of perform_request for retrieving this model.
+        """
+        return {
+            'method': 'get',
+            'url': self.url(action='get', params=self.attributes),
+            'data_or_params': self.default_retrieve_params,
+            'metric_tags': self._metric_tags,
+            'metric_action': 'model.retrieve',
+        }
+
+    @staticmethod
+    def retrieve_all(instances, other_requests=()):
+        """
+        Retrieves those of the given models which aren't yet retrieved, with the other given
+        requests, in one batch of requests performed at once.
+
+        If any of the requests fail, the models are retrieved and the other requests are
+        performed one at a time instead, so that models recover from failures as they do
+        when retrieved on their own.
+
+        Arguments:
+            instances (list): The models to retrieve.
+            other_requests (list): The keyword arguments of perform_request for each other request.
+
+        Returns:
+            A list of the results of the other requests, in the same order.
+        """
+        # pylint: disable=protected-access
+        pending = []
+        for instance in instances:
+            if instance.retrieved:
+                continue
+            request_kwargs = instance._retrieve_request()
+            stamps = instance._cache_stamps(request_kwargs)
+            response = cache.get_response(stamps, request_kwargs) if stamps is not None else None
+            if response is None:
+                pending.append(instance)
+            else:
+                instance._update_from_response(response)
+                instance.retrieved = True
+
+        try:
+            results = perform_requests([instance._retrieve_request() for instance in pending] + list(other_requests))
+        except CommentClientRequestError:
+            for instance in pending:
+                instance.retrieve()
+            return [perform_request(**request_kwargs) for request_kwargs in other_requests]
+
+        for instance, response in zip(pending, results):
+            request_kwargs = instance._retrieve_request()
+            stamps = instance._cache_stamps(request_kwargs)
+            if stamps is not None:
+                cache.set_response(stamps, request_kwargs, response)
+            instance._update_from_response(response)
+            instance.retrieved = True
+            cache.invalidate(*instance._retrieval_invalidation_stamps(request_kwargs))
+        return results[len(pending):]
 
     @property
     def _metric_tags(self):
@@ -151,6 +249,7 @@ class Model(object):
             )
         self.retrieved = True
         self._update_from_response(response)
+        self._invalidate_cache()
         self.after_save(self)
 
     def delete(self):
@@ -158,6 +257,7 @@ class Model(object):
         response = perform_request('delete', url, metric_tags=self._metric_tags, metric_action='model.delete')
         self.retrieved = True
         self._update_from_response(response)
+        self._invalidate_cache()
 
     @classmethod
     def url_with_id(cls, params={}):
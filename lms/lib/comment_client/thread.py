@@ -5,6 +5,8 @@ import settings
 import models
 from eventtracking import tracker
 
+from . import cache
+from .user import User
 from .utils import (
     CommentClientPaginatedResult,
     CommentClientRequestError,
@@ -52,7 +54,11 @@ class Thread(models.Model):
     type = 'thread'
 
     @classmethod
-    def search(cls, query_params):
+    def search(cls, query_params, prefetch=()):
+        """
+        Searches for the threads matching the query_params. Any models given as prefetch are
+        retrieved along with the search, rather than in requests of their own.
+        """
 
         # NOTE: Params 'recursive' and 'with_responses' are currently not used by
         # either the 'search' or 'get_all' actions below.  Both already use
@@ -69,14 +75,24 @@ class Thread(models.Model):
             url = cls.url(action='get_all', params=extract(params, 'commentable_id'))
             if params.get('commentable_id'):
                 del params['commentable_id']
-        response = perform_request(
-            'get',
-            url,
-            params,
-            metric_tags=[u'course_id:{}'.format(query_params['course_id'])],
-            metric_action='thread.search',
-            paged_results=True
-        )
+        request_kwargs = {
+            'method': 'get',
+            'url': url,
+            'data_or_params': params,
+            'metric_tags': [u'course_id:{}'.format(query_params['course_id'])],
+            'metric_action': 'thread.search',
+            'paged_results': True,
+        }
+        stamps = [cache.course_stamp(query_params['course_id'])]
+        if params.get('user_id'):
+            # The threads are read or unread for the user, as they mark them read.
+            stamps.append(cache.model_stamp(User, params['user_id']))
+        response = cache.get_response(stamps, request_kwargs)
+        if response is None:
+            response, = cls.retrieve_all(prefetch, [request_kwargs])
+            cache.set_response(stamps, request_kwargs, response)
+        else:
+            cls.retrieve_all(prefetch)
         if query_params.get('text'):
             search_query = query_params['text']
             course_id = query_params['course_id']
@@ -136,11 +152,8 @@ class Thread(models.Model):
         else:
             return super(Thread, cls).url(action, params)
 
-    # TODO: This is currently overriding Model._retrieve only to add parameters
-    # for the request. Model._retrieve should be modified to handle this such
-    # that subclasses don't need to override for this.
-    def _retrieve(self, *args, **kwargs):
-        url = self.url(action='get', params=self.attributes)
+    # Overrides Model._retrieve_request to add parameters for the request.
+    def _retrieve_request(self, **kwargs):
         request_params = {
             'recursive': kwargs.get('recursive'),
             'with_responses': kwargs.get('with_responses', False),
@@ -151,14 +164,29 @@ class Thread(models.Model):
         }
         request_params = strip_none(request_params)
 
-        response = perform_request(
-            'get',
-            url,
-            request_params,
-            metric_action='model.retrieve',
-            metric_tags=self._metric_tags
-        )
-        self._update_from_response(response)
+        return {
+            'method': 'get',
+            'url': self.url(action='get', params=self.attributes),
+            'data_or_params': request_params,
+            'metric_action': 'model.retrieve',
+            'metric_tags': self._metric_tags,
+        }
+
+    def _cache_stamps(self, request_kwargs):
+        # Marking the thread as read is a write, so it mustn't be skipped.
+        if request_kwargs['data_or_params'].get('mark_as_read'):
+            return None
+        return super(Thread, self)._cache_stamps(request_kwargs)
+
+    def _retrieval_invalidation_stamps(self, request_kwargs):
+        request_params = request_kwargs['data_or_params']
+        if not request_params.get('mark_as_read'):
+            return []
+        # The thread is now read by the user, in their retrievals of it and their searches.
+        stamps = [cache.model_stamp(Thread, self.id)]
+        if request_params.get('user_id'):
+            stamps.append(cache.model_stamp(User, request_params['user_id']))
+        return stamps
 
     def flagAbuse(self, user, voteable):
         if voteable.type == 'thread':
@@ -176,6 +204,7 @@ class Thread(models.Model):
             metric_tags=self._metric_tags
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cache()
 
     def unFlagAbuse(self, user, voteable, removeAll):
         if voteable.type == 'thread':
@@ -197,6 +226,7 @@ class Thread(models.Model):
             metric_action='thread.abuse.unflagged'
         )
         voteable._update_from_response(response)
+        voteable._invalidate_cache()
 
     def pin(self, user, thread_id):
         url = _url_for_pin_thread(thread_id)
@@ -209,6 +239,7 @@ class Thread(models.Model):
             metric_action='thread.pin'
         )
         self._update_from_response(response)
+        self._invalidate_cache()
 
     def un_pin(self, user, thread_id):
         url = _url_for_un_pin_thread(thread_id)
@@ -221,6 +252,7 @@ class Thread(models.Model):
             metric_action='thread.unpin'
         )
         self._update_from_response(response)
+        self._invalidate_cache()
 
 
 def _url_for_flag_abuse_thread(thread_id):
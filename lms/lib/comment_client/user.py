@@ -43,6 +43,7 @@ class User(models.Model):
             metric_action='user.read',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        self._invalidate_cache(source)
 
     def follow(self, source):
         params = {'source_type': source.type, 'source_id': source.id}
@@ -53,6 +54,7 @@ class User(models.Model):
             metric_action='user.follow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        self._invalidate_cache(source)
 
     def unfollow(self, source):
         params = {'source_type': source.type, 'source_id': source.id}
@@ -63,6 +65,7 @@ class User(models.Model):
             metric_action='user.unfollow',
             metric_tags=self._metric_tags + ['target.type:{}'.format(source.type)],
         )
+        self._invalidate_cache(source)
 
     def vote(self, voteable, value):
         if voteable.type == 'thread':
@@ -80,6 +83,7 @@ class User(models.Model):
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
         )
         voteable._update_from_response(response)
+        self._invalidate_cache(voteable)
 
     def unvote(self, voteable):
         if voteable.type == 'thread':
@@ -97,6 +101,7 @@ class User(models.Model):
             metric_tags=self._metric_tags + ['target.type:{}'.format(voteable.type)],
         )
         voteable._update_from_response(response)
+        self._invalidate_cache(voteable)
 
     def active_threads(self, query_params={}):
         if not self.course_id:
@@ -136,37 +141,33 @@ class User(models.Model):
         )
 
     def _retrieve(self, *args, **kwargs):
-        url = self.url(action='get', params=self.attributes)
-        retrieve_params = self.default_retrieve_params.copy()
-        retrieve_params.update(kwargs)
-        if self.attributes.get('course_id'):
-            retrieve_params['course_id'] = self.course_id.to_deprecated_string()
-        if self.attributes.get('group_id'):
-            retrieve_params['group_id'] = self.group_id
         try:
-            response = perform_request(
-                'get',
-                url,
-                retrieve_params,
-                metric_action='model.retrieve',
-                metric_tags=self._metric_tags,
-            )
+            response = self._perform_retrieve(self._retrieve_request(**kwargs))
         except CommentClientRequestError as e:
             if e.status_code == 404:
                 # attempt to gracefully recover from a previous failure
                 # to sync this user to the comments service.
                 self.save()
-                response = perform_request(
-                    'get',
-                    url,
-                    retrieve_params,
-                    metric_action='model.retrieve',
-                    metric_tags=self._metric_tags,
-                )
+                response = perform_request(**self._retrieve_request(**kwargs))
             else:
                 raise
         self._update_from_response(response)
 
+    def _retrieve_request(self, **kwargs):
+        retrieve_params = self.default_retrieve_params.copy()
+        retrieve_params.update(kwargs)
+        if self.attributes.get('course_id'):
+            retrieve_params['course_id'] = self.course_id.to_deprecated_string()
+        if self.attributes.get('group_id'):
+            retrieve_params['group_id'] = self.group_id
+        return {
+            'method': 'get',
+            'url': self.url(action='get', params=self.attributes),
+            'data_or_params': retrieve_params,
+            'metric_action': 'model.retrieve',
+            'metric_tags': self._metric_tags,
+        }
+
 
 def _url_for_vote_comment(comment_id):
     return "{prefix}/comments/{comment_id}/votes".format(prefix=settings.PREFIX, comment_id=comment_id)
@@ -1,6 +1,10 @@
 """" Common utilities for comment client wrapper """
+import cookielib
 import logging
+import os
+import threading
 from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 from time import time
 from uuid import uuid4
 
@@ -9,9 +13,17 @@ from django.conf import settings
 from django.utils.translation import get_language
 
 import dogstats_wrapper as dog_stats_api
+import request_cache
 
 log = logging.getLogger(__name__)
 
+# Maximum number of requests performed at once by perform_requests.
+MAX_CONCURRENT_REQUESTS = 10
+
+_SESSION = None
+_SESSION_PID = None
+_SESSION_LOCK = threading.Lock()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -53,17 +65,114 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
+def _is_pooled():
+    """
+    Returns whether requests are sent over the pooled session, as configured by the
+    COMMENTS_SERVICE_HTTP_POOL setting.
+    """
+    return getattr(settings, 'COMMENTS_SERVICE_HTTP_POOL', {}).get('ENABLED', False)
+
+
+def _get_session():
+    """
+    Returns this process's requests.Session for the comments service, whose connections
+    are kept alive and reused by all of the process's threads.
+    """
+    global _SESSION, _SESSION_PID  # pylint: disable=global-statement
+    with _SESSION_LOCK:
+        # A forked process mustn't share its parent's connections.
+        if _SESSION is None or _SESSION_PID != os.getpid():
+            pool_settings = settings.COMMENTS_SERVICE_HTTP_POOL
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=pool_settings.get('POOL_CONNECTIONS', 1),
+                pool_maxsize=pool_settings.get('POOL_MAXSIZE', 10),
+                max_retries=pool_settings.get('MAX_RETRIES', 0),
+            )
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            # The session is shared by the requests of all users, so it mustn't keep cookies.
+            session.cookies.set_policy(cookielib.DefaultCookiePolicy(allowed_domains=[]))
+            _SESSION = session
+            _SESSION_PID = os.getpid()
+        return _SESSION
+
+
+def _send_request(method, url, **kwargs):
+    """
+    Sends a request to the comments service, over the pooled session if it's enabled.
+    """
+    if _is_pooled():
+        return _get_session().request(method, url, **kwargs)
+    return requests.request(method, url, **kwargs)
+
+
+def _get_forums_config():
+    """
+    Returns the current ForumsConfig, which is read once per request.
+    """
+    # To avoid dependency conflict
+    from django_comment_common.models import ForumsConfig, FORUMS_CONFIG_REQUEST_CACHE
+    cache = request_cache.get_cache(FORUMS_CONFIG_REQUEST_CACHE)
+    if 'current' not in cache:
+        cache['current'] = ForumsConfig.current()
+    return cache['current']
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
                     metric_action=None, metric_tags=None, paged_results=False):
-    # To avoid dependency conflict
-    from django_comment_common.models import ForumsConfig
-    config = ForumsConfig.current()
+    return _perform_request(
+        _get_forums_config(), get_language(), method, url, data_or_params=data_or_params, raw=raw,
+        metric_action=metric_action, metric_tags=metric_tags, paged_results=paged_results,
+    )
+
+
+def perform_requests(requests_kwargs):
+    """
+    Performs several requests to the comments service at once, so that they take about as
+    long as the slowest of them, rather than the sum of them.
+
+    Arguments:
+        requests_kwargs (list): The keyword arguments of perform_request for each request.
+
+    Returns:
+        A list of the results of the requests, in the same order.
+
+    Raises:
+        The error of a request which failed, once all of the requests are done.
+    """
+    config = _get_forums_config()
+    # The language is read here since it's local to this thread.
+    language = get_language()
+
+    def perform(request_kwargs):
+        """
+        Performs the request with the given keyword arguments.
+        """
+        return _perform_request(config, language, **request_kwargs)
+
+    # Without the pooled session, each thread would open a connection of its own.
+    if len(requests_kwargs) <= 1 or not _is_pooled():
+        return [perform(request_kwargs) for request_kwargs in requests_kwargs]
+
+    pool = ThreadPool(min(len(requests_kwargs), MAX_CONCURRENT_REQUESTS))
+    try:
+        return pool.map(perform, requests_kwargs)
+    finally:
+        pool.close()
+        pool.join()
+
 
+def _perform_request(config, language, method, url, data_or_params=None, raw=False,
+                     metric_action=None, metric_tags=None, paged_results=False):
+    """
+    Performs a request, with the given ForumsConfig and language.
+    """
     if not config.enabled:
         raise CommentClientMaintenanceError('service disabled')
 
-    if metric_tags is None:
-        metric_tags = []
+    # Copied, since the same request may be performed again after a failed batch.
+    metric_tags = list(metric_tags) if metric_tags else []
 
     metric_tags.append(u'method:{}'.format(method))
     if metric_action:
@@ -73,7 +182,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data_or_params = {}
     headers = {
         'X-Edx-Api-Key': config.api_key,
-        'Accept-Language': get_language(),
+        'Accept-Language': language,
     }
     request_id = uuid4()
     request_id_dict = {'request_id': request_id}
@@ -85,7 +194,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = _send_request(
             method,
             url,
             data=data,
@@ -17,6 +17,7 @@ import analytics
 
 from openedx.core.djangoapps.monkey_patch import django_db_models_options
 
+import capa.safe_exec
 import xmodule.x_module
 import lms_xblock.runtime
 
@@ -55,6 +56,8 @@ def run():
 
     add_mimetypes()
 
+    configure_sandbox_pool()
+
     # Mako requires the directories to be added after the django setup.
     microsite.enable_microsites(log)
 
@@ -90,6 +93,14 @@ def run():
     validate_lms_config(settings)
 
 
+def configure_sandbox_pool():
+    """
+    Configure the pool of sandbox workers that executes capa problem code.
+    """
+    pool_settings = settings.CODE_JAIL.get('pool', {})
+    capa.safe_exec.configure_pool(pool_settings.get('size', 0), pool_settings.get('max_executions', 100))
+
+
 def add_mimetypes():
     """
     Add extra mimetypes. Used in xblock_resource.
@@ -58,7 +58,7 @@ class BlockStructureFactory(object):
         return block_structure
 
     @classmethod
-    def create_from_store(cls, root_block_usage_key, block_structure_store):
+    def create_from_store(cls, root_block_usage_key, block_structure_store, transformer_names=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key from the given store, if it's found in the store.
@@ -75,6 +75,10 @@ class BlockStructureFactory(object):
                 store from which the block structure is to be
                 deserialized.
 
+            transformer_names (set(string)) - Names of the transformers
+                whose collected data is to be fetched up front from the
+                store.  If None, the data of all transformers is fetched.
+
         Returns:
             BlockStructure - The deserialized block structure starting
                 at root_block_usage_key, if found in the cache.
@@ -83,7 +87,7 @@ class BlockStructureFactory(object):
             BlockStructureNotFound - If the root_block_usage_key is not found
                 in the store.
         """
-        return block_structure_store.get(root_block_usage_key)
+        return block_structure_store.get(root_block_usage_key, transformer_names)
 
     @classmethod
     def create_new(cls, root_block_usage_key, block_relations, transformer_data, block_data_map):
@@ -0,0 +1,133 @@
+"""
+Command to compare the sizes and load times of the serialization
+formats available for collected course blocks.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from xmodule.modulestore.django import modulestore
+
+from openedx.core.djangoapps.content.block_structure.factory import BlockStructureFactory
+import openedx.core.djangoapps.content.block_structure.serializer as serializer
+from openedx.core.djangoapps.content.block_structure.transformers import BlockStructureTransformers
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.command_utils import parse_course_keys
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms compare_block_structure_serializers --courses 'edX/DemoX/Demo_Course' --settings=devstack
+        $ ./manage.py lms compare_block_structure_serializers --courses 'edX/DemoX/Demo_Course' \
+            --fields display_name due --iterations 20 --settings=devstack
+    """
+    help = u'Compares the sizes and load times of the zpickle and columnar block structure serialization formats.'
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--courses',
+            dest='courses',
+            nargs='+',
+            required=True,
+            help=u'Compare serialization formats for the list of courses provided.',
+        )
+        parser.add_argument(
+            '--fields',
+            dest='fields',
+            nargs='+',
+            default=['display_name', 'category'],
+            help=u'xBlock fields to read from every block when measuring partial loads.',
+        )
+        parser.add_argument(
+            '--iterations',
+            help=u'Number of times to load each format.',
+            default=10,
+            type=int,
+        )
+
+    def handle(self, *args, **options):
+        for course_key in parse_course_keys(options['courses']):
+            block_structure = self._collect(course_key)
+            self.stdout.write(u'Course: {} ({} blocks)'.format(course_key, len(block_structure)))
+            for format_name, serialize, deserialize in self._formats():
+                serialized_data = serialize(block_structure)
+                full_load_time = self._time_load(
+                    deserialize, serialized_data, block_structure, None, options['iterations'],
+                )
+                partial_load_time = self._time_load(
+                    deserialize, serialized_data, block_structure, options['fields'], options['iterations'],
+                )
+                self.stdout.write(
+                    u'  {:<10} size: {:>10} bytes, full load: {:>8.2f} ms, partial load: {:>8.2f} ms'.format(
+                        format_name, len(serialized_data), full_load_time, partial_load_time,
+                    )
+                )
+
+    def _collect(self, course_key):
+        """
+        Returns a block structure for the given course, freshly collected
+        from the modulestore, so it is independent of the format of any
+        data already in the block structure store.
+        """
+        store = modulestore()
+        with store.bulk_operations(course_key):
+            block_structure = BlockStructureFactory.create_from_modulestore(
+                store.make_course_usage_key(course_key),
+                store,
+            )
+            BlockStructureTransformers.collect(block_structure)
+        return block_structure
+
+    def _formats(self):
+        """
+        Returns a list of (name, serialize function, deserialize function)
+        for each of the serialization formats to compare.
+        """
+        # pylint: disable=protected-access
+        def serialize_zpickle(block_structure):
+            """
+            Serializes the given block structure as done by the legacy store.
+            """
+            return zpickle((
+                block_structure._block_relations,
+                block_structure.transformer_data,
+                block_structure._block_data_map,
+            ))
+
+        def deserialize_zpickle(serialized_data, root_block_usage_key):  # pylint: disable=unused-argument
+            """
+            Deserializes the given zpickled data, returning the block data map.
+            """
+            return zunpickle(serialized_data)[2]
+
+        def deserialize_columnar(serialized_data, root_block_usage_key):
+            """
+            Deserializes the given columnar data, returning the block data map.
+            """
+            return serializer.deserialize(serialized_data, root_block_usage_key)._block_data_map
+
+        return [
+            ('zpickle', serialize_zpickle, deserialize_zpickle),
+            ('columnar', serializer.serialize, deserialize_columnar),
+        ]
+
+    def _time_load(self, deserialize, serialized_data, block_structure, field_names, iterations):
+        """
+        Returns the average time, in milliseconds, to deserialize the given
+        data and read the given xBlock fields of every block.  All collected
+        xBlock fields and transformer block data are read if field_names is None.
+        """
+        start = time.time()
+        for _ in range(iterations):
+            block_data_map = deserialize(serialized_data, block_structure.root_block_usage_key)
+            for block_key, original_block_data in block_structure.iteritems():
+                block_data = block_data_map[block_key]
+                for field_name in original_block_data.fields if field_names is None else field_names:
+                    getattr(block_data, field_name, None)
+                if field_names is None:
+                    for transformer_name in original_block_data.transformer_data:
+                        block_data.transformer_data[transformer_name]  # pylint: disable=pointless-statement
+        return (time.time() - start) * 1000 / max(iterations, 1)
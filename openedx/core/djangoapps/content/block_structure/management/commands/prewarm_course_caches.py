@@ -0,0 +1,96 @@
+"""
+Command to prewarm the caches of courses.
+"""
+import logging
+
+from django.core.management.base import BaseCommand
+
+import openedx.core.djangoapps.content.block_structure.prewarm as prewarm
+import openedx.core.djangoapps.content.block_structure.tasks as tasks
+from openedx.core.lib.command_utils import (
+    get_mutually_exclusive_required_option,
+    validate_dependent_option,
+    parse_course_keys,
+)
+
+
+log = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """
+    Example usage:
+        $ ./manage.py lms prewarm_course_caches --top_enrolled 50 --workers 8 --settings=devstack
+        $ ./manage.py lms prewarm_course_caches --courses 'edX/DemoX/Demo_Course' --settings=devstack
+    """
+    args = u'<course_id course_id ...>'
+    help = (
+        u'Prewarms the course structure, block structure and course overview caches '
+        u'of one or more courses, such as after a deploy or a cache flush.'
+    )
+
+    def add_arguments(self, parser):
+        """
+        Entry point for subclassed commands to add custom arguments.
+        """
+        parser.add_argument(
+            '--courses',
+            dest='courses',
+            nargs='+',
+            help=u'Prewarm the caches of the list of courses provided.',
+        )
+        parser.add_argument(
+            '--top_enrolled',
+            help=u'Prewarm the caches of this number of courses with the most active enrollments.',
+            default=0,
+            type=int,
+        )
+        parser.add_argument(
+            '--workers',
+            help=u'Number of courses to prewarm at once.',
+            default=prewarm.DEFAULT_PREWARM_WORKERS,
+            type=int,
+        )
+        parser.add_argument(
+            '--enqueue_task',
+            help=u'Enqueue a task to prewarm the caches asynchronously.',
+            action='store_true',
+            default=False,
+        )
+        parser.add_argument(
+            '--routing_key',
+            dest='routing_key',
+            help=u'Routing key to use for asynchronous prewarming.',
+        )
+
+    def handle(self, *args, **options):
+
+        courses_mode = get_mutually_exclusive_required_option(options, 'courses', 'top_enrolled')
+        validate_dependent_option(options, 'routing_key', 'enqueue_task')
+        workers = options.get('workers') or prewarm.DEFAULT_PREWARM_WORKERS
+
+        if options.get('enqueue_task'):
+            task_kwargs = {'workers': workers}
+            if courses_mode == 'top_enrolled':
+                task_kwargs['top_enrolled'] = options['top_enrolled']
+            else:
+                course_keys = parse_course_keys(options['courses'])
+                task_kwargs['course_ids'] = [unicode(course_key) for course_key in course_keys]
+            task_options = {'routing_key': options['routing_key']} if options.get('routing_key') else {}
+            result = tasks.prewarm_course_caches.apply_async(kwargs=task_kwargs, **task_options)
+            log.info(u'Prewarm: ENQUEUED prewarming course caches, task_id: %s.', result.id)
+            return
+
+        if courses_mode == 'top_enrolled':
+            course_keys = prewarm.top_course_keys_by_enrollment(options['top_enrolled'])
+        else:
+            course_keys = parse_course_keys(options['courses'])
+
+        log.critical(u'Prewarm: STARTED prewarming caches of %d courses with %d workers.', len(course_keys), workers)
+        failed_course_keys = prewarm.prewarm_courses(course_keys, workers=workers)
+        log.critical(
+            u'Prewarm: FINISHED prewarming caches of %d courses, %d failed: %s',
+            len(course_keys),
+            len(failed_course_keys),
+            u', '.join(unicode(course_key) for course_key in failed_course_keys),
+        )
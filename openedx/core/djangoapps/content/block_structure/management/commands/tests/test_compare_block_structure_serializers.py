@@ -0,0 +1,31 @@
+"""
+Tests for compare_block_structure_serializers management command.
+"""
+from django.core.management import call_command
+from StringIO import StringIO
+
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
+
+
+class TestCompareBlockStructureSerializers(ModuleStoreTestCase):
+    """
+    Tests compare_block_structure_serializers management command.
+    """
+    def setUp(self):
+        super(TestCompareBlockStructureSerializers, self).setUp()
+        self.course = CourseFactory.create()
+        ItemFactory.create(parent=self.course, category='chapter')
+
+    def test_output(self):
+        out = StringIO()
+        call_command(
+            'compare_block_structure_serializers',
+            '--courses', unicode(self.course.id),
+            '--iterations', '1',
+            stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn(u'Course: {} (2 blocks)'.format(self.course.id), output)
+        self.assertIn(u'zpickle', output)
+        self.assertIn(u'columnar', output)
@@ -0,0 +1,121 @@
+"""
+Tests for prewarm_course_caches management command.
+"""
+import ddt
+from django.core.management.base import CommandError
+from mock import patch
+
+from openedx.core.djangoapps.content.block_structure import prewarm
+from openedx.core.djangoapps.content.block_structure.tests.helpers import is_course_in_block_structure_cache
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from student.tests.factories import CourseEnrollmentFactory
+from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
+from xmodule.modulestore.tests.factories import CourseFactory
+from .. import prewarm_course_caches
+
+
+@ddt.ddt
+class TestPrewarmCourseCaches(ModuleStoreTestCase):
+    """
+    Tests prewarm course caches management command.
+    """
+    num_courses = 3
+
+    def setUp(self):
+        """
+        Create courses in modulestore.
+        """
+        super(TestPrewarmCourseCaches, self).setUp()
+        self.courses = [CourseFactory.create() for _ in range(self.num_courses)]
+        self.course_keys = [course.id for course in self.courses]
+        self.command = prewarm_course_caches.Command()
+
+    def _assert_courses_prewarmed(self, *course_keys):
+        """
+        Assert courses exist in the course block cache and have course overviews.
+        """
+        for course_key in course_keys:
+            self.assertTrue(is_course_in_block_structure_cache(course_key, self.store))
+            self.assertTrue(CourseOverview.objects.filter(id=course_key).exists())
+
+    def _assert_courses_not_prewarmed(self, *course_keys):
+        """
+        Assert courses don't exist in the course block cache or have course overviews.
+        """
+        for course_key in course_keys:
+            self.assertFalse(is_course_in_block_structure_cache(course_key, self.store))
+            self.assertFalse(CourseOverview.objects.filter(id=course_key).exists())
+
+    def test_courses(self):
+        self._assert_courses_not_prewarmed(*self.course_keys)
+        self.command.handle(courses=[unicode(self.course_keys[0])], workers=1)
+        self._assert_courses_prewarmed(self.course_keys[0])
+        self._assert_courses_not_prewarmed(*self.course_keys[1:])
+
+    def test_top_enrolled(self):
+        for num_enrollments, course_key in enumerate(self.course_keys, 1):
+            for _ in range(num_enrollments):
+                CourseEnrollmentFactory.create(course_id=course_key)
+        CourseEnrollmentFactory.create(course_id=self.course_keys[0], is_active=False)
+        CourseEnrollmentFactory.create(course_id=self.course_keys[0], is_active=False)
+
+        self.assertEqual(prewarm.top_course_keys_by_enrollment(2), self.course_keys[:0:-1])
+        self.command.handle(top_enrolled=2, workers=1)
+        self._assert_courses_prewarmed(*self.course_keys[1:])
+        self._assert_courses_not_prewarmed(self.course_keys[0])
+
+    @patch('openedx.core.djangoapps.content.block_structure.prewarm.log')
+    def test_not_found_key(self, mock_log):
+        self.command.handle(courses=['fake/course/id', unicode(self.course_keys[0])], workers=1)
+        self.assertTrue(mock_log.exception.called)
+        self._assert_courses_prewarmed(self.course_keys[0])
+
+    @ddt.data(1, 2, 5)
+    def test_workers(self, workers):
+        def prewarm_course(course_key):
+            """
+            Fail to prewarm the first course.
+            """
+            if course_key == self.course_keys[0]:
+                raise ValueError()
+
+        with patch.object(prewarm, 'prewarm_course', side_effect=prewarm_course) as mock_prewarm_course:
+            with patch.object(prewarm, 'connection'):
+                failed_course_keys = prewarm.prewarm_courses(self.course_keys, workers=workers)
+        self.assertItemsEqual(
+            [call_args[0][0] for call_args in mock_prewarm_course.call_args_list],
+            self.course_keys,
+        )
+        self.assertEqual(failed_course_keys, self.course_keys[:1])
+
+    @ddt.data('route_1', None)
+    def test_enqueue(self, routing_key):
+        command_options = dict(top_enrolled=10, enqueue_task=True, workers=2)
+        if routing_key:
+            command_options['routing_key'] = routing_key
+
+        with patch(
+            'openedx.core.djangoapps.content.block_structure.management.commands.prewarm_course_caches.tasks'
+        ) as mock_tasks:
+            self.command.handle(**command_options)
+
+        self.assertEqual(mock_tasks.prewarm_course_caches.apply_async.call_count, 1)
+        task_args = mock_tasks.prewarm_course_caches.apply_async.call_args[1]
+        self.assertEqual(task_args['kwargs'], {'top_enrolled': 10, 'workers': 2})
+        if routing_key:
+            self.assertEquals(task_args['routing_key'], routing_key)
+        else:
+            self.assertNotIn('routing_key', task_args)
+        self._assert_courses_not_prewarmed(*self.course_keys)
+
+    def test_invalid_key(self):
+        with self.assertRaises(CommandError):
+            self.command.handle(courses=['not/found'])
+
+    def test_no_course_mode(self):
+        with self.assertRaisesMessage(CommandError, 'Must specify exactly one of --courses, --top_enrolled'):
+            self.command.handle()
+
+    def test_both_course_modes(self):
+        with self.assertRaisesMessage(CommandError, 'Must specify exactly one of --courses, --top_enrolled'):
+            self.command.handle(top_enrolled=5, courses=['some/course/key'])
@@ -4,12 +4,21 @@ BlockStructures.
 """
 from contextlib import contextmanager
 
+from openedx.core.lib.cache_utils import SingleFlight
+
 from . import config
 from .exceptions import UsageKeyNotInBlockStructure, TransformerDataIncompatible, BlockStructureNotFound
 from .factory import BlockStructureFactory
 from .store import BlockStructureStore
 from .transformers import BlockStructureTransformers
 
+# Seconds a process holds the lock on collecting a block structure, at most.
+COLLECT_LOCK_TIMEOUT = 5 * 60
+
+# Seconds a process waits for another process collecting the same block
+# structure, before collecting it itself.
+COLLECT_WAIT_TIMEOUT = 10
+
 
 class BlockStructureManager(object):
     """
@@ -33,6 +42,11 @@ class BlockStructureManager(object):
         self.root_block_usage_key = root_block_usage_key
         self.modulestore = modulestore
         self.store = BlockStructureStore(cache)
+        self.single_flight = SingleFlight(
+            cache,
+            lock_timeout=COLLECT_LOCK_TIMEOUT,
+            wait_timeout=COLLECT_WAIT_TIMEOUT,
+        )
 
     def get_transformed(self, transformers, starting_block_usage_key=None, collected_block_structure=None):
         """
@@ -60,8 +74,29 @@ class BlockStructureManager(object):
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = collected_block_structure.copy() if collected_block_structure else self.get_collected()
+        if collected_block_structure:
+            block_structure = collected_block_structure.copy()
+        else:
+            block_structure = self.get_collected(transformers)
+
+        try:
+            return self._transform(block_structure, transformers, starting_block_usage_key)
+        except BlockStructureNotFound:
+            # The segment of a transformer's collected block data that was
+            # fetched upon first access was evicted, or is from another
+            # collect, so the block structure is collected anew.
+            if config.waffle().is_enabled(config.RAISE_ERROR_WHEN_NOT_FOUND):
+                raise
+            block_structure = self._update_collected(
+                lookup=lambda: self._get_collected_from_store(transformers=None),
+            )
+            return self._transform(block_structure, transformers, starting_block_usage_key)
 
+    def _transform(self, block_structure, transformers, starting_block_usage_key=None):
+        """
+        Transforms the given collected block structure, starting at
+        starting_block_usage_key, and returns it.
+        """
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
             # requested location.  The rest of the structure will be pruned
@@ -76,7 +111,7 @@ class BlockStructureManager(object):
         transformers.transform(block_structure)
         return block_structure
 
-    def get_collected(self):
+    def get_collected(self, transformers=None):
         """
         Returns the collected Block Structure for the root_block_usage_key,
         getting block data from the cache and modulestore, as needed.
@@ -85,23 +120,29 @@ class BlockStructureManager(object):
         the modulestore is accessed if needed (at cache miss), and the
         transformers data is collected if needed.
 
+        Arguments:
+            transformers (BlockStructureTransformers) - Optional
+                collection of transformers whose collected block data
+                is fetched up front from the store.  The collected
+                block data of any other transformer is fetched upon
+                first access.  If None, the collected data of all
+                transformers is fetched up front.
+
         Returns:
             BlockStructureBlockData - A collected block structure,
                 starting at root_block_usage_key, with collected data
                 from each registered transformer.
         """
         try:
-            block_structure = BlockStructureFactory.create_from_store(
-                self.root_block_usage_key,
-                self.store,
-            )
-            BlockStructureTransformers.verify_versions(block_structure)
+            block_structure = self._get_collected_from_store(transformers, raise_if_not_found=True)
 
         except (BlockStructureNotFound, TransformerDataIncompatible):
             if config.waffle().is_enabled(config.RAISE_ERROR_WHEN_NOT_FOUND):
                 raise
             else:
-                block_structure = self._update_collected()
+                block_structure = self._update_collected(
+                    lookup=lambda: self._get_collected_from_store(transformers),
+                )
 
         return block_structure
 
@@ -111,13 +152,63 @@ class BlockStructureManager(object):
         the modulestore, only if the data in the store is outdated.
         """
         with self._bulk_operations():
-            if not self.store.is_up_to_date(self.root_block_usage_key, self.modulestore):
-                self._update_collected()
+            if not self._is_store_up_to_date():
+                self._update_collected(lookup=self._get_up_to_date_from_store)
+
+    def _get_collected_from_store(self, transformers, raise_if_not_found=False):
+        """
+        Returns the collected Block Structure for the root_block_usage_key
+        from the store, or None if it's not found or was collected by other
+        versions of the transformers, unless raise_if_not_found.
+        """
+        try:
+            block_structure = BlockStructureFactory.create_from_store(
+                self.root_block_usage_key,
+                self.store,
+                transformers.get_names() if transformers else None,
+            )
+            BlockStructureTransformers.verify_versions(block_structure)
+        except (BlockStructureNotFound, TransformerDataIncompatible):
+            if raise_if_not_found:
+                raise
+            return None
+        return block_structure
 
-    def _update_collected(self):
+    def _is_store_up_to_date(self):
+        """
+        Returns whether the data in the store is up-to-date with the
+        modulestore.
+        """
+        return self.store.is_up_to_date(self.root_block_usage_key, self.modulestore)
+
+    def _get_up_to_date_from_store(self):
+        """
+        Returns the collected Block Structure from the store, or None if
+        the data in the store is outdated or not found.
+        """
+        if not self._is_store_up_to_date():
+            return None
+        return self._get_collected_from_store(transformers=None)
+
+    def _update_collected(self, lookup=lambda: None):
         """
         The store is updated with newly collected transformers data from
         the modulestore.
+
+        Only one process at a time collects the block structure.  While
+        one does, the others wait until the given lookup finds the result
+        in the store, or until they can collect it in turn.
+        """
+        return self.single_flight.get_or_compute(
+            u'block_structure.{}'.format(self.root_block_usage_key),
+            lookup,
+            self._collect,
+        )
+
+    def _collect(self):
+        """
+        Collects transformers data from the modulestore into the store,
+        returning the collected block structure.
         """
         with self._bulk_operations():
             block_structure = BlockStructureFactory.create_from_modulestore(
@@ -0,0 +1,115 @@
+"""
+Prewarming of the caches read by the first requests for a course: the
+split modulestore's course structure cache, the block structure cache and
+the course's CourseOverview.  After a deploy or a cache flush, prewarming
+the most popular courses keeps their first requests from all missing the
+caches at once.
+"""
+import logging
+from multiprocessing.pool import ThreadPool
+from time import time
+
+from django.db import connection
+from django.db.models import Count
+from opaque_keys.edx.keys import CourseKey
+from request_cache import clear_request_cache
+from student.models import CourseEnrollment
+from xmodule.modulestore.django import modulestore
+
+from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+
+from . import api
+
+log = logging.getLogger(__name__)
+
+# Number of courses prewarmed at once, unless otherwise specified.
+DEFAULT_PREWARM_WORKERS = 4
+
+
+def top_course_keys_by_enrollment(num_courses):
+    """
+    Returns the keys of the given number of courses with the most active
+    enrollments, most enrolled first.
+    """
+    enrollment_counts = (
+        CourseEnrollment.objects.filter(is_active=True)
+        .values('course_id')
+        .annotate(num_enrollments=Count('id'))
+        .order_by('-num_enrollments')[:num_courses]
+    )
+    return [CourseKey.from_string(unicode(row['course_id'])) for row in enrollment_counts]
+
+
+def prewarm_course(course_key):
+    """
+    Loads the given course into each of the caches read by its first requests.
+    """
+    try:
+        # Reads the course's structure through the course structure cache.
+        modulestore().get_course(course_key, depth=0)
+        CourseOverview.get_from_id(course_key)
+        api.get_course_in_cache(course_key)
+    finally:
+        # Each course's request cache is of no use to the next course.
+        clear_request_cache()
+
+
+def _prewarm_course_and_time(course_key):
+    """
+    Prewarms the given course, returning the course key, the seconds it
+    took, and the error that stopped it, if any.
+    """
+    start = time()
+    try:
+        prewarm_course(course_key)
+    except Exception as error:  # pylint: disable=broad-except
+        log.exception(u'Prewarm: Error prewarming the caches of course %s', unicode(course_key))
+        return course_key, time() - start, error
+    return course_key, time() - start, None
+
+
+def _prewarm_course_in_thread(course_key):
+    """
+    Prewarms the given course as _prewarm_course_and_time does, in a thread
+    of the pool, closing the thread's database connection when done.
+    """
+    try:
+        return _prewarm_course_and_time(course_key)
+    finally:
+        connection.close()
+
+
+def prewarm_courses(course_keys, workers=DEFAULT_PREWARM_WORKERS):
+    """
+    Prewarms the caches of the given courses, with up to the given number of
+    courses prewarmed at once, logging progress as each course finishes.
+
+    Returns:
+        list - The keys of the courses which failed to prewarm.
+    """
+    workers = min(workers, len(course_keys))
+    pool = ThreadPool(workers) if workers > 1 else None
+    if pool is None:
+        results = (_prewarm_course_and_time(course_key) for course_key in course_keys)
+    else:
+        results = pool.imap_unordered(_prewarm_course_in_thread, course_keys)
+
+    failed_course_keys = []
+    try:
+        for num_done, (course_key, seconds, error) in enumerate(results, 1):
+            if error is not None:
+                failed_course_keys.append(course_key)
+            log.info(
+                u'Prewarm: %s course %s in %.2f seconds (%d of %d courses done, %d failed).',
+                u'FAILED' if error is not None else u'FINISHED',
+                unicode(course_key),
+                seconds,
+                num_done,
+                len(course_keys),
+                len(failed_course_keys),
+            )
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return failed_course_keys
@@ -0,0 +1,483 @@
+"""
+Module for the versioned, columnar serialization format of collected
+BlockStructures.
+
+Rather than pickling the block structure's internal maps as a single
+object graph, the collected data is laid out as follows:
+
+    * Each block is assigned an integer index.
+    * Parent/child relations are stored as adjacency lists of indices.
+    * Each collected xBlock field is stored as its own column, mapping
+      block indices to values.
+    * Each transformer's block-specific data is stored as its own
+      column, mapping block indices to the transformer's data dict.
+
+Every section is compressed independently and is only decoded when it
+is first accessed. So a transformer that reads only two xBlock fields
+does not pay for decoding the rest of the collected data.
+
+Column values are encoded with marshal whenever they consist only of
+builtin types, falling back to pickle for any other collected values
+(such as UsageKeys, datetimes or UserPartitions).
+
+The serialized data can be split into a core segment and one segment
+per transformer holding that transformer's block-specific data, so
+storage layers can cache and fetch each transformer's data separately.
+Segments that were not provided at deserialization time are fetched
+through a segment loader upon first access.  Every segment carries the
+collect id of the serialized data it was split from, so a segment of
+another collect of the block structure is rejected rather than mixed in.
+
+Serialized layout:
+    MAGIC (3 bytes) | FORMAT_VERSION (1 byte) | header length (4 bytes) |
+    header (zlib-compressed json) | payload (concatenated sections)
+"""
+import cPickle as pickle
+import json
+import marshal
+import struct
+import zlib
+from uuid import uuid4
+
+from .block_structure import BlockData, TransformerData, TransformerDataMap, _BlockRelations
+from .exceptions import BlockStructureException, BlockStructureNotFound
+
+
+# Prefix identifying data serialized with this module.  Data pickled and
+# compressed with zpickle always starts with a zlib header instead.
+MAGIC = 'BSC'
+
+# The latest version of the serialization format.  Incrementally update
+# this value whenever the layout changes.
+FORMAT_VERSION = 1
+
+_PREFIX_FORMAT = '>3sBI'
+_PREFIX_LENGTH = struct.calcsize(_PREFIX_FORMAT)
+
+# Names of the sections in the payload.
+_KEYS_SECTION = 'keys'
+_RELATIONS_SECTION = 'relations'
+_BLOCK_DATA_SECTION = 'block_data'
+_TRANSFORMER_DATA_SECTION = 'transformer_data'
+_FIELD_SECTION_PREFIX = 'field:'
+_TRANSFORMER_BLOCK_SECTION_PREFIX = 'transformer:'
+
+# Codecs used to encode sections.
+_MARSHAL = 'm'
+_PICKLE = 'p'
+
+
+class UnsupportedSerializationFormat(BlockStructureException):
+    """
+    Exception for when serialized data is not in a format that
+    can be read by this version of the serializer.
+    """
+    pass
+
+
+class StaleSegment(BlockStructureNotFound):
+    """
+    Exception for when a segment was split from another collect of the
+    block structure than the data it is to be added to.
+    """
+    pass
+
+
+def is_columnar(serialized_data):
+    """
+    Returns whether the given serialized data was created by this
+    module, as opposed to the legacy zpickle serialization.
+    """
+    return serialized_data[:len(MAGIC)] == MAGIC
+
+
+def serialize(block_structure):
+    """
+    Serializes the collected data of the given block structure into
+    the columnar format.
+
+    Arguments:
+        block_structure (BlockStructureBlockData) - The collected block
+            structure that is to be serialized.
+
+    Returns:
+        str - The serialized data.
+    """
+    # pylint: disable=protected-access
+    block_relations = block_structure._block_relations
+    block_data_map = block_structure._block_data_map
+
+    keys = list(block_relations)
+    keys.extend(key for key in block_data_map if key not in block_relations)
+    index_of = {key: index for index, key in enumerate(keys)}
+
+    parents, children = [], []
+    for key in keys:
+        relations = block_relations.get(key)
+        parents.append([index_of[parent] for parent in relations.parents] if relations else [])
+        children.append([index_of[child] for child in relations.children] if relations else [])
+
+    field_columns = {}
+    transformer_columns = {}
+    for key, block_data in block_data_map.iteritems():
+        index = index_of[key]
+        for field_name, value in block_data.fields.iteritems():
+            field_columns.setdefault(field_name, {})[index] = value
+        for transformer_name, transformer_data in block_data.transformer_data.iteritems():
+            transformer_columns.setdefault(transformer_name, {})[index] = transformer_data.fields
+
+    writer = _SectionWriter()
+    writer.add(_KEYS_SECTION, keys)
+    writer.add(_RELATIONS_SECTION, (parents, children))
+    writer.add(_BLOCK_DATA_SECTION, sorted(index_of[key] for key in block_data_map))
+    writer.add(_TRANSFORMER_DATA_SECTION, block_structure.transformer_data)
+    for field_name, column in field_columns.iteritems():
+        writer.add(_FIELD_SECTION_PREFIX + field_name, column)
+    for transformer_name, column in transformer_columns.iteritems():
+        writer.add(_TRANSFORMER_BLOCK_SECTION_PREFIX + transformer_name, column)
+
+    return writer.pack(root=index_of[block_structure.root_block_usage_key], collect_id=uuid4().hex)
+
+
+def split_segments(serialized_data):
+    """
+    Splits the given serialized data into a core segment and a segment
+    for each transformer's block-specific data.  The sections are
+    copied without being decoded.
+
+    Arguments:
+        serialized_data (str) - Data created by the serialize function.
+
+    Returns:
+        (str, {string: str}) - A tuple of the core segment and a map of
+            transformer name to its segment.
+    """
+    header, payload = _unpack(serialized_data)
+    collect_id = header.get('collect_id')
+    core_writer = _SectionWriter()
+    segments = {}
+    for name, (offset, length, codec) in header['sections'].iteritems():
+        compressed_value = payload[offset:offset + length]
+        if name.startswith(_TRANSFORMER_BLOCK_SECTION_PREFIX):
+            segment_writer = _SectionWriter()
+            segment_writer.add_compressed(name, compressed_value, codec)
+            segments[name[len(_TRANSFORMER_BLOCK_SECTION_PREFIX):]] = segment_writer.pack(collect_id=collect_id)
+        else:
+            core_writer.add_compressed(name, compressed_value, codec)
+    core_data = core_writer.pack(root=header.get('root'), segments=sorted(segments), collect_id=collect_id)
+    return core_data, segments
+
+
+def get_segment_names(serialized_data):
+    """
+    Returns the names of the transformers whose segments are not
+    included in the given core segment.
+    """
+    header, _ = _unpack(serialized_data)
+    return header.get('segments', [])
+
+
+def deserialize(serialized_data, root_block_usage_key, segments=None, segment_loader=None):
+    """
+    Deserializes the given columnar data and returns the parsed block
+    structure.  Block relations are decoded immediately, while
+    xBlock fields and transformer block data are decoded lazily, one
+    column at a time, upon first access.
+
+    Arguments:
+        serialized_data (str) - Data created by the serialize function
+            or a core segment created by the split_segments function.
+
+        root_block_usage_key (UsageKey) - The usage_key for the root
+            of the block structure.
+
+        segments ({string: str}) - Optional map of transformer name to
+            its segment, as created by the split_segments function.
+
+        segment_loader ((string)->str) - Function that returns the
+            segment for the given transformer name.  It is called upon
+            first access of a transformer's block data whose segment
+            was not provided in segments.
+
+    Returns:
+        BlockStructureBlockData - The deserialized block structure.
+
+    Raises:
+        UnsupportedSerializationFormat if the data is not in a known
+        version of the columnar format.
+
+        StaleSegment if a segment was split from another collect of the
+        block structure, either now or upon first access.
+    """
+    from .factory import BlockStructureFactory
+
+    reader = _SectionReader(serialized_data, root_block_usage_key, segments, segment_loader)
+    keys = reader.get(_KEYS_SECTION)
+    parents, children = reader.get(_RELATIONS_SECTION)
+
+    block_relations = {}
+    for index, key in enumerate(keys):
+        relations = _BlockRelations()
+        relations.parents = [keys[parent] for parent in parents[index]]
+        relations.children = [keys[child] for child in children[index]]
+        block_relations[key] = relations
+
+    block_data_map = {}
+    for index in reader.get(_BLOCK_DATA_SECTION):
+        block_data = BlockData(keys[index])
+        block_data.fields = _LazyFieldsDict(reader, index)
+        block_data.transformer_data = _LazyTransformerDataMap(reader, index)
+        block_data_map[keys[index]] = block_data
+
+    return BlockStructureFactory.create_new(
+        root_block_usage_key,
+        block_relations,
+        reader.get(_TRANSFORMER_DATA_SECTION),
+        block_data_map,
+    )
+
+
+def _encode(value):
+    """
+    Returns a (codec, encoded value) tuple for the given value,
+    preferring marshal over pickle.
+    """
+    try:
+        return _MARSHAL, marshal.dumps(value)
+    except ValueError:
+        return _PICKLE, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(codec, encoded_value):
+    """
+    Returns the value decoded from the given encoded_value with the
+    given codec.
+    """
+    if codec == _MARSHAL:
+        return marshal.loads(encoded_value)
+    return pickle.loads(encoded_value)
+
+
+def _unpack(serialized_data):
+    """
+    Returns a (header, payload) tuple for the given serialized data.
+
+    Raises:
+        UnsupportedSerializationFormat if the data is not in a known
+        version of the columnar format.
+    """
+    if len(serialized_data) < _PREFIX_LENGTH:
+        raise UnsupportedSerializationFormat('Serialized block structure data is truncated.')
+    magic, version, header_length = struct.unpack_from(_PREFIX_FORMAT, serialized_data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise UnsupportedSerializationFormat(
+            'Unsupported block structure serialization format: {!r} version {}.'.format(magic, version)
+        )
+
+    header_end = _PREFIX_LENGTH + header_length
+    header = json.loads(zlib.decompress(serialized_data[_PREFIX_LENGTH:header_end]))
+    return header, buffer(serialized_data, header_end)
+
+
+class _SectionWriter(object):
+    """
+    Accumulates independently compressed sections of the payload
+    along with a directory of their locations.
+    """
+    def __init__(self):
+        # Map of section name to its [offset, length, codec].
+        self._directory = {}
+        self._sections = []
+        self._offset = 0
+
+    def add(self, name, value):
+        """
+        Encodes, compresses and appends the given value as a section
+        with the given name.
+        """
+        codec, encoded_value = _encode(value)
+        self.add_compressed(name, zlib.compress(encoded_value), codec)
+
+    def add_compressed(self, name, compressed_value, codec):
+        """
+        Appends the given already compressed value as a section with
+        the given name.
+        """
+        self._directory[name] = [self._offset, len(compressed_value), codec]
+        self._sections.append(compressed_value)
+        self._offset += len(compressed_value)
+
+    def pack(self, **header_fields):
+        """
+        Returns the serialized data of all added sections, with the
+        given fields added to its header.
+        """
+        header_fields['sections'] = self._directory
+        header = zlib.compress(json.dumps(header_fields))
+        return ''.join(
+            [struct.pack(_PREFIX_FORMAT, MAGIC, FORMAT_VERSION, len(header)), header] + self._sections
+        )
+
+
+class _SectionReader(object):
+    """
+    Provides access to sections of serialized data, decoding each
+    section only once, upon first access.
+    """
+    def __init__(self, serialized_data, root_block_usage_key, segments=None, segment_loader=None):
+        header, payload = _unpack(serialized_data)
+        self._root_block_usage_key = root_block_usage_key
+
+        # Id of the collect the serialized data is from, which its
+        # segments must share.
+        self._collect_id = header.get('collect_id')
+
+        # List of the payloads of the serialized data and its segments.
+        self._payloads = []
+
+        # Map of section name to its (payload index, offset, length, codec).
+        self._directory = {}
+
+        # Map of section name to its decoded value.
+        self._decoded = {}
+
+        # Names of the transformers whose segments are yet to be loaded.
+        self._pending_segments = set(header.get('segments', []))
+        self._segment_loader = segment_loader
+
+        self._add_payload(header, payload)
+        for transformer_name, segment_data in (segments or {}).iteritems():
+            self._add_segment(transformer_name, segment_data)
+
+    def has(self, name):
+        """
+        Returns whether a section with the given name exists, loading
+        the segment that contains it if needed.
+        """
+        if name not in self._directory and name.startswith(_TRANSFORMER_BLOCK_SECTION_PREFIX):
+            transformer_name = name[len(_TRANSFORMER_BLOCK_SECTION_PREFIX):]
+            if transformer_name in self._pending_segments:
+                self._add_segment(transformer_name, self._load_segment(transformer_name))
+        return name in self._directory
+
+    def get(self, name):
+        """
+        Returns the decoded value of the section with the given name.
+
+        Raises KeyError if the section does not exist.
+        """
+        try:
+            return self._decoded[name]
+        except KeyError:
+            payload_index, offset, length, codec = self._directory[name]
+            value = _decode(codec, zlib.decompress(self._payloads[payload_index][offset:offset + length]))
+            self._decoded[name] = value
+            return value
+
+    def get_block_value(self, name, block_index):
+        """
+        Returns the value for the given block_index in the column
+        section with the given name.
+
+        Raises KeyError if either the section or the block's value
+        does not exist.
+        """
+        if not self.has(name):
+            raise KeyError(name)
+        return self.get(name)[block_index]
+
+    def _load_segment(self, transformer_name):
+        """
+        Returns the segment for the given transformer from the segment
+        loader.
+        """
+        if self._segment_loader is None:
+            raise BlockStructureException(
+                'No segment loader to load the block structure segment for {}.'.format(transformer_name)
+            )
+        return self._segment_loader(transformer_name)
+
+    def _add_segment(self, transformer_name, segment_data):
+        """
+        Adds the sections of the given segment to this reader.
+
+        Raises StaleSegment if the segment is from another collect.
+        """
+        header, payload = _unpack(segment_data)
+        if header.get('collect_id') != self._collect_id:
+            raise StaleSegment(self._root_block_usage_key)
+        self._add_payload(header, payload)
+        self._pending_segments.discard(transformer_name)
+
+    def _add_payload(self, header, payload):
+        """
+        Adds the given payload and the directory of its sections from
+        the given header to this reader.
+        """
+        payload_index = len(self._payloads)
+        self._payloads.append(payload)
+        for name, (offset, length, codec) in header['sections'].iteritems():
+            self._directory[name] = (payload_index, offset, length, codec)
+
+    def __getstate__(self):
+        """
+        Loads all pending segments, since the segment loader cannot be
+        pickled, and stores the payloads as strings since buffers
+        cannot be pickled either.
+        """
+        for transformer_name in list(self._pending_segments):
+            self._add_segment(transformer_name, self._load_segment(transformer_name))
+        state = self.__dict__.copy()
+        state['_payloads'] = [str(payload) for payload in self._payloads]
+        state['_segment_loader'] = None
+        return state
+
+    def __deepcopy__(self, memo):
+        """
+        The serialized data is immutable, so a deep copy only needs
+        its own cache of decoded sections.
+        """
+        reader = _SectionReader.__new__(_SectionReader)
+        reader.__dict__.update(self.__dict__)
+        reader._payloads = list(self._payloads)  # pylint: disable=protected-access
+        reader._directory = dict(self._directory)  # pylint: disable=protected-access
+        reader._decoded = {}  # pylint: disable=protected-access
+        reader._pending_segments = set(self._pending_segments)  # pylint: disable=protected-access
+        memo[id(self)] = reader
+        return reader
+
+
+class _LazyFieldsDict(dict):
+    """
+    The fields dict of a deserialized BlockData, which decodes the
+    corresponding field column on first access of a field.
+    """
+    def __init__(self, reader, block_index):
+        super(_LazyFieldsDict, self).__init__()
+        self._reader = reader
+        self._block_index = block_index
+
+    def __missing__(self, field_name):
+        value = self._reader.get_block_value(_FIELD_SECTION_PREFIX + field_name, self._block_index)
+        self[field_name] = value
+        return value
+
+
+class _LazyTransformerDataMap(TransformerDataMap):
+    """
+    The TransformerDataMap of a deserialized BlockData, which decodes
+    the corresponding transformer's column on first access of the
+    transformer's data.
+    """
+    def __init__(self, reader, block_index):
+        super(_LazyTransformerDataMap, self).__init__()
+        self._reader = reader
+        self._block_index = block_index
+
+    def __missing__(self, transformer_name):
+        transformer_data = TransformerData()
+        transformer_data.fields = dict(
+            self._reader.get_block_value(_TRANSFORMER_BLOCK_SECTION_PREFIX + transformer_name, self._block_index)
+        )
+        self[transformer_name] = transformer_data
+        return transformer_data
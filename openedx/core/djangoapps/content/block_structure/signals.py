@@ -10,6 +10,7 @@ from opaque_keys.edx.locator import LibraryLocator
 
 from . import config
 from .api import clear_course_from_cache
+from .store import invalidate_local_cache
 from .tasks import update_course_in_cache_v2
 
 
@@ -23,6 +24,8 @@ def _update_block_structure_on_course_publish(sender, course_key, **kwargs):  #
     if isinstance(course_key, LibraryLocator):
         return
 
+    invalidate_local_cache(course_key)
+
     if config.waffle().is_enabled(config.INVALIDATE_CACHE_ON_PUBLISH):
         clear_course_from_cache(course_key)
 
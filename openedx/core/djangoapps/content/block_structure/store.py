@@ -2,11 +2,14 @@
 Module for the Storage of BlockStructure objects.
 """
 # pylint: disable=protected-access
+from functools import partial
 from logging import getLogger
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from django.conf import settings
 
-from . import config
+from openedx.core.lib.cache_utils import ProcessLocalLRUCache, zpickle, zunpickle
+
+from . import config, serializer
 from .block_structure import BlockStructureBlockData
 from .exceptions import BlockStructureNotFound
 from .factory import BlockStructureFactory
@@ -16,6 +19,36 @@ from .transformer_registry import TransformerRegistry
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
+# Process-local tier in front of the block structure cache, which is
+# created upon first use.
+_LOCAL_CACHE = None
+
+
+def get_local_cache():
+    """
+    Returns the process-local cache of serialized block structures.
+
+    It is disabled unless limits are configured with the
+    LOCAL_CACHE_MAX_ENTRIES and LOCAL_CACHE_MAX_BYTES keys of the
+    BLOCK_STRUCTURES_SETTINGS setting.
+    """
+    global _LOCAL_CACHE  # pylint: disable=global-statement
+    if _LOCAL_CACHE is None:
+        _LOCAL_CACHE = ProcessLocalLRUCache(
+            max_entries=settings.BLOCK_STRUCTURES_SETTINGS.get('LOCAL_CACHE_MAX_ENTRIES', 0),
+            max_bytes=settings.BLOCK_STRUCTURES_SETTINGS.get('LOCAL_CACHE_MAX_BYTES', 0),
+        )
+    return _LOCAL_CACHE
+
+
+def invalidate_local_cache(course_key):
+    """
+    Removes all entries for the given course from the process-local
+    cache of serialized block structures.
+    """
+    course_id = unicode(course_key)
+    get_local_cache().delete_matching(lambda local_key: local_key[0] == course_id)
+
 
 class StubModel(object):
     """
@@ -66,7 +99,7 @@ class BlockStructureStore(object):
         bs_model = self._update_or_create_model(block_structure, serialized_data)
         self._add_to_cache(serialized_data, bs_model)
 
-    def get(self, root_block_usage_key):
+    def get(self, root_block_usage_key, transformer_names=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key, if found in the cache or storage.
@@ -79,6 +112,12 @@ class BlockStructureStore(object):
                 root of the block structure that is to be retrieved
                 from the store.
 
+            transformer_names (set(string)) - Names of the transformers
+                whose collected block data is to be fetched up front.
+                The collected block data of any other transformer is
+                fetched upon first access.  If None, the collected
+                data of all transformers is fetched up front.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found.
@@ -90,11 +129,16 @@ class BlockStructureStore(object):
         bs_model = self._get_model(root_block_usage_key)
 
         try:
-            serialized_data = self._get_from_cache(bs_model)
+            serialized_data, segments = self._get_from_cache(bs_model, transformer_names)
         except BlockStructureNotFound:
-            serialized_data = self._get_from_store(bs_model)
+            serialized_data, segments = self._get_from_store(bs_model), None
 
-        return self._deserialize(serialized_data, root_block_usage_key)
+        return self._deserialize(
+            serialized_data,
+            root_block_usage_key,
+            segments,
+            partial(self._get_segment, bs_model),
+        )
 
     def delete(self, root_block_usage_key):
         """
@@ -106,7 +150,15 @@ class BlockStructureStore(object):
                 of the block structure that is to be removed.
         """
         bs_model = self._get_model(root_block_usage_key)
-        self._cache.delete(self._encode_root_cache_key(bs_model))
+        invalidate_local_cache(_course_key_of(root_block_usage_key))
+        cache_key = self._encode_root_cache_key(bs_model)
+        serialized_data = self._cache.get(cache_key)
+        if serialized_data and serializer.is_columnar(serialized_data):
+            self._cache.delete_many([
+                self._encode_segment_cache_key(cache_key, transformer_name)
+                for transformer_name in serializer.get_segment_names(serialized_data)
+            ])
+        self._cache.delete(cache_key)
         bs_model.delete()
         logger.info("BlockStructure: Deleted from cache and store; %s.", bs_model)
 
@@ -154,27 +206,131 @@ class BlockStructureStore(object):
         """
         Adds the given serialized_data for the given BlockStructureModel
         to the cache.
+
+        Data in the columnar format is split so each transformer's
+        collected block data is cached separately from the core data.
         """
         cache_key = self._encode_root_cache_key(bs_model)
-        self._cache.set(cache_key, serialized_data, timeout=config.cache_timeout_in_seconds())
-        logger.info("BlockStructure: Added to cache; %s, size: %d", bs_model, len(serialized_data))
+        if serializer.is_columnar(serialized_data):
+            core_data, segments = serializer.split_segments(serialized_data)
+            data_to_cache = {
+                self._encode_segment_cache_key(cache_key, transformer_name): segment_data
+                for transformer_name, segment_data in segments.iteritems()
+            }
+            data_to_cache[cache_key] = core_data
+        else:
+            data_to_cache = {cache_key: serialized_data}
+
+        self._cache.set_many(data_to_cache, timeout=config.cache_timeout_in_seconds())
+        logger.info(
+            "BlockStructure: Added to cache; %s, size: %d, segments: %d",
+            bs_model,
+            sum(len(data) for data in data_to_cache.itervalues()),
+            len(data_to_cache),
+        )
 
-    def _get_from_cache(self, bs_model):
+    def _get_from_cache(self, bs_model, transformer_names=None):
         """
-        Returns the serialized data for the given BlockStructureModel
-        from the cache.
+        Returns a tuple of the serialized data for the given
+        BlockStructureModel from the cache and a map of transformer
+        name to the segment of that transformer's collected block
+        data.  Only the segments of the given transformer_names are
+        fetched, or all segments if transformer_names is None.
+
         Raises:
              BlockStructureNotFound if not found.
         """
         cache_key = self._encode_root_cache_key(bs_model)
-        serialized_data = self._cache.get(cache_key)
+        serialized_data = self._get_many_from_cache(bs_model, [cache_key]).get(cache_key)
 
         if not serialized_data:
             logger.info("BlockStructure: Not found in cache; %s.", bs_model)
             raise BlockStructureNotFound(bs_model.data_usage_key)
-        else:
-            logger.info("BlockStructure: Read from cache; %s, size: %d", bs_model, len(serialized_data))
-        return serialized_data
+
+        segments = {}
+        if serializer.is_columnar(serialized_data):
+            segment_names = set(serializer.get_segment_names(serialized_data))
+            if transformer_names is not None:
+                segment_names &= set(transformer_names)
+            segment_cache_keys = {
+                self._encode_segment_cache_key(cache_key, transformer_name): transformer_name
+                for transformer_name in segment_names
+            }
+            cached_segments = self._get_many_from_cache(bs_model, segment_cache_keys.keys())
+            if len(cached_segments) < len(segment_cache_keys):
+                logger.info("BlockStructure: Segments not found in cache; %s.", bs_model)
+                raise BlockStructureNotFound(bs_model.data_usage_key)
+            segments = {
+                segment_cache_keys[segment_cache_key]: segment_data
+                for segment_cache_key, segment_data in cached_segments.iteritems()
+            }
+
+        logger.info(
+            "BlockStructure: Read from cache; %s, size: %d, segments: %d",
+            bs_model,
+            len(serialized_data) + sum(len(segment_data) for segment_data in segments.itervalues()),
+            len(segments),
+        )
+        return serialized_data, segments
+
+    def _get_segment(self, bs_model, transformer_name):
+        """
+        Returns the segment of the given transformer's collected block
+        data for the given BlockStructureModel, from the cache or else
+        from storage.
+
+        Raises:
+             BlockStructureNotFound if not found.
+        """
+        cache_key = self._encode_segment_cache_key(self._encode_root_cache_key(bs_model), transformer_name)
+        segment_data = self._get_many_from_cache(bs_model, [cache_key]).get(cache_key)
+        if segment_data:
+            logger.info(
+                "BlockStructure: Read segment from cache; %s, transformer: %s, size: %d",
+                bs_model,
+                transformer_name,
+                len(segment_data),
+            )
+            return segment_data
+
+        serialized_data = self._get_from_store(bs_model)
+        if serializer.is_columnar(serialized_data):
+            _, segments = serializer.split_segments(serialized_data)
+            if transformer_name in segments:
+                return segments[transformer_name]
+
+        logger.info("BlockStructure: Segment not found; %s, transformer: %s.", bs_model, transformer_name)
+        raise BlockStructureNotFound(bs_model.data_usage_key)
+
+    def _get_many_from_cache(self, bs_model, cache_keys):
+        """
+        Returns a dict of the given cache keys that are found and their
+        values, reading from the process-local cache before the cache.
+
+        The process-local cache is only used when storage backing is
+        enabled, since the cache keys then include the version of the
+        block structure's data and so their values never go stale.
+        """
+        if not cache_keys:
+            return {}
+
+        if not _is_storage_backing_enabled():
+            return self._cache.get_many(cache_keys)
+
+        local_cache = get_local_cache()
+        course_id = unicode(_course_key_of(bs_model.data_usage_key))
+        found = {}
+        for cache_key in cache_keys:
+            value = local_cache.get((course_id, cache_key))
+            if value is not None:
+                found[cache_key] = value
+
+        missing_cache_keys = [cache_key for cache_key in cache_keys if cache_key not in found]
+        if missing_cache_keys:
+            for cache_key, value in self._cache.get_many(missing_cache_keys).iteritems():
+                local_cache.set((course_id, cache_key), value, len(value))
+                found[cache_key] = value
+        return found
 
     def _get_from_store(self, bs_model):
         """
@@ -191,7 +347,13 @@ class BlockStructureStore(object):
     def _serialize(self, block_structure):
         """
         Serializes the data for the given block_structure.
+
+        The columnar format is used when the COLUMNAR_SERIALIZATION
+        switch is enabled.  Otherwise, the data is zpickled.
         """
+        if config.waffle().is_enabled(config.COLUMNAR_SERIALIZATION):
+            return serializer.serialize(block_structure)
+
         data_to_cache = (
             block_structure._block_relations,
             block_structure.transformer_data,
@@ -199,10 +361,22 @@ class BlockStructureStore(object):
         )
         return zpickle(data_to_cache)
 
-    def _deserialize(self, serialized_data, root_block_usage_key):
+    def _deserialize(self, serialized_data, root_block_usage_key, segments=None, segment_loader=None):
         """
         Deserializes the given data and returns the parsed block_structure.
+
+        Data in either the columnar or the legacy zpickle format is
+        accepted, so previously stored data remains readable after the
+        COLUMNAR_SERIALIZATION switch is toggled.  The given segments
+        and segment_loader apply to the columnar format only.
         """
+        if serializer.is_columnar(serialized_data):
+            try:
+                return serializer.deserialize(serialized_data, root_block_usage_key, segments, segment_loader)
+            except serializer.UnsupportedSerializationFormat:
+                logger.exception("BlockStructure: Unsupported serialization format; %s.", root_block_usage_key)
+                raise BlockStructureNotFound(root_block_usage_key)
+
         block_relations, transformer_data, block_data_map = zunpickle(serialized_data)
         return BlockStructureFactory.create_new(
             root_block_usage_key,
@@ -226,6 +400,17 @@ class BlockStructureStore(object):
                 root_usage_key=unicode(bs_model.data_usage_key),
             )
 
+    @staticmethod
+    def _encode_segment_cache_key(root_cache_key, transformer_name):
+        """
+        Returns the cache key to use for the segment of the given
+        transformer's collected block data.
+        """
+        return u"{root_cache_key}.transformer.{transformer_name}".format(
+            root_cache_key=root_cache_key,
+            transformer_name=transformer_name,
+        )
+
     @staticmethod
     def _version_data_of_block(root_block):
         """
@@ -250,6 +435,13 @@ class BlockStructureStore(object):
         }
 
 
+def _course_key_of(usage_key):
+    """
+    Returns the course key of the given usage key.
+    """
+    return getattr(usage_key, 'course_key', usage_key)
+
+
 def _is_storage_backing_enabled():
     """
     Returns whether storage backing for Block Structures is enabled.
@@ -12,7 +12,7 @@ from edxval.api import ValInternalError
 from opaque_keys.edx.keys import CourseKey
 
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from openedx.core.djangoapps.content.block_structure import api
+from openedx.core.djangoapps.content.block_structure import api, prewarm
 from openedx.core.djangoapps.content.block_structure.config import STORAGE_BACKING_FOR_CACHE, waffle
 
 log = logging.getLogger('edx.celery.task')
@@ -92,6 +92,24 @@ def _get_course_in_cache(self, **kwargs):
     _call_and_retry_if_needed(self, api.get_course_in_cache, **kwargs)
 
 
+@block_structure_task()
+def prewarm_course_caches(self, **kwargs):  # pylint: disable=unused-argument
+    """
+    Prewarms the course structure, block structure and course overview
+    caches of the specified courses.  Failures are logged, not retried.
+    Keyword Arguments:
+        course_ids (list) - The string serialized values of the course keys.
+        top_enrolled (int) - Instead of course_ids, the number of courses
+            with the most active enrollments to prewarm.
+        workers (int) - The number of courses to prewarm at once.
+    """
+    if kwargs.get('top_enrolled'):
+        course_keys = prewarm.top_course_keys_by_enrollment(kwargs['top_enrolled'])
+    else:
+        course_keys = [CourseKey.from_string(course_id) for course_id in kwargs.get('course_ids', [])]
+    prewarm.prewarm_courses(course_keys, workers=kwargs.get('workers') or prewarm.DEFAULT_PREWARM_WORKERS)
+
+
 def _call_and_retry_if_needed(self, api_method, **kwargs):
     """
     Calls the given api_method with the given course_id, retrying task_method upon failure.
@@ -127,6 +127,25 @@ class MockCache(object):
         self.map[key] = val
         self.timeout_from_last_call = timeout
 
+    def set_many(self, data, timeout):
+        """
+        Associates each of the given keys with its value in the cache.
+        """
+        self.set_call_count += 1
+        self.map.update(data)
+        self.timeout_from_last_call = timeout
+
+    def add(self, key, val, timeout):
+        """
+        Associates the given key with the given value in the cache, only
+        if the key isn't already in the cache.  Returns whether it was
+        added.
+        """
+        if key in self.map:
+            return False
+        self.map[key] = val
+        return True
+
     def get(self, key, default=None):
         """
         Returns the value associated with the given key in the cache;
@@ -134,12 +153,26 @@ class MockCache(object):
         """
         return self.map.get(key, default)
 
+    def get_many(self, keys):
+        """
+        Returns a dict of the given keys that are found in the cache
+        and their associated values.
+        """
+        return {key: self.map[key] for key in keys if key in self.map}
+
     def delete(self, key):
         """
         Deletes the given key from the cache.
         """
         del self.map[key]
 
+    def delete_many(self, keys):
+        """
+        Deletes the given keys from the cache.
+        """
+        for key in keys:
+            self.map.pop(key, None)
+
 
 class MockModulestoreFactory(object):
     """
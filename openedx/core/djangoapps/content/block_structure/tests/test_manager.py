@@ -6,7 +6,7 @@ from nose.plugins.attrib import attr
 from unittest import TestCase
 
 from ..block_structure import BlockStructureBlockData
-from ..config import RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import COLUMNAR_SERIALIZATION, RAISE_ERROR_WHEN_NOT_FOUND, STORAGE_BACKING_FOR_CACHE, waffle
 from ..exceptions import UsageKeyNotInBlockStructure, BlockStructureNotFound
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -161,6 +161,22 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
             )
             self.assert_block_structure(block_structure, expected_structure, missing_blocks=expected_missing_blocks)
 
+    def test_get_transformed_segment_evicted(self):
+        with waffle().override(COLUMNAR_SERIALIZATION, active=True):
+            with mock_registered_transformers(self.registered_transformers):
+                collected_block_structure = self.bs_manager.get_collected(BlockStructureTransformers([]))
+                self.assertEquals(TestTransformer1.collect_call_count, 1)
+
+                # The transformer's segment is evicted before its first access.
+                self.cache.delete_many([key for key in self.cache.map if '.transformer.' in key])
+                block_structure = self.bs_manager.get_transformed(
+                    self.transformers,
+                    collected_block_structure=collected_block_structure,
+                )
+        self.assertEquals(TestTransformer1.collect_call_count, 2)
+        self.assert_block_structure(block_structure, self.children_map)
+        TestTransformer1.assert_transformed(block_structure)
+
     def test_get_transformed_with_nonexistent_starting_block(self):
         with mock_registered_transformers(self.registered_transformers):
             with self.assertRaises(UsageKeyNotInBlockStructure):
@@ -171,6 +187,18 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
         self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
         self.assertEquals(TestTransformer1.collect_call_count, 1)
 
+    def test_get_collected_while_collected_elsewhere(self):
+        lock_key = u'single_flight.block_structure.{}'.format(self.block_key_factory(0))
+        self.cache.add(lock_key, 'other', 60)
+
+        # Waits for the other process to collect, until the wait times out.
+        self.bs_manager.single_flight.wait_timeout = 0
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        self.assertEquals(self.cache.get(lock_key), 'other')
+
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+        self.assertEquals(TestTransformer1.collect_call_count, 1)
+
     def test_get_collected_error_raised(self):
         with waffle().override(RAISE_ERROR_WHEN_NOT_FOUND, active=True):
             with mock_registered_transformers(self.registered_transformers):
@@ -191,6 +219,17 @@ class TestBlockStructureManager(UsageKeyFactoryMixin, ChildrenMapTestMixin, Test
 
                 self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
 
+    def test_update_collected_if_needed_lookup(self):
+        # pylint: disable=protected-access
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=True):
+            with mock_registered_transformers(self.registered_transformers):
+                self.assertIsNone(self.bs_manager._get_up_to_date_from_store())
+
+                self.bs_manager.update_collected_if_needed()
+                block_structure = self.bs_manager._get_up_to_date_from_store()
+                self.assertEquals(block_structure.root_block_usage_key, self.block_key_factory(0))
+                self.assertEquals(TestTransformer1.collect_call_count, 1)
+
     def test_get_collected_transformer_version(self):
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
 
@@ -0,0 +1,165 @@
+"""
+Tests for block_structure/serializer.py
+"""
+# pylint: disable=protected-access
+from copy import deepcopy
+from datetime import datetime
+import ddt
+from nose.plugins.attrib import attr
+from unittest import TestCase
+
+from openedx.core.lib.cache_utils import zpickle
+
+from .. import serializer
+from .helpers import ChildrenMapTestMixin, MockTransformer, UsageKeyFactoryMixin
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestSerializer(UsageKeyFactoryMixin, ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the columnar block structure serializer.
+    """
+    def create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map with
+        collected xBlock fields and transformer data.
+        """
+        block_structure = self.create_block_structure(children_map)
+        block_structure._add_transformer(MockTransformer)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            block_data = block_structure._get_or_create_block(block_key)
+            block_data.display_name = u'Block {}'.format(block_id)
+            block_data.start = datetime(2017, 1, block_id + 1)
+            block_structure.set_transformer_block_field(block_key, MockTransformer, 'test', block_id * 10)
+        return block_structure
+
+    def assert_collected_data(self, block_structure, children_map):
+        """
+        Verifies the collected data set by create_collected_block_structure.
+        """
+        self.assert_block_structure(block_structure, children_map)
+        self.assertEquals(block_structure._get_transformer_data_version(MockTransformer), 1)
+        for block_id in range(len(children_map)):
+            block_key = self.block_key_factory(block_id)
+            self.assertEquals(block_structure.get_xblock_field(block_key, 'display_name'), u'Block {}'.format(block_id))
+            self.assertEquals(block_structure.get_xblock_field(block_key, 'start'), datetime(2017, 1, block_id + 1))
+            self.assertEquals(
+                block_structure.get_transformer_block_field(block_key, MockTransformer, 'test'),
+                block_id * 10,
+            )
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self.create_collected_block_structure(children_map)
+        serialized_data = serializer.serialize(block_structure)
+        self.assertTrue(serializer.is_columnar(serialized_data))
+
+        deserialized = serializer.deserialize(serialized_data, block_structure.root_block_usage_key)
+        self.assert_collected_data(deserialized, children_map)
+
+    def test_lazy_decoding(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = serializer.deserialize(
+            serializer.serialize(block_structure),
+            block_structure.root_block_usage_key,
+        )
+        reader = deserialized[block_structure.root_block_usage_key].fields._reader
+
+        def decoded_columns():
+            """
+            Returns the names of the column sections decoded so far.
+            """
+            return {name for name in reader._decoded if name.startswith(('field:', 'transformer:'))}
+
+        self.assertEquals(decoded_columns(), set())
+
+        deserialized.get_xblock_field(block_structure.root_block_usage_key, 'display_name')
+        self.assertEquals(decoded_columns(), {'field:display_name'})
+
+    def test_missing_values(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = serializer.deserialize(
+            serializer.serialize(block_structure),
+            block_structure.root_block_usage_key,
+        )
+        root_key = block_structure.root_block_usage_key
+        self.assertEquals(deserialized.get_xblock_field(root_key, 'not_collected', 'default'), 'default')
+        self.assertIsNone(deserialized.get_transformer_block_field(root_key, 'not_a_transformer', 'test'))
+        self.assertFalse(hasattr(deserialized[root_key], 'not_collected'))
+
+    def test_copy(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        deserialized = serializer.deserialize(
+            serializer.serialize(block_structure),
+            block_structure.root_block_usage_key,
+        )
+        root_key = block_structure.root_block_usage_key
+        copied = deepcopy(deserialized)
+        copied.set_transformer_block_field(root_key, MockTransformer, 'test', 'changed')
+
+        self.assertEquals(copied.get_transformer_block_field(root_key, MockTransformer, 'test'), 'changed')
+        self.assertEquals(deserialized.get_transformer_block_field(root_key, MockTransformer, 'test'), 0)
+
+    def test_legacy_data(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        self.assertFalse(serializer.is_columnar(zpickle(block_structure._block_relations)))
+
+    def test_unsupported_version(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        serialized_data = serializer.serialize(block_structure)
+        future_version = chr(serializer.FORMAT_VERSION + 1)
+        serialized_data = serializer.MAGIC + future_version + serialized_data[len(serializer.MAGIC) + 1:]
+        with self.assertRaises(serializer.UnsupportedSerializationFormat):
+            serializer.deserialize(serialized_data, block_structure.root_block_usage_key)
+
+    def test_segments(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        core_data, segments = serializer.split_segments(serializer.serialize(block_structure))
+        self.assertEquals(segments.keys(), [MockTransformer.name()])
+        self.assertEquals(serializer.get_segment_names(core_data), [MockTransformer.name()])
+
+        deserialized = serializer.deserialize(core_data, block_structure.root_block_usage_key, segments)
+        self.assert_collected_data(deserialized, self.SIMPLE_CHILDREN_MAP)
+
+    def test_segment_loader(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        core_data, segments = serializer.split_segments(serializer.serialize(block_structure))
+        loaded_segments = []
+
+        def segment_loader(transformer_name):
+            """
+            Returns the requested segment, recording the request.
+            """
+            loaded_segments.append(transformer_name)
+            return segments[transformer_name]
+
+        deserialized = serializer.deserialize(
+            core_data,
+            block_structure.root_block_usage_key,
+            segment_loader=segment_loader,
+        )
+        self.assertEquals(loaded_segments, [])
+        self.assert_collected_data(deserialized, self.SIMPLE_CHILDREN_MAP)
+        self.assertEquals(loaded_segments, [MockTransformer.name()])
+
+    def test_segment_of_other_collect(self):
+        block_structure = self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+        core_data, _ = serializer.split_segments(serializer.serialize(block_structure))
+        _, other_segments = serializer.split_segments(serializer.serialize(block_structure))
+
+        with self.assertRaises(serializer.StaleSegment):
+            serializer.deserialize(core_data, block_structure.root_block_usage_key, other_segments)
+
+        deserialized = serializer.deserialize(
+            core_data,
+            block_structure.root_block_usage_key,
+            segment_loader=other_segments.get,
+        )
+        with self.assertRaises(serializer.StaleSegment):
+            deserialized.get_transformer_block_field(block_structure.root_block_usage_key, MockTransformer, 'test')
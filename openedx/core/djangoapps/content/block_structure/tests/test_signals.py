@@ -60,6 +60,12 @@ class CourseBlocksSignalTest(ModuleStoreTestCase):
 
         self.assertEquals(mock_bs_manager_clear.called, invalidate_cache_enabled)
 
+    @patch('openedx.core.djangoapps.content.block_structure.signals.invalidate_local_cache')
+    def test_local_cache_invalidation(self, mock_invalidate_local_cache):
+        self.course.display_name = "Padawan 101"
+        self.store.update_item(self.course, self.user.id)
+        mock_invalidate_local_cache.assert_called_with(self.course.id)
+
     def test_course_delete(self):
         bs_manager = get_block_structure_manager(self.course.id)
         self.assertIsNotNone(bs_manager.get_collected())
@@ -2,13 +2,17 @@
 Tests for block_structure/cache.py
 """
 import ddt
+import itertools
+from mock import patch
 from nose.plugins.attrib import attr
 
 from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+from openedx.core.lib.cache_utils import ProcessLocalLRUCache
 
-from ..config import STORAGE_BACKING_FOR_CACHE, waffle
+from ..config import COLUMNAR_SERIALIZATION, STORAGE_BACKING_FOR_CACHE, waffle
 from ..config.models import BlockStructureConfiguration
 from ..exceptions import BlockStructureNotFound
+from ..serializer import is_columnar
 from ..store import BlockStructureStore
 from .helpers import ChildrenMapTestMixin, UsageKeyFactoryMixin, MockCache, MockTransformer
 
@@ -59,11 +63,88 @@ class TestBlockStructureStore(UsageKeyFactoryMixin, ChildrenMapTestMixin, CacheI
             self.assertIsNotNone(stored_value)
             self.assert_block_structure(stored_value, self.children_map)
 
+    @ddt.data(*itertools.product([True, False], repeat=2))
+    @ddt.unpack
+    def test_serialization_format(self, columnar_on_add, columnar_on_get):
+        with waffle().override(COLUMNAR_SERIALIZATION, active=columnar_on_add):
+            self.store.add(self.block_structure)
+        for cached_data in self.mock_cache.map.itervalues():
+            self.assertEquals(is_columnar(cached_data), columnar_on_add)
+
+        with waffle().override(COLUMNAR_SERIALIZATION, active=columnar_on_get):
+            stored_value = self.store.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(stored_value, self.children_map)
+        self.assertEquals(
+            stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+            '{} val'.format(MockTransformer.name()),
+        )
+
     @ddt.data(True, False)
-    def test_delete(self, with_storage_backing):
+    def test_partial_get(self, with_storage_backing):
         with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
-            self.store.add(self.block_structure)
+            with waffle().override(COLUMNAR_SERIALIZATION, active=True):
+                self.store.add(self.block_structure)
+            self.assertEquals(len(self.mock_cache.map), 2)
+
+            with patch.object(self.mock_cache, 'get_many', wraps=self.mock_cache.get_many) as mock_get:
+                stored_value = self.store.get(self.block_structure.root_block_usage_key, transformer_names=set())
+                self.assertEquals(mock_get.call_count, 1)
+
+                # The transformer's segment is fetched upon first access.
+                self.assertEquals(
+                    stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+                    '{} val'.format(MockTransformer.name()),
+                )
+                self.assertEquals(mock_get.call_count, 2)
+
+    @ddt.data(True, False)
+    def test_partial_get_segment_not_cached(self, with_storage_backing):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with waffle().override(COLUMNAR_SERIALIZATION, active=True):
+                self.store.add(self.block_structure)
+            root_cache_key = [key for key in self.mock_cache.map if '.transformer.' not in key][0]
+            self.mock_cache.delete_many([key for key in self.mock_cache.map.keys() if key != root_cache_key])
+
+            if with_storage_backing:
+                stored_value = self.store.get(
+                    self.block_structure.root_block_usage_key,
+                    transformer_names={MockTransformer.name()},
+                )
+                self.assertEquals(
+                    stored_value.get_transformer_block_field(self.block_key_factory(0), MockTransformer, 'test'),
+                    '{} val'.format(MockTransformer.name()),
+                )
+            else:
+                with self.assertRaises(BlockStructureNotFound):
+                    self.store.get(
+                        self.block_structure.root_block_usage_key,
+                        transformer_names={MockTransformer.name()},
+                    )
+
+    @ddt.data(True, False)
+    def test_local_cache(self, with_storage_backing):
+        local_cache = ProcessLocalLRUCache(max_entries=10, max_bytes=10 ** 6)
+        with patch('openedx.core.djangoapps.content.block_structure.store.get_local_cache', return_value=local_cache):
+            with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+                self.store.add(self.block_structure)
+                self.store.get(self.block_structure.root_block_usage_key)
+                with patch.object(self.mock_cache, 'get_many', wraps=self.mock_cache.get_many) as mock_get_many:
+                    stored_value = self.store.get(self.block_structure.root_block_usage_key)
+                    self.assert_block_structure(stored_value, self.children_map)
+                    self.assertEquals(mock_get_many.called, not with_storage_backing)
+                self.assertEquals(local_cache.hits, 1 if with_storage_backing else 0)
+
+                self.store.delete(self.block_structure.root_block_usage_key)
+                self.assertEquals(local_cache.stats()['entries'], 0)
+
+    @ddt.data(*itertools.product([True, False], repeat=2))
+    @ddt.unpack
+    def test_delete(self, with_storage_backing, columnar):
+        with waffle().override(STORAGE_BACKING_FOR_CACHE, active=with_storage_backing):
+            with waffle().override(COLUMNAR_SERIALIZATION, active=columnar):
+                self.store.add(self.block_structure)
             self.store.delete(self.block_structure.root_block_usage_key)
+            self.assertEquals(self.mock_cache.map, {})
             with self.assertRaises(BlockStructureNotFound):
                 self.store.get(self.block_structure.root_block_usage_key)
 
@@ -47,6 +47,13 @@ class TestBlockStructureTransformers(ChildrenMapTestMixin, TestCase):
             self.transformers._transformers['supports_filter']  # pylint: disable=protected-access
         )
 
+    def test_get_names(self):
+        self.add_mock_transformer()
+        self.assertEquals(
+            self.transformers.get_names(),
+            {MockTransformer.name(), MockFilteringTransformer.name()},
+        )
+
     def test_add_unregistered(self):
         with self.assertRaises(TransformerException):
             self.transformers += [self.UnregisteredTransformer()]
@@ -70,6 +70,16 @@ class BlockStructureTransformers(object):
                 self._transformers['no_filter'].append(transformer)
         return self
 
+    def get_names(self):
+        """
+        Returns the names of all transformers in the collection.
+        """
+        return {
+            transformer.name()
+            for transformers in self._transformers.itervalues()
+            for transformer in transformers
+        }
+
     @classmethod
     def collect(cls, block_structure):
         """
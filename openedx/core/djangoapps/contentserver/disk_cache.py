@@ -0,0 +1,251 @@
+"""
+A cache of large course assets on local disk, for the contentserver.
+
+Assets too large for the content cache are otherwise read from GridFS on
+every request.  This cache stores them on local disk in fixed-size chunks,
+each read from GridFS upon the first request for any of its bytes, so that
+ranged requests into a large video or PDF only fetch the chunks that they
+cover.  Chunks are keyed by the asset's key and content digest, so a new
+version of an asset never reads an old version's chunks, and they are
+served from memory maps of the chunk files.
+
+The cache is disabled unless a directory is configured in the
+CONTENTSERVER_DISK_CACHE setting, as in:
+    CONTENTSERVER_DISK_CACHE = {
+        'DIRECTORY': '/var/cache/edxapp/assets',
+        'MAX_BYTES': 10 * 1024 ** 3,
+        'CHUNK_SIZE': 1024 ** 2,
+        'MIN_ASSET_BYTES': 1024 ** 2,
+    }
+"""
+import hashlib
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+
+from django.conf import settings
+
+from xmodule.contentstore.content import StaticContent
+
+log = logging.getLogger(__name__)
+
+# Bytes of a cached chunk yielded at a time while streaming a response.
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# Number of chunks written between checks of the size of the cache.
+EVICTION_CHECK_INTERVAL = 100
+
+# Fraction of MAX_BYTES that eviction reduces the size of the cache to.
+EVICTION_TARGET_RATIO = 0.9
+
+_DISK_CACHE = None
+
+
+def get_disk_cache():
+    """
+    Returns the AssetDiskCache configured by the CONTENTSERVER_DISK_CACHE
+    setting, or None if it's disabled.
+    """
+    global _DISK_CACHE  # pylint: disable=global-statement
+    config = getattr(settings, 'CONTENTSERVER_DISK_CACHE', {})
+    if not config.get('DIRECTORY'):
+        return None
+    if _DISK_CACHE is None or _DISK_CACHE.directory != config['DIRECTORY']:
+        _DISK_CACHE = AssetDiskCache(
+            config['DIRECTORY'],
+            max_bytes=config.get('MAX_BYTES', 10 * 1024 ** 3),
+            chunk_size=config.get('CHUNK_SIZE', 1024 ** 2),
+            min_asset_bytes=config.get('MIN_ASSET_BYTES', 1024 ** 2),
+        )
+    return _DISK_CACHE
+
+
+class AssetDiskCache(object):
+    """
+    Chunks of assets stored on local disk, up to max_bytes in total, in the
+    given directory.  The least recently used assets are evicted first.
+
+    Files are written under temporary names and renamed into place, so the
+    cache can be shared by the processes of a host.
+    """
+    def __init__(self, directory, max_bytes, chunk_size, min_asset_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.min_asset_bytes = min_asset_bytes
+        self._chunks_written = 0
+        self._eviction_lock = threading.Lock()
+
+    def should_cache(self, content):
+        """
+        Returns whether the given content, from the contentstore, is large
+        enough to be served from this cache.
+        """
+        return (
+            content.length is not None and content.length >= self.min_asset_bytes and
+            getattr(content, 'content_digest', None) is not None
+        )
+
+    def wrap(self, content):
+        """
+        Returns content for serving the given StaticContentStream from
+        this cache.
+        """
+        return DiskCachedContent(self, content)
+
+    def asset_directory(self, content):
+        """
+        Returns the directory of the chunks of the given content.
+        """
+        digest = hashlib.sha1(
+            u'{}\n{}'.format(content.location, content.content_digest).encode('utf-8')
+        ).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def get_chunk(self, content, stream, chunk_index):
+        """
+        Returns a read-only memory map of the given chunk of the content,
+        reading it from the content's StaticContentStream on a miss.
+        """
+        asset_directory = self.asset_directory(content)
+        chunk_path = os.path.join(asset_directory, str(chunk_index))
+        chunk_length = min(self.chunk_size, content.length - chunk_index * self.chunk_size)
+
+        chunk = self._map_chunk(chunk_path, chunk_length)
+        if chunk is not None:
+            return chunk
+
+        chunk_start = chunk_index * self.chunk_size
+        data = ''.join(stream.stream_data_in_range(chunk_start, chunk_start + chunk_length - 1))
+        if len(data) != chunk_length:
+            raise IOError(u'Read {} of {} bytes of chunk {} of {}'.format(
+                len(data), chunk_length, chunk_index, content.location,
+            ))
+        self._write_chunk(asset_directory, chunk_path, data)
+        return self._map_chunk(chunk_path, chunk_length) or data
+
+    def _map_chunk(self, chunk_path, chunk_length):
+        """
+        Returns a read-only memory map of the chunk file, or None if it's
+        missing or incomplete.
+        """
+        try:
+            with open(chunk_path, 'rb') as chunk_file:
+                if os.fstat(chunk_file.fileno()).st_size != chunk_length:
+                    return None
+                chunk = mmap.mmap(chunk_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, OSError, ValueError):
+            return None
+        try:
+            # Mark the asset as recently used, for eviction.
+            os.utime(os.path.dirname(chunk_path), None)
+        except OSError:
+            pass
+        return chunk
+
+    def _write_chunk(self, asset_directory, chunk_path, data):
+        """
+        Writes the data of a chunk into place.  Failures are logged, since
+        the chunk can still be served from the data.
+        """
+        try:
+            if not os.path.isdir(asset_directory):
+                os.makedirs(asset_directory)
+            temp_fd, temp_path = tempfile.mkstemp(dir=asset_directory, prefix='.tmp')
+            with os.fdopen(temp_fd, 'wb') as temp_file:
+                temp_file.write(data)
+            os.rename(temp_path, chunk_path)
+        except (IOError, OSError):
+            log.exception(u'Error writing to the asset disk cache: %s', chunk_path)
+            return
+
+        with self._eviction_lock:
+            self._chunks_written += 1
+            check_size = self._chunks_written % EVICTION_CHECK_INTERVAL == 0
+        if check_size:
+            self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used assets until the cache is below
+        its target size, if it's over max_bytes.
+        """
+        assets = []
+        total_bytes = 0
+        for prefix in _listdir(self.directory):
+            for digest in _listdir(os.path.join(self.directory, prefix)):
+                asset_directory = os.path.join(self.directory, prefix, digest)
+                try:
+                    last_used = os.stat(asset_directory).st_mtime
+                    size = sum(
+                        os.path.getsize(os.path.join(asset_directory, name)) for name in _listdir(asset_directory)
+                    )
+                except OSError:
+                    continue
+                assets.append((last_used, size, asset_directory))
+                total_bytes += size
+
+        if total_bytes <= self.max_bytes:
+            return
+        for _, size, asset_directory in sorted(assets):
+            if total_bytes <= self.max_bytes * EVICTION_TARGET_RATIO:
+                break
+            shutil.rmtree(asset_directory, ignore_errors=True)
+            total_bytes -= size
+
+
+class DiskCachedContent(StaticContent):
+    """
+    A StaticContentStream's content, served from the AssetDiskCache.
+    """
+    def __init__(self, disk_cache, content):
+        super(DiskCachedContent, self).__init__(
+            content.location, content.name, content.content_type, None,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked,
+            content_digest=content.content_digest,
+        )
+        self._disk_cache = disk_cache
+        self._stream = content
+
+    def stream_data(self):
+        return self.stream_data_in_range(0, self.length - 1)
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        chunk_size = self._disk_cache.chunk_size
+        for chunk_index in range(first_byte // chunk_size, last_byte // chunk_size + 1):
+            chunk_start = chunk_index * chunk_size
+            chunk = self._disk_cache.get_chunk(self, self._stream, chunk_index)
+            try:
+                position = max(first_byte, chunk_start) - chunk_start
+                end = min(last_byte, chunk_start + len(chunk) - 1) - chunk_start + 1
+                while position < end:
+                    yield chunk[position:min(position + STREAM_BLOCK_SIZE, end)]
+                    position += STREAM_BLOCK_SIZE
+            finally:
+                if isinstance(chunk, mmap.mmap):
+                    chunk.close()
+
+    def close(self):
+        self._stream.close()
+
+    @property
+    def data(self):
+        return ''.join(self.stream_data())
+
+
+def _listdir(directory):
+    """
+    Returns the names in the directory other than temporary files, or an
+    empty list if it doesn't exist.
+    """
+    try:
+        return [name for name in os.listdir(directory) if not name.startswith('.tmp')]
+    except OSError:
+        return []
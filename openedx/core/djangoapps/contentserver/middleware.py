@@ -11,16 +11,18 @@ except ImportError:
     newrelic = None  # pylint: disable=invalid-name
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect,
+    StreamingHttpResponse)
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
 from openedx.core.djangoapps.header_control import force_header_for_response
 from .caching import get_cached_content, set_cached_content
+from .disk_cache import DiskCachedContent, get_disk_cache
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -122,10 +124,6 @@ class StaticContentServer(object):
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -150,7 +148,7 @@ class StaticContentServer(object):
 
                         if 0 <= first <= last < content.length:
                             # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                            response = self.make_response(content, content.stream_data_in_range(first, last))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
@@ -167,7 +165,7 @@ class StaticContentServer(object):
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = self.make_response(content, content.stream_data())
                 response['Content-Length'] = content.length
 
             if newrelic:
@@ -186,6 +184,15 @@ class StaticContentServer(object):
 
             return response
 
+    def make_response(self, content, data):
+        """
+        Returns a response with the given data of the content, streamed
+        unless the content is already in memory.
+        """
+        if isinstance(content, (StaticContentStream, DiskCachedContent)):
+            return StreamingHttpResponse(data)
+        return HttpResponse(data)
+
     def set_caching_headers(self, content, response):
         """
         Sets caching headers based on whether or not the asset is locked.
@@ -286,6 +293,11 @@ class StaticContentServer(object):
             if content.length is not None and content.length < 1048576:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+            else:
+                # Larger content can be served in chunks cached on local disk.
+                disk_cache = get_disk_cache()
+                if disk_cache is not None and disk_cache.should_cache(content):
+                    content = disk_cache.wrap(content)
 
         return content
 
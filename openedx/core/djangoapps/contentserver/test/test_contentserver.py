@@ -240,6 +240,19 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
             first=first_byte, last=last_byte, length=self.length_unlocked))
         self.assertEqual(resp['Content-Length'], str(last_byte - first_byte + 1))
 
+    def test_range_request_cached_content(self):
+        """
+        Test that a range request for content in the cache serves the range
+        of the cached content.
+        """
+        content = self.contentstore.find(self.unlocked_asset)
+        with patch('openedx.core.djangoapps.contentserver.middleware.get_cached_content', return_value=content):
+            with patch('openedx.core.djangoapps.contentserver.middleware.AssetManager.find') as mock_find:
+                resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=1-3')
+        self.assertFalse(mock_find.called)
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp.content, content.data[1:4])
+
     def test_range_request_multiple_ranges(self):
         """
         Test that multiple ranges in request outputs the full content.
@@ -0,0 +1,102 @@
+"""
+Tests for the contentserver's disk cache of large assets.
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+import ddt
+from django.test.utils import override_settings
+from mock import patch
+from opaque_keys.edx.locator import CourseLocator
+
+from xmodule.contentstore.content import StaticContentStream
+
+from ..disk_cache import AssetDiskCache, get_disk_cache
+
+DATA = ''.join(chr(index % 256) for index in range(1000))
+
+
+@ddt.ddt
+class AssetDiskCacheTestCase(unittest.TestCase):
+    """
+    Tests for AssetDiskCache.
+    """
+    def setUp(self):
+        super(AssetDiskCacheTestCase, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.disk_cache = AssetDiskCache(self.directory, max_bytes=10000, chunk_size=300, min_asset_bytes=500)
+        self.course_key = CourseLocator('org', 'course', 'run')
+
+    def make_content(self, name='video.mp4', data=DATA, digest='digest'):
+        """
+        Returns a StaticContentStream of the given data.
+        """
+        return StaticContentStream(
+            self.course_key.make_asset_key('asset', name), name, 'video/mp4', StringIO(data),
+            length=len(data), content_digest=digest,
+        )
+
+    def test_should_cache(self):
+        self.assertTrue(self.disk_cache.should_cache(self.make_content()))
+        self.assertFalse(self.disk_cache.should_cache(self.make_content(data=DATA[:499])))
+        self.assertFalse(self.disk_cache.should_cache(self.make_content(digest=None)))
+
+    @ddt.data((0, 999), (0, 0), (299, 300), (250, 650), (600, 999), (999, 999))
+    @ddt.unpack
+    def test_stream_data_in_range(self, first_byte, last_byte):
+        content = self.disk_cache.wrap(self.make_content())
+        self.assertEqual(''.join(content.stream_data_in_range(first_byte, last_byte)), DATA[first_byte:last_byte + 1])
+
+        # Only the chunks of the range are cached.
+        asset_directory = self.disk_cache.asset_directory(content)
+        self.assertEqual(
+            sorted(int(name) for name in os.listdir(asset_directory)),
+            range(first_byte // 300, last_byte // 300 + 1),
+        )
+
+    def test_served_from_disk(self):
+        self.assertEqual(''.join(self.disk_cache.wrap(self.make_content()).stream_data()), DATA)
+
+        content = self.disk_cache.wrap(self.make_content(data='x' * len(DATA)))
+        with patch.object(StaticContentStream, 'stream_data_in_range') as mock_stream_data_in_range:
+            self.assertEqual(''.join(content.stream_data()), DATA)
+            self.assertEqual(content.data, DATA)
+        self.assertFalse(mock_stream_data_in_range.called)
+
+    def test_new_digest(self):
+        self.assertEqual(''.join(self.disk_cache.wrap(self.make_content()).stream_data()), DATA)
+        new_data = DATA[::-1]
+        content = self.disk_cache.wrap(self.make_content(data=new_data, digest='new_digest'))
+        self.assertEqual(''.join(content.stream_data()), new_data)
+
+    def test_incomplete_chunk(self):
+        content = self.disk_cache.wrap(self.make_content())
+        asset_directory = self.disk_cache.asset_directory(content)
+        os.makedirs(asset_directory)
+        with open(os.path.join(asset_directory, '0'), 'wb') as chunk_file:
+            chunk_file.write('partial')
+        self.assertEqual(''.join(content.stream_data_in_range(0, 299)), DATA[:300])
+
+    def test_evict(self):
+        self.disk_cache.max_bytes = 2500
+        asset_directories = []
+        for index in range(3):
+            content = self.disk_cache.wrap(self.make_content(name='video{}.mp4'.format(index)))
+            ''.join(content.stream_data())
+            asset_directories.append(self.disk_cache.asset_directory(content))
+            os.utime(asset_directories[-1], (index, index))
+
+        self.disk_cache.evict()
+        self.assertEqual([os.path.isdir(directory) for directory in asset_directories], [False, True, True])
+
+    def test_get_disk_cache(self):
+        with override_settings(CONTENTSERVER_DISK_CACHE={'DIRECTORY': None}):
+            self.assertIsNone(get_disk_cache())
+        with override_settings(CONTENTSERVER_DISK_CACHE={'DIRECTORY': self.directory, 'CHUNK_SIZE': 100}):
+            disk_cache = get_disk_cache()
+            self.assertEqual((disk_cache.directory, disk_cache.chunk_size), (self.directory, 100))
+            self.assertIs(get_disk_cache(), disk_cache)
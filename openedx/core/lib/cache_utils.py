@@ -4,10 +4,16 @@ Utilities related to caching.
 import collections
 import cPickle as pickle
 import functools
+import logging
+import threading
+import time
+import uuid
 import zlib
 
 from xblock.core import XBlock
 
+log = logging.getLogger(__name__)
+
 
 def memoize_in_request_cache(request_cache_attr_name=None):
     """
@@ -84,6 +90,185 @@ class memoized(object):  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+class ProcessLocalLRUCache(object):
+    """
+    A bounded, thread-safe cache of values local to the current process,
+    which evicts the least recently used entries once either the number
+    of entries or their total size exceeds its limits.
+
+    WARNING: Only use this cache for values that never change for a
+    given key, such as data keyed by a content version.  Entries are
+    neither shared nor invalidated across processes.
+    """
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Map of key to a (value, size) tuple, in least to most
+        # recently used order.
+        self._entries = collections.OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """
+        Returns whether the limits of this cache allow any entries.
+        """
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key, default=None):
+        """
+        Returns the value associated with the given key, marking it as
+        the most recently used; returns default if not found.
+        """
+        with self._lock:
+            try:
+                entry = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, size):
+        """
+        Associates the given value of the given size, in bytes, with the
+        given key, evicting the least recently used entries as needed.
+        Values larger than the limit on the total size are not cached.
+        """
+        if not self.enabled or size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key):
+        """
+        Deletes the given key from the cache.
+        """
+        with self._lock:
+            self._pop(key)
+
+    def delete_matching(self, predicate):
+        """
+        Deletes all keys for which the given predicate returns True.
+        """
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key)]:
+                self._pop(key)
+
+    def clear(self):
+        """
+        Deletes all entries and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """
+        Returns a dict of the hit, miss and eviction counters along with
+        the current number of entries and their total size.
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'bytes': self._total_bytes,
+        }
+
+    def _pop(self, key):
+        """
+        Removes the given key, if present, and updates the total size.
+        Must be called with the lock held.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry[1]
+
+
+class SingleFlight(object):
+    """
+    Coalesces the recomputation of a missing cache entry across processes.
+    Of the callers that miss the entry at once, only the one that acquires a
+    lock in the given shared cache, with the cache's atomic add, recomputes
+    it.  The others wait for the entry to appear, or serve a stale value if
+    they have one.
+
+    A caller that waits longer than wait_timeout recomputes the entry
+    itself, as does any caller if the lock's holder dies, once the lock
+    expires after lock_timeout.  If the cache is None, callers always
+    recompute.
+    """
+    def __init__(self, cache, lock_timeout=60, wait_timeout=5, poll_interval=0.05):
+        self.cache = cache
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+    def get_or_compute(self, key, lookup, compute, stale=None):
+        """
+        Returns the value for the given key, computing it only if no other
+        process is already computing it.
+
+        Arguments:
+            key (string) - The key of the cache entry being recomputed.
+
+            lookup (function) - Returns the value if it's available,
+                such as from the cache, or else None.  Called after the
+                caller's own lookup has missed.
+
+            compute (function) - Computes, stores and returns the value.
+
+            stale (function) - Optional, returns a stale value to serve
+                while another process recomputes it, or None if there is
+                none; the stale-while-revalidate option.
+        """
+        if self.cache is None:
+            return compute()
+
+        lock_key = u'single_flight.{}'.format(key)
+        deadline = time.time() + self.wait_timeout
+        while True:
+            token = uuid.uuid4().hex
+            if self.cache.add(lock_key, token, self.lock_timeout):
+                try:
+                    # The previous holder of the lock may have just computed the value.
+                    value = lookup()
+                    return value if value is not None else compute()
+                finally:
+                    # Don't release the lock of another process, if ours expired.
+                    if self.cache.get(lock_key) == token:
+                        self.cache.delete(lock_key)
+
+            if stale is not None:
+                value = stale()
+                if value is not None:
+                    return value
+
+            if time.time() >= deadline:
+                log.warning(u'Timed out waiting for another process to compute %s; computing it.', key)
+                return compute()
+
+            time.sleep(self.poll_interval)
+            value = lookup()
+            if value is not None:
+                return value
+
+
 def hashvalue(arg):
     """
     If arg is an xblock, use its location. otherwise just turn it into a string
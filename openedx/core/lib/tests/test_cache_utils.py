@@ -4,9 +4,10 @@ Tests for cache_utils.py
 from unittest import TestCase
 
 import ddt
-from mock import MagicMock
+from django.core.cache.backends.locmem import LocMemCache
+from mock import MagicMock, patch
 
-from openedx.core.lib.cache_utils import memoize_in_request_cache
+from openedx.core.lib.cache_utils import memoize_in_request_cache, ProcessLocalLRUCache, SingleFlight
 
 
 @ddt.ddt
@@ -63,3 +64,131 @@ class TestMemoizeInRequestCache(TestCase):
                 func_to_memoize(*arg_list2)
 
             self.assertEquals(self.func_to_count.call_count, 2)
+
+
+class TestProcessLocalLRUCache(TestCase):
+    """
+    Test the ProcessLocalLRUCache class.
+    """
+    def setUp(self):
+        super(TestProcessLocalLRUCache, self).setUp()
+        self.cache = ProcessLocalLRUCache(max_entries=3, max_bytes=100)
+
+    def test_get_and_set(self):
+        self.assertIsNone(self.cache.get('foo'))
+        self.cache.set('foo', 'bar', 10)
+        self.assertEquals(self.cache.get('foo'), 'bar')
+        self.assertEquals(
+            self.cache.stats(),
+            {'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 1, 'bytes': 10},
+        )
+
+    def test_evict_by_entries(self):
+        for key in range(3):
+            self.cache.set(key, key, 10)
+        self.cache.get(0)
+        self.cache.set(3, 3, 10)
+
+        self.assertIsNone(self.cache.get(1))
+        self.assertEquals([self.cache.get(key) for key in (0, 2, 3)], [0, 2, 3])
+        self.assertEquals(self.cache.evictions, 1)
+
+    def test_evict_by_bytes(self):
+        self.cache.set('foo', 'foo', 60)
+        self.cache.set('bar', 'bar', 60)
+        self.assertIsNone(self.cache.get('foo'))
+        self.assertEquals(self.cache.get('bar'), 'bar')
+        self.assertEquals(self.cache.stats()['bytes'], 60)
+
+    def test_too_large(self):
+        self.cache.set('foo', 'foo', 101)
+        self.assertIsNone(self.cache.get('foo'))
+
+    def test_disabled(self):
+        cache = ProcessLocalLRUCache(max_entries=0, max_bytes=0)
+        self.assertFalse(cache.enabled)
+        cache.set('foo', 'foo', 1)
+        self.assertIsNone(cache.get('foo'))
+
+    def test_delete_matching(self):
+        self.cache.set(('course1', 'a'), 'a', 10)
+        self.cache.set(('course2', 'b'), 'b', 10)
+        self.cache.delete_matching(lambda key: key[0] == 'course1')
+        self.assertIsNone(self.cache.get(('course1', 'a')))
+        self.assertEquals(self.cache.get(('course2', 'b')), 'b')
+        self.assertEquals(self.cache.stats()['bytes'], 10)
+
+
+class TestSingleFlight(TestCase):
+    """
+    Test the SingleFlight class.
+    """
+    def setUp(self):
+        super(TestSingleFlight, self).setUp()
+        self.cache = LocMemCache('single_flight', {})
+        self.cache.clear()
+        self.single_flight = SingleFlight(self.cache, wait_timeout=1, poll_interval=0)
+        self.lookup = MagicMock(return_value=None)
+        self.compute = MagicMock(return_value='computed')
+
+    def hold_lock(self):
+        """
+        Acquires the lock as another process would.
+        """
+        self.assertTrue(self.cache.add('single_flight.key', 'other', 60))
+
+    def test_compute(self):
+        self.assertEquals(self.single_flight.get_or_compute('key', self.lookup, self.compute), 'computed')
+        self.assertEquals(self.compute.call_count, 1)
+        self.assertIsNone(self.cache.get('single_flight.key'))
+
+    def test_computed_by_previous_holder(self):
+        self.lookup.return_value = 'cached'
+        self.assertEquals(self.single_flight.get_or_compute('key', self.lookup, self.compute), 'cached')
+        self.assertFalse(self.compute.called)
+
+    def test_wait_for_other_process(self):
+        self.hold_lock()
+        self.lookup.side_effect = [None, None, 'cached']
+        self.assertEquals(self.single_flight.get_or_compute('key', self.lookup, self.compute), 'cached')
+        self.assertFalse(self.compute.called)
+        self.assertEquals(self.cache.get('single_flight.key'), 'other')
+
+    def test_compute_after_other_process_releases(self):
+        self.hold_lock()
+
+        def release_lock():
+            """
+            Releases the lock as the other process would, without computing a value.
+            """
+            self.cache.delete('single_flight.key')
+
+        self.lookup.side_effect = release_lock
+        self.assertEquals(self.single_flight.get_or_compute('key', self.lookup, self.compute), 'computed')
+        self.assertEquals(self.compute.call_count, 1)
+
+    def test_serve_stale(self):
+        self.hold_lock()
+        stale = MagicMock(return_value='stale')
+        self.assertEquals(self.single_flight.get_or_compute('key', self.lookup, self.compute, stale), 'stale')
+        self.assertFalse(self.compute.called)
+
+    def test_no_stale_value(self):
+        self.hold_lock()
+        self.lookup.side_effect = [None, 'cached']
+        stale = MagicMock(return_value=None)
+        self.assertEquals(self.single_flight.get_or_compute('key', self.lookup, self.compute, stale), 'cached')
+        self.assertTrue(stale.called)
+
+    @patch('openedx.core.lib.cache_utils.log')
+    def test_wait_timeout(self, mock_log):
+        self.hold_lock()
+        self.single_flight.wait_timeout = 0
+        self.assertEquals(self.single_flight.get_or_compute('key', self.lookup, self.compute), 'computed')
+        self.assertTrue(mock_log.warning.called)
+        self.assertEquals(self.cache.get('single_flight.key'), 'other')
+
+    def test_no_cache(self):
+        single_flight = SingleFlight(None)
+        self.assertEquals(single_flight.get_or_compute('key', self.lookup, self.compute), 'computed')
+        self.assertFalse(self.lookup.called)